@@ -0,0 +1,186 @@
+"""
+ai_batch_client.py — OpenAI 호환 chat-completions 배치 실행기 (asyncio)
+여러 요청을 하나의 공유 httpx.AsyncClient로 동시에(최대 concurrency개) 보내고,
+분당 요청 수(RPM)·토큰 수(TPM) 한도를 지키며, 429/5xx/네트워크 오류는 지터가 섞인 지수 백오프로 재시도한다.
+각 요청이 끝날 때마다 on_done 콜백을 호출하므로 호출자는 배치 단위로 결과를 바로 저장할 수 있다.
+"""
+import asyncio
+import random
+import time
+from typing import Callable, Optional, Sequence
+
+import httpx
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ChatRequest:
+    def __init__(self, messages: list[dict], max_tokens: int = 1024, temperature: float = 0.0):
+        self.messages = messages
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+    def estimated_tokens(self) -> int:
+        # 한국어 위주 프롬프트 — 문자 수를 토큰 수 상한으로 보수적으로 추정 + 응답 한도
+        return sum(len(str(m.get("content", ""))) for m in self.messages) + self.max_tokens
+
+
+class _Bucket:
+    """분당 capacity만큼 연속 충전되는 토큰 버킷 (처음엔 가득 참)."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)  # 한도보다 큰 요청은 가득 찼을 때 통과
+        return 0.0 if self._level >= amount else (amount - self._level) / self.rate
+
+    def consume(self, amount: float):
+        self._level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """RPM/TPM 동시 제한. 0 이하 한도는 제한 없음."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, clock: Callable[[], float] = time.monotonic):
+        self._requests = _Bucket(rpm, clock) if rpm > 0 else None
+        self._tokens = _Bucket(tpm, clock) if tpm > 0 else None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0):
+        async with self._lock:  # 먼저 온 요청부터 순서대로 통과
+            while True:
+                wait = 0.0
+                if self._requests is not None:
+                    wait = max(wait, self._requests.wait_time(1))
+                if self._tokens is not None:
+                    wait = max(wait, self._tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self._requests is not None:
+                self._requests.consume(1)
+            if self._tokens is not None:
+                self._tokens.consume(tokens)
+
+
+class AIRequestError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatBatchClient:
+    """
+    run(requests, on_done)으로 ChatRequest 목록을 실행.
+    on_done(index, content | None, error | None)은 이벤트 루프 스레드에서 요청마다 한 번 호출된다.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str = DEFAULT_BASE_URL,
+        concurrency: int = 4,
+        rpm: float = 500,
+        tpm: float = 200_000,
+        max_retries: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        timeout: float = 120.0,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "seconds": 0.0}
+
+    def run_sync(self, requests: Sequence[ChatRequest], on_done: Callable[[int, Optional[str], Optional[Exception]], None]) -> dict:
+        """동기 코드(재계산 스레드)용 진입점 — 호출 스레드에서 새 이벤트 루프로 실행."""
+        return asyncio.run(self.run(requests, on_done))
+
+    async def run(self, requests: Sequence[ChatRequest], on_done: Callable[[int, Optional[str], Optional[Exception]], None]) -> dict:
+        started = time.perf_counter()
+        limiter = RateLimiter(self.rpm, self.tpm)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency),
+        ) as client:
+
+            async def _one(index: int, request: ChatRequest):
+                async with semaphore:
+                    try:
+                        content = await self._complete(client, limiter, request)
+                    except Exception as e:
+                        self.stats["failures"] += 1
+                        on_done(index, None, e)
+                        return
+                    on_done(index, content, None)
+
+            await asyncio.gather(*(_one(i, r) for i, r in enumerate(requests)))
+        self.stats["seconds"] = round(time.perf_counter() - started, 3)
+        return dict(self.stats)
+
+    async def _complete(self, client: httpx.AsyncClient, limiter: RateLimiter, request: ChatRequest) -> str:
+        payload = {
+            "model": self.model,
+            "messages": request.messages,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+        }
+        attempt = 0
+        while True:
+            await limiter.acquire(request.estimated_tokens())
+            self.stats["requests"] += 1
+            retry_after: Optional[float] = None
+            try:
+                resp = await client.post("/chat/completions", json=payload)
+                if resp.status_code < 400:
+                    data = resp.json()
+                    return (data["choices"][0]["message"].get("content") or "").strip()
+                error = AIRequestError(f"HTTP {resp.status_code}: {resp.text[:200]}", resp.status_code)
+                if resp.status_code not in RETRY_STATUS:
+                    raise error
+                retry_after = _retry_after_seconds(resp.headers.get("retry-after"))
+            except httpx.TransportError as e:
+                error = AIRequestError(f"{type(e).__name__}: {e}")
+            if attempt >= self.max_retries:
+                raise error
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        # base·2^(n-1)에 0.5~1.5배 지터 (동시 재시도 분산), 서버가 Retry-After를 주면 그 이상 대기
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1))) * random.uniform(0.5, 1.5)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
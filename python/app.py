@@ -20,11 +20,11 @@ else:
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 import tempfile
 import zipfile
 import shutil
@@ -34,15 +34,17 @@ import re
 import subprocess
 import webbrowser
 import unicodedata
+import hashlib
+import html as html_lib
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from urllib.parse import urlsplit
 import numpy as np
 
 import httpx
 
-# ─── Chroma / Embedding (기존 유지) ───────────────
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-
 # ─── 서비스 모듈 ──────────────────────────────────
 from doc_service import (
     list_docs, get_doc, save_doc, delete_doc,
@@ -53,6 +55,14 @@ from doc_service import (
 )
 import doc_service
 import db_service
+import semantic_service
+from rebuild_scheduler import RebuildScheduler
+from vector_index import VectorIndex, doc_id_of
+from lazy_resource import LazyResource
+from ai_batch_client import ChatBatchClient, ChatRequest
+import embedding_service
+import http_client
+import url_ingest
 
 app = FastAPI(title="My Graph API")
 
@@ -64,21 +74,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ─── Chroma 초기화 (v0.4+ 신규 API) ─────────────────
-try:
-    chroma_client = chromadb.PersistentClient(path="./chroma_db")
-    CHROMA_AVAILABLE = True
-except Exception:
-    CHROMA_AVAILABLE = False
-    chroma_client = None
-
-# ─── 임베딩 모델 초기화 (Chroma와 독립) ──────────────
-try:
-    embed_model = SentenceTransformer("all-MiniLM-L6-v2")
-    EMBED_AVAILABLE = True
-except Exception:
-    embed_model = None
-    EMBED_AVAILABLE = False
+# ─── Chroma / 임베딩 모델 (지연 로딩) ───────────────
+# chromadb·sentence_transformers(torch) import와 모델 생성은 수 초가 걸리므로 첫 사용 시
+# (또는 시작 후 warm-up 스레드에서) 1회만 수행 — 서버는 기동 직후부터 문서 CRUD를 처리한다.
+# 임베딩 백엔드(torch | onnx int8)·모델·길이·스레드는 MY_GRAPH_EMBED_* 환경변수로 설정
+EMBED_CONFIG = embedding_service.EmbeddingConfig.from_env()
+# 긴 문서는 겹치는 토큰 구간(청크)으로 나눠 임베딩 → 문서 벡터는 청크 벡터의 길이 가중 평균
+CHUNK_TOKENS = int(os.environ.get("MY_GRAPH_CHUNK_TOKENS", "256"))
+CHUNK_OVERLAP = int(os.environ.get("MY_GRAPH_CHUNK_OVERLAP", "32"))
+CHUNK_EMBED_MODEL = EMBED_CONFIG.cache_key  # 청크 벡터 캐시 키 (청크 = 모델 입력 그대로)
+# 문서 벡터 캐시 키 — 청크 설정이 바뀌면 문서 벡터도 달라지므로 포함
+DOC_EMBED_MODEL = f"{EMBED_CONFIG.cache_key}#chunk{CHUNK_TOKENS}-{CHUNK_OVERLAP}"
+# 마이크로 배칭: 첫 요청 후 최대 대기(ms) / 배치 최대 크기
+EMBED_BATCH_WAIT_MS = float(os.environ.get("MY_GRAPH_EMBED_BATCH_WAIT_MS", "5"))
+EMBED_BATCH_MAX = int(os.environ.get("MY_GRAPH_EMBED_BATCH_MAX", "64"))
+# 시작 시 백그라운드 warm-up 여부 (0이면 첫 사용 시 로드)
+WARMUP_ON_START = os.environ.get("MY_GRAPH_WARMUP", "1").strip() not in ("0", "false", "no")
+
+
+def _load_chroma_client():
+    import chromadb  # v0.4+ 신규 API
+    return chromadb.PersistentClient(path="./chroma_db")
+
+
+def _load_embed_model():
+    # 동시 요청의 encode 호출은 워커 하나가 모아서 batch encode (모델 경합 방지)
+    return embedding_service.EmbeddingBatcher(
+        embedding_service.create_provider(EMBED_CONFIG),
+        max_batch=EMBED_BATCH_MAX,
+        max_wait=EMBED_BATCH_WAIT_MS / 1000.0,
+    )
+
+
+def _load_kiwi():
+    kiwi = doc_service._get_kiwi()
+    if kiwi is None:
+        raise RuntimeError("kiwipiepy not installed")
+    return kiwi
+
+
+chroma_resource = LazyResource("chroma", _load_chroma_client)
+embed_resource = LazyResource("embedding", _load_embed_model)
+kiwi_resource = LazyResource("kiwi", _load_kiwi)
+
+
+def _get_chroma_client():
+    """Chroma 클라이언트 (첫 호출 시 로드, 실패 시 None)"""
+    return chroma_resource.get()
+
+
+def _get_embed_model():
+    """문서 임베딩 제공자 (첫 호출 시 로드, 실패 시 None) — encode(texts) -> ndarray"""
+    return embed_resource.get()
+
 
 # ─── OpenAI / AI 상태 ─────────────────────────────
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "").strip()
@@ -86,22 +134,32 @@ AI_AVAILABLE = bool(OPENAI_API_KEY)
 # AI 태그 추출에 실제 사용하는 모델
 AI_TAG_MODEL = "gpt-4o-mini-search-preview"
 AUTO_TAG_LIMIT = 8
-EMBED_MODEL_NAME = "jhgan/ko-sroberta-sts"  # 한국어 시맨틱 임베딩 모델
+EMBED_MODEL_NAME = DOC_EMBED_MODEL  # 태그 centroid 유사도 캐시의 모델 키 (문서 임베딩과 동일)
 TAG_EDGE_TYPE = "tag_semantic"
 TAG_EDGE_THRESHOLD_AI = 0.15      # AI(GPT) 유사도 기준
 TAG_EDGE_THRESHOLD_EMBED = 0.45   # 한국어 centroid 유사도 기준
 TAG_EDGE_TOP_N = 3
 TAG_EDGE_K = 8
 AI_SIM_MODEL = "gpt-4o-mini"
+AI_SIM_BATCH = 500  # 요청 1회에 보내는 태그 쌍 수
+# AI 배치 호출: 동시 요청 수 / 분당 요청·토큰 한도 / API 주소 (OpenAI 호환 서버·테스트 스텁용)
+AI_SIM_CONCURRENCY = int(os.environ.get("MY_GRAPH_AI_CONCURRENCY", "4"))
+AI_RPM = float(os.environ.get("MY_GRAPH_AI_RPM", "500"))
+AI_TPM = float(os.environ.get("MY_GRAPH_AI_TPM", "200000"))
+AI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "").strip() or "https://api.openai.com/v1"
+# 문서 변경 후 그래프 재계산까지 대기하는 무변경 구간(초) — 연속 저장은 한 번으로 합쳐짐
+REBUILD_DEBOUNCE_SEC = float(os.environ.get("MY_GRAPH_REBUILD_DEBOUNCE", "2.0"))
+# 문서 벡터(Chroma) 반영 지연(초) — 그 사이의 저장은 한 번의 batch encode/upsert로 합쳐짐
+VECTOR_FLUSH_SEC = float(os.environ.get("MY_GRAPH_VECTOR_FLUSH", "1.0"))
+DOC_COLLECTION = "my_graph_collection"
 
 
 def _check_internet() -> bool:
     """인터넷 연결 여부 확인 (타임아웃 3초)"""
     try:
-        with httpx.Client(timeout=3.0) as client:
-            r = client.get("https://api.openai.com/v1/models", headers={"Authorization": "Bearer dummy"})
-            # 401 = 서버 도달 성공 (키 없음/잘못됨), 연결됨
-            return r.status_code in (200, 401, 403)
+        r = http_client.get("https://api.openai.com/v1/models", headers={"Authorization": "Bearer dummy"}, timeout=3.0)
+        # 401 = 서버 도달 성공 (키 없음/잘못됨), 연결됨
+        return r.status_code in (200, 401, 403)
     except Exception:
         return False
 
@@ -114,23 +172,23 @@ def _fetch_openai_models() -> tuple[bool, list[str]]:
     if not OPENAI_API_KEY:
         return False, []
     try:
-        with httpx.Client(timeout=8.0) as client:
-            r = client.get(
-                "https://api.openai.com/v1/models",
-                headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
-            )
-            if r.status_code != 200:
-                return False, []
-            data = r.json()
-            models = data.get("data", [])
-            # 채팅/완성용 모델만 필터 (gpt-*, o1-*)
-            chat_models = sorted(
-                m["id"]
-                for m in models
-                if isinstance(m.get("id"), str)
-                and (m["id"].startswith("gpt-") or m["id"].startswith("o1-"))
-            )
-            return True, chat_models
+        r = http_client.get(
+            "https://api.openai.com/v1/models",
+            headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
+            timeout=8.0,
+        )
+        if r.status_code != 200:
+            return False, []
+        data = r.json()
+        models = data.get("data", [])
+        # 채팅/완성용 모델만 필터 (gpt-*, o1-*)
+        chat_models = sorted(
+            m["id"]
+            for m in models
+            if isinstance(m.get("id"), str)
+            and (m["id"].startswith("gpt-") or m["id"].startswith("o1-"))
+        )
+        return True, chat_models
     except Exception:
         return False, []
 
@@ -145,8 +203,7 @@ def _extract_keywords_ai(html_content: str, top_k: int = AUTO_TAG_LIMIT) -> list
     if len(text) < 10:
         return []
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = http_client.openai_client(OPENAI_API_KEY)
         resp = client.chat.completions.create(
             model=AI_TAG_MODEL,
             messages=[
@@ -162,6 +219,27 @@ def _extract_keywords_ai(html_content: str, top_k: int = AUTO_TAG_LIMIT) -> list
         return []
 
 
+def _extract_tags_cached(extractor: str, model: str, html_content: str, extract: Callable[[], list[str]]) -> list[str]:
+    """
+    (추출기, 모델, 평문 해시) 단위로 자동 태그 추출 결과를 캐시.
+    내용이 그대로인 자동 저장은 Kiwi 분석·AI 호출 없이 끝난다. 빈 결과(실패 가능)는 저장하지 않는다.
+    """
+    text_hash = _content_hash(_to_plain_text(html_content).strip())
+    try:
+        cached = db_service.get_extraction(extractor, model, text_hash)
+    except Exception:
+        cached = None
+    if cached is not None:
+        return cached
+    tags = extract()
+    if tags:
+        try:
+            db_service.save_extraction(extractor, model, text_hash, tags)
+        except Exception:
+            pass
+    return tags
+
+
 def _compute_tag_similarities_ai(needed_pairs: set[tuple[str, str]]) -> dict[tuple[str, str], float]:
     """
     GPT에게 실제 필요한 태그 쌍만 보내서 연관도를 판단시킨다.
@@ -170,7 +248,8 @@ def _compute_tag_similarities_ai(needed_pairs: set[tuple[str, str]]) -> dict[tup
     if not OPENAI_API_KEY or not needed_pairs:
         return {}
 
-    cached = db_service.get_tag_similarity_cache(AI_SIM_MODEL)
+    # 필요한 쌍만 조회 (LRU → (model, tagA, tagB) 키 조회) — 캐시 테이블 전체를 읽지 않음
+    cached = db_service.get_tag_similarities(needed_pairs, AI_SIM_MODEL)
 
     missing: list[tuple[str, str]] = []
     for key in needed_pairs:
@@ -184,58 +263,83 @@ def _compute_tag_similarities_ai(needed_pairs: set[tuple[str, str]]) -> dict[tup
     return {k: cached.get(k, 0.0) for k in needed_pairs}
 
 
+def _ai_sim_request(batch: list[tuple[str, str]]) -> ChatRequest:
+    pair_lines = "\n".join(f"{i}: {a} | {b}" for i, (a, b) in enumerate(batch))
+    prompt = (
+        "아래 태그 쌍들의 의미적 연관도를 0.0~1.0 사이 숫자로 평가해줘.\n"
+        "0.0 = 완전 무관, 1.0 = 동의어/거의 같은 의미.\n"
+        "JSON 배열로만 답해줘. [{\"i\":0,\"s\":0.85}, ...] 형식.\n"
+        "설명 없이 JSON만.\n\n"
+        f"{pair_lines}"
+    )
+    return ChatRequest(
+        messages=[
+            {"role": "system", "content": "태그 연관도 평가 전문가. JSON만 반환."},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=min(len(batch) * 20, 16384),
+    )
+
+
+def _parse_ai_sim_scores(raw: str, batch: list[tuple[str, str]]) -> dict[tuple[str, str], float]:
+    raw = re.sub(r"^```json\s*", "", raw)
+    raw = re.sub(r"\s*```$", "", raw)
+    scores: dict[tuple[str, str], float] = {}
+    for item in json.loads(raw):
+        idx = int(item["i"])
+        if 0 <= idx < len(batch):
+            scores[batch[idx]] = max(0.0, min(1.0, float(item["s"])))
+    return scores
+
+
 def _fetch_ai_similarities(
     pairs: list[tuple[str, str]],
     cache_out: dict[tuple[str, str], float],
 ):
-    """GPT API 호출 → 태그 쌍별 유사도 → cache_out에 병합 + DB 저장."""
-    BATCH = 500
-    for start in range(0, len(pairs), BATCH):
-        batch = pairs[start : start + BATCH]
-        pair_lines = "\n".join(f"{i}: {a} | {b}" for i, (a, b) in enumerate(batch))
-        prompt = (
-            "아래 태그 쌍들의 의미적 연관도를 0.0~1.0 사이 숫자로 평가해줘.\n"
-            "0.0 = 완전 무관, 1.0 = 동의어/거의 같은 의미.\n"
-            "JSON 배열로만 답해줘. [{\"i\":0,\"s\":0.85}, ...] 형식.\n"
-            "설명 없이 JSON만.\n\n"
-            f"{pair_lines}"
-        )
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            resp = client.chat.completions.create(
-                model=AI_SIM_MODEL,
-                messages=[
-                    {"role": "system", "content": "태그 연관도 평가 전문가. JSON만 반환."},
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=min(len(batch) * 20, 16384),
-                temperature=0.0,
-            )
-            raw = (resp.choices[0].message.content or "").strip()
-            raw = re.sub(r"^```json\s*", "", raw)
-            raw = re.sub(r"\s*```$", "", raw)
-            items = json.loads(raw)
-            to_save: list[dict] = []
-            for item in items:
-                idx = int(item["i"])
-                score = max(0.0, min(1.0, float(item["s"])))
-                if 0 <= idx < len(batch):
-                    key = batch[idx]
-                    cache_out[key] = score
-                    to_save.append({"tagA": key[0], "tagB": key[1], "score": score})
-            if to_save:
-                db_service.save_tag_similarity_cache(to_save, AI_SIM_MODEL)
-        except Exception:
-            import traceback
-            traceback.print_exc()
-            fallback: list[dict] = []
-            for key in batch:
-                if key not in cache_out:
-                    cache_out[key] = 0.0
-                    fallback.append({"tagA": key[0], "tagB": key[1], "score": 0.0})
-            if fallback:
-                db_service.save_tag_similarity_cache(fallback, AI_SIM_MODEL)
+    """
+    GPT API 호출 → 태그 쌍별 유사도 → cache_out에 병합 + DB 저장.
+    배치들을 동시에(AI_SIM_CONCURRENCY) 보내고, 배치가 끝날 때마다 바로 저장하므로
+    도중에 중단돼도 끝난 배치는 다음 재계산에서 캐시 히트가 된다.
+    """
+    batches = [pairs[start : start + AI_SIM_BATCH] for start in range(0, len(pairs), AI_SIM_BATCH)]
+    if not batches:
+        return
+
+    def _on_done(index: int, content: Optional[str], error: Optional[Exception]):
+        batch = batches[index]
+        persist = True
+        scores: dict[tuple[str, str], float] = {}
+        if error is not None:
+            # 네트워크/한도 오류는 저장하지 않음 → 다음 재계산에서 다시 시도
+            print(f"[AI-SIM] 배치 {index} 실패: {error}")
+            persist = False
+        else:
+            try:
+                scores = _parse_ai_sim_scores(content or "", batch)
+            except Exception as e:
+                print(f"[AI-SIM] 배치 {index} 응답 해석 실패: {e}")
+        # 응답에서 빠진 쌍은 0.0 (기존과 동일하게 캐시해 같은 쌍을 반복 요청하지 않음)
+        rows = []
+        for key in batch:
+            score = scores.get(key, 0.0)
+            cache_out[key] = score
+            rows.append({"tagA": key[0], "tagB": key[1], "score": score})
+        if persist and rows:
+            try:
+                db_service.save_tag_similarity_cache(rows, AI_SIM_MODEL)
+            except Exception:
+                pass
+
+    client = ChatBatchClient(
+        api_key=OPENAI_API_KEY,
+        model=AI_SIM_MODEL,
+        base_url=AI_BASE_URL,
+        concurrency=AI_SIM_CONCURRENCY,
+        rpm=AI_RPM,
+        tpm=AI_TPM,
+    )
+    stats = client.run_sync([_ai_sim_request(batch) for batch in batches], _on_done)
+    print(f"[AI-SIM] {len(pairs)}쌍 / {len(batches)}배치: {stats}")
 
 
 def _to_plain_text(html_content: str) -> str:
@@ -288,58 +392,336 @@ def _normalize_tag_list(tags: list[str]) -> list[str]:
     return out
 
 
-def _build_tag_centroids(min_docs: int = 1) -> tuple[dict[str, np.ndarray], dict[str, int]]:
+def _content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _chunk_spans(text: str) -> list[tuple[int, int]]:
+    """문서 본문 → 청크 문자 구간 (임베딩 모델 tokenizer 기준 토큰 창)."""
+    model = _get_embed_model()
+    if model is None:
+        return [(0, len(text or ""))]
+    return model.chunk(text or "", CHUNK_TOKENS, CHUNK_OVERLAP)
+
+
+def _chunk_texts(text: str) -> list[str]:
+    return [text[start:end] for start, end in _chunk_spans(text)]
+
+
+def _encode_chunks(texts: list[str]) -> np.ndarray:
     """
-    태그별 컨텍스트 임베딩 centroid 생성.
-    - 단위: 문서 본문 임베딩
-    - 태그 벡터: 해당 태그가 붙은 문서 임베딩의 평균
+    청크 임베딩 (청크 내용 해시 캐시). 캐시에 없는 청크만 batch encode 후 저장하므로
+    문서 일부만 바뀌면 나머지 청크는 다시 encode하지 않는다.
     """
-    if embed_model is None:
-        return {}, {}
+    model = _get_embed_model()
+    hashes = [_content_hash(t) for t in texts]
+    unique = list(dict.fromkeys(hashes))
+    try:
+        cached = db_service.get_chunk_embeddings(unique, CHUNK_EMBED_MODEL)
+    except Exception:
+        cached = {}
+    missing = [h for h in unique if h not in cached]
+    if missing:
+        first_text = {}
+        for digest, text in zip(hashes, texts):
+            first_text.setdefault(digest, text)
+        vectors = model.encode([first_text[h] for h in missing])
+        rows = []
+        for digest, vec in zip(missing, vectors):
+            emb = np.asarray(vec, dtype=np.float32)
+            cached[digest] = emb
+            rows.append({"chunkHash": digest, "vector": emb})
+        try:
+            db_service.save_chunk_embeddings(rows, CHUNK_EMBED_MODEL)
+        except Exception:
+            pass
+    if not hashes:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([np.asarray(cached[h], dtype=np.float32) for h in hashes])
 
-    tag_sum_vectors: dict[str, np.ndarray] = {}
-    tag_counts: dict[str, int] = {}
 
-    for item in list_docs():
-        doc_id = item.get("id")
-        if not doc_id:
-            continue
-        tags = _normalize_tag_list([str(t) for t in (item.get("tags") or [])])
-        if not tags:
-            continue
-        detail = get_doc(doc_id)
-        if not detail:
-            continue
-        text = _to_plain_text(detail.get("content", ""))
-        if len(text) < 10:
-            continue
+def _get_doc_embeddings(doc_texts: dict[str, str]) -> dict[str, np.ndarray]:
+    """
+    문서 본문 임베딩 조회 (content-hash 캐시).
+    - docId + 본문 SHA-256 + 모델명이 캐시와 일치하면 재사용
+    - 새 문서/수정된 문서는 청크로 나눠 한 번에 배치 encode(바뀌지 않은 청크는 캐시) 후
+      청크 벡터를 풀링한 문서 벡터와 청크 구성을 저장
+    """
+    model = _get_embed_model()
+    if model is None or not doc_texts:
+        return {}
+
+    doc_ids = list(doc_texts.keys())
+    hashes = {doc_id: _content_hash(doc_texts[doc_id]) for doc_id in doc_ids}
+    try:
+        cached = db_service.get_doc_embeddings(doc_ids, DOC_EMBED_MODEL)
+    except Exception:
+        cached = {}
+
+    result: dict[str, np.ndarray] = {}
+    missing: list[str] = []
+    for doc_id in doc_ids:
+        hit = cached.get(doc_id)
+        if hit and hit[0] == hashes[doc_id]:
+            result[doc_id] = np.asarray(hit[1], dtype=np.float32)
+        else:
+            missing.append(doc_id)
+
+    if missing:
+        spans = {doc_id: _chunk_spans(doc_texts[doc_id]) for doc_id in missing}
+        chunk_texts = [doc_texts[d][start:end] for d in missing for start, end in spans[d]]
         try:
-            emb = np.asarray(embed_model.encode([text])[0], dtype=np.float32)
+            chunk_vectors = _encode_chunks(chunk_texts)
         except Exception:
-            continue
-        for tag in tags:
-            if tag in tag_sum_vectors:
-                tag_sum_vectors[tag] = tag_sum_vectors[tag] + emb
-                tag_counts[tag] = tag_counts[tag] + 1
+            return result
+        to_save: list[dict] = []
+        chunk_rows: dict[str, list[dict]] = {}
+        offset = 0
+        for doc_id in missing:
+            doc_spans = spans[doc_id]
+            vectors = chunk_vectors[offset:offset + len(doc_spans)]
+            emb = embedding_service.pool_chunks(vectors, [end - start for start, end in doc_spans])
+            result[doc_id] = emb
+            to_save.append({"docId": doc_id, "contentHash": hashes[doc_id], "vector": emb})
+            chunk_rows[doc_id] = [
+                {"chunkHash": _content_hash(chunk_texts[offset + i]), "start": start, "end": end}
+                for i, (start, end) in enumerate(doc_spans)
+            ]
+            offset += len(doc_spans)
+        try:
+            db_service.save_doc_embeddings(to_save, DOC_EMBED_MODEL)
+            db_service.replace_doc_chunks(chunk_rows, CHUNK_EMBED_MODEL)
+        except Exception:
+            pass
+        print(
+            f"[EMBED] 캐시 히트: {len(doc_ids) - len(missing)}, 새 문서: {len(missing)}"
+            f" (청크 {len(chunk_texts)}개)"
+        )
+    return result
+
+
+_centroid_lock = threading.Lock()
+
+
+def _update_tag_centroids(
+    doc_ids: list[str],
+    doc_tags: Optional[dict[str, list[str]]] = None,
+) -> set[str]:
+    """
+    문서 변경분만큼 태그별 임베딩 합계/문서 수를 갱신 (증분 centroid).
+    - 문서의 이전 기여분(tag_centroid_members)을 빼고 현재 기여분을 더한다
+    - 변경 문서의 이전/현재 태그 centroid만 다시 계산해 저장
+    doc_tags: 정규화된 문서별 태그 맵 (없으면 문서별로 조회)
+    반환: centroid가 바뀐 태그 집합
+    """
+    if _get_embed_model() is None or not doc_ids:
+        return set()
+    doc_ids = list(dict.fromkeys(doc_ids))
+
+    with _centroid_lock:
+        previous = db_service.get_tag_centroid_members(doc_ids, DOC_EMBED_MODEL)
+        current_tags: dict[str, list[str]] = {}
+        doc_texts: dict[str, str] = {}
+        for doc_id in doc_ids:
+            if doc_tags is not None:
+                tags = doc_tags.get(doc_id, [])
             else:
-                tag_sum_vectors[tag] = emb.copy()
-                tag_counts[tag] = 1
-
-    centroids: dict[str, np.ndarray] = {}
-    counts: dict[str, int] = {}
-    for tag, vec_sum in tag_sum_vectors.items():
-        c = tag_counts.get(tag, 0)
-        if c >= max(1, min_docs):
-            centroids[tag] = vec_sum / float(c)
-            counts[tag] = c
+                tags = _normalize_tag_list([str(t) for t in (get_tags_for_doc(doc_id) or [])])
+            if not tags:
+                continue
+            detail = get_doc(doc_id)
+            if not detail:
+                continue
+            current_tags[doc_id] = tags
+            text = _to_plain_text(detail.get("content", ""))
+            if len(text) >= 10:
+                doc_texts[doc_id] = text
+
+        embeddings = _get_doc_embeddings(doc_texts)
+
+        sum_deltas: dict[str, np.ndarray] = {}
+        count_deltas: dict[str, int] = {}
+
+        def _apply(tags: list[str], vec: np.ndarray, sign: int):
+            for tag in tags:
+                if tag in sum_deltas:
+                    sum_deltas[tag] = sum_deltas[tag] + sign * vec
+                else:
+                    sum_deltas[tag] = sign * vec
+                count_deltas[tag] = count_deltas.get(tag, 0) + sign
+
+        members: list[dict] = []
+        removed: list[str] = []
+        for doc_id in doc_ids:
+            old = previous.get(doc_id)
+            if doc_id not in current_tags:
+                # 삭제/휴지통 이동/태그 없음 → 기여분 제거
+                if old:
+                    if old["vector"]:
+                        _apply(old["tags"], np.asarray(old["vector"], dtype=np.float64), -1)
+                    removed.append(doc_id)
+                continue
+            if doc_id in doc_texts and doc_id not in embeddings:
+                continue  # encode 실패 — 이전 기여분 유지, 다음 변경 때 재시도
+            tags = current_tags[doc_id]
+            emb = embeddings.get(doc_id)
+            content_hash = _content_hash(doc_texts.get(doc_id, ""))
+            if old and old["tags"] == tags and old["contentHash"] == content_hash:
+                continue
+            if old and old["vector"]:
+                _apply(old["tags"], np.asarray(old["vector"], dtype=np.float64), -1)
+            if emb is not None:
+                _apply(tags, emb.astype(np.float64), 1)
+            members.append({
+                "docId": doc_id,
+                "tags": tags,
+                "contentHash": content_hash,
+                "vector": emb if emb is not None else [],
+            })
+
+        touched = sorted(count_deltas.keys())
+        if not members and not removed:
+            return set()
+
+        sums = db_service.get_tag_vector_sums(touched, DOC_EMBED_MODEL)
+        tag_rows: list[dict] = []
+        for tag in touched:
+            prev_sum, prev_count = sums.get(tag, (None, 0))
+            count = prev_count + count_deltas[tag]
+            if prev_sum is not None and len(prev_sum) == len(sum_deltas[tag]):
+                vec_sum = np.asarray(prev_sum, dtype=np.float64) + sum_deltas[tag]
+            else:
+                vec_sum = sum_deltas[tag]
+            if count <= 0:
+                tag_rows.append({"tag": tag, "docCount": 0})
+                continue
+            tag_rows.append({
+                "tag": tag,
+                "sum": vec_sum,
+                "vector": (vec_sum / float(count)).astype(np.float32),
+                "docCount": count,
+            })
+        db_service.apply_tag_centroid_changes(members, removed, tag_rows, DOC_EMBED_MODEL)
+        return set(touched)
+
+
+def _safe_update_tag_centroids(doc_ids: list[str]) -> set[str]:
+    try:
+        return _update_tag_centroids(doc_ids)
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return set()
+
+
+def _sync_tag_centroids(doc_tags: dict[str, list[str]]) -> set[str]:
+    """
+    centroid 상태와 현재 문서 목록을 대조해 빠지거나 새로 생긴 문서만 반영.
+    상태가 비어 있는 최초 1회에는 태그가 있는 전체 문서가 대상이 된다.
+    """
+    known = set(db_service.list_tag_centroid_member_ids(DOC_EMBED_MODEL))
+    targets = [d for d in known if d not in doc_tags]
+    targets += [d for d in doc_tags if d not in known]
+    if not targets:
+        return set()
+    return _update_tag_centroids(targets, doc_tags=doc_tags)
+
+
+def _build_tag_centroids(
+    min_docs: int = 1,
+    doc_tags: Optional[dict[str, list[str]]] = None,
+    sync: bool = True,
+) -> tuple[dict[str, np.ndarray], dict[str, int]]:
+    """
+    태그별 컨텍스트 임베딩 centroid 조회.
+    - 단위: 문서 본문 임베딩 (content-hash 캐시 경유)
+    - 태그 벡터: 해당 태그가 붙은 문서 임베딩의 평균 (증분 유지되는 합계/개수 기반)
+    sync=False: 호출자가 이미 _sync_tag_centroids를 실행한 경우 (그래프 재계산)
+    """
+    if _get_embed_model() is None:
+        return {}, {}
+    if doc_tags is None:
+        doc_tags, _ = _collect_doc_tags()
+    if sync:
+        _sync_tag_centroids(doc_tags)
+
+    matrix, index, doc_counts = db_service.load_tag_embedding_matrix(
+        DOC_EMBED_MODEL, min_docs=max(1, min_docs)
+    )
+    centroids = {tag: matrix[i] for tag, i in index.items()}
+    counts = {tag: int(doc_counts[i]) for tag, i in index.items()}
     return centroids, counts
 
 
+def _score_doc_pair(
+    a: str,
+    b: str,
+    shared: set[str],
+    doc_tags: dict[str, list[str]],
+    tag_sims: dict[tuple[str, str], float],
+    top_n: int,
+) -> dict:
+    """공통 태그가 있는 문서쌍의 edge 후보 (cross-tag 상위 top_n 유사도 평균)."""
+    def _get_sim(ta: str, tb: str) -> float:
+        if ta == tb:
+            return 1.0
+        key = (ta, tb) if ta <= tb else (tb, ta)
+        return tag_sims.get(key, 0.0)
+
+    pair_scores: list[tuple[float, str, str]] = []
+    for ta in doc_tags[a]:
+        for tb in doc_tags[b]:
+            pair_scores.append((_get_sim(ta, tb), ta, tb))
+    pair_scores.sort(key=lambda x: (-x[0], x[1], x[2]))
+    picked = pair_scores[: max(1, min(top_n, len(pair_scores)))]
+    doc_sim = float(sum(s for s, _, _ in picked) / len(picked))
+
+    evidence: list[dict] = [{"sharedTags": sorted(shared)}]
+    for score, ta, tb in picked:
+        evidence.append({"tagA": ta, "tagB": tb, "similarity": round(score, 4)})
+
+    return {
+        "sourceDocId": a, "targetDocId": b,
+        "weight": round(doc_sim, 6),
+        "distance": round(1.0 - doc_sim, 6),
+        "evidence": evidence,
+    }
+
+
+def _select_edges(
+    candidates: list[dict],
+    threshold: float,
+    k_per_node: int,
+    fixed: Optional[list[dict]] = None,
+) -> list[dict]:
+    """
+    weight 내림차순으로 edge 선택. threshold 미만 edge는 양 끝 노드 degree가
+    k_per_node 미만일 때만 채택한다.
+    fixed: 재계산 대상이 아닌 기존 edge — 항상 유지되며 degree 계산에만 반영
+    """
+    rows = [(row, False) for row in candidates] + [(row, True) for row in (fixed or [])]
+    rows.sort(key=lambda x: (-x[0]["weight"], x[0]["sourceDocId"]))
+
+    selected: list[dict] = []
+    degree: dict[str, int] = {}
+    for row, is_fixed in rows:
+        s, t = row["sourceDocId"], row["targetDocId"]
+        if not is_fixed:
+            if row["weight"] < threshold:
+                if degree.get(s, 0) >= k_per_node or degree.get(t, 0) >= k_per_node:
+                    continue
+            selected.append(row)
+        degree[s] = degree.get(s, 0) + 1
+        degree[t] = degree.get(t, 0) + 1
+    return selected
+
+
 def _build_doc_edges_ai(
     tag_sims: dict[tuple[str, str], float],
     threshold: float = TAG_EDGE_THRESHOLD_AI,
     top_n: int = TAG_EDGE_TOP_N,
     k_per_node: int = TAG_EDGE_K,
+    doc_tags: Optional[dict[str, list[str]]] = None,
 ) -> list[dict]:
     """
     문서-문서 edge 생성 (공통 태그 게이트 + AI 태그 유사도 가중치).
@@ -348,73 +730,109 @@ def _build_doc_edges_ai(
       2. 연결 강도(weight)는 AI가 판단한 cross-tag 유사도로 결정
       3. threshold 미만이면 제외, 노드당 k_per_node 제한 적용
     """
-    items = list_docs()
-    doc_tags: dict[str, list[str]] = {}
-    for item in items:
-        doc_id = str(item.get("id") or "").strip()
-        if not doc_id:
-            continue
-        tags = _normalize_tag_list([str(t) for t in (item.get("tags") or [])])
-        if tags:
-            doc_tags[doc_id] = tags
-
-    doc_ids = sorted(doc_tags.keys())
-    if len(doc_ids) < 2:
+    if doc_tags is None:
+        doc_tags, _ = _collect_doc_tags()
+    if len(doc_tags) < 2:
         return []
 
-    def _get_sim(a: str, b: str) -> float:
-        if a == b:
-            return 1.0
-        key = (a, b) if a <= b else (b, a)
-        return tag_sims.get(key, 0.0)
-
-    candidates: list[dict] = []
-    n = len(doc_ids)
-    for i in range(n):
-        a = doc_ids[i]
-        set_a = set(doc_tags[a])
-        for j in range(i + 1, n):
-            b = doc_ids[j]
-            set_b = set(doc_tags[b])
-            shared = set_a & set_b
-            if not shared:
-                continue
-
-            pair_scores: list[tuple[float, str, str]] = []
-            for ta in doc_tags[a]:
-                for tb in doc_tags[b]:
-                    pair_scores.append((_get_sim(ta, tb), ta, tb))
-            pair_scores.sort(key=lambda x: (-x[0], x[1], x[2]))
-            picked = pair_scores[: max(1, min(top_n, len(pair_scores)))]
-            doc_sim = float(sum(s for s, _, _ in picked) / len(picked))
-
-            evidence: list[dict] = [{"sharedTags": sorted(shared)}]
-            for score, ta, tb in picked:
-                evidence.append({"tagA": ta, "tagB": tb, "similarity": round(score, 4)})
-
-            candidates.append({
-                "sourceDocId": a, "targetDocId": b,
-                "weight": round(doc_sim, 6),
-                "distance": round(1.0 - doc_sim, 6),
-                "evidence": evidence,
-            })
-
+    candidates = [
+        _score_doc_pair(a, b, shared, doc_tags, tag_sims, top_n)
+        for a, b, shared in semantic_service.iter_cotagged_pairs(doc_tags)
+    ]
     if not candidates:
         return []
+    return _select_edges(candidates, threshold, k_per_node)
 
-    candidates.sort(key=lambda x: (-x["weight"], x["sourceDocId"]))
 
-    selected: list[dict] = []
-    degree: dict[str, int] = {}
-    for row in candidates:
-        s, t = row["sourceDocId"], row["targetDocId"]
-        if row["weight"] < threshold:
-            if degree.get(s, 0) >= k_per_node or degree.get(t, 0) >= k_per_node:
-                continue
-        selected.append(row)
-        degree[s] = degree.get(s, 0) + 1
-        degree[t] = degree.get(t, 0) + 1
-    return selected
+def _incremental_edge_scope(
+    doc_tags: dict[str, list[str]],
+    changed_doc_ids: list[str],
+    touched_tags: set[str],
+) -> tuple[set[str], list[tuple[str, str, set[str]]], list[dict]]:
+    """
+    증분 재계산 범위.
+    - 영향 노드: 변경 문서 + 변경 문서의 태그/centroid가 바뀐 태그를 공유하는 문서
+      + 변경 문서와 기존 edge로 연결된 문서
+    - 후보 쌍: 영향 노드를 한쪽 끝으로 하는 공통 태그 문서쌍
+    반환: (영향 노드, 후보 쌍, 영향 노드에 걸린 기존 edge)
+    """
+    postings = semantic_service.build_tag_postings(doc_tags)
+    changed = set(changed_doc_ids)
+    existing_changed = db_service.list_graph_edges_for_docs(sorted(changed), TAG_EDGE_TYPE)
+
+    affected = set(changed)
+    scope_tags = set(touched_tags)
+    for doc_id in changed:
+        scope_tags.update(doc_tags.get(doc_id, []))
+    for tag in scope_tags:
+        affected.update(postings.get(tag, []))
+    for row in existing_changed:
+        affected.add(row["sourceDocId"])
+        affected.add(row["targetDocId"])
+
+    pairs: dict[tuple[str, str], set[str]] = {}
+    for a in affected:
+        for tag in doc_tags.get(a, []):
+            for b in postings.get(tag, []):
+                if b == a:
+                    continue
+                key = (a, b) if a < b else (b, a)
+                pairs.setdefault(key, set()).add(tag)
+    candidate_pairs = [(a, b, shared) for (a, b), shared in sorted(pairs.items())]
+    existing = db_service.list_graph_edges_for_docs(sorted(affected), TAG_EDGE_TYPE)
+    return affected, candidate_pairs, existing
+
+
+def _apply_incremental_edges(
+    affected: set[str],
+    candidate_pairs: list[tuple[str, str, set[str]]],
+    existing: list[dict],
+    doc_tags: dict[str, list[str]],
+    tag_sims: dict[tuple[str, str], float],
+    threshold: float,
+    top_n: int,
+    k_per_node: int,
+    model: str,
+) -> dict:
+    """
+    영향 노드에 걸린 edge만 다시 선택해 달라진 행만 upsert/delete.
+    영향 범위 밖 노드의 degree는 해당 노드의 기존 edge로 채워 k_per_node 제한을 유지한다.
+    """
+    candidates = [
+        _score_doc_pair(a, b, shared, doc_tags, tag_sims, top_n)
+        for a, b, shared in candidate_pairs
+    ]
+    outside = {
+        n
+        for row in candidates
+        for n in (row["sourceDocId"], row["targetDocId"])
+        if n not in affected
+    }
+    fixed = [
+        row
+        for row in db_service.list_graph_edges_for_docs(sorted(outside), TAG_EDGE_TYPE)
+        if row["sourceDocId"] not in affected and row["targetDocId"] not in affected
+    ]
+    selected = _select_edges(candidates, threshold, k_per_node, fixed=fixed)
+
+    old = {(r["sourceDocId"], r["targetDocId"]): r for r in existing}
+    new = {(r["sourceDocId"], r["targetDocId"]): r for r in selected}
+    upserts = [
+        row
+        for key, row in new.items()
+        if key not in old
+        or old[key]["weight"] != row["weight"]
+        or old[key]["distance"] != row["distance"]
+        or old[key]["evidence"] != row["evidence"]
+    ]
+    deletes = [key for key in old if key not in new]
+    db_service.apply_graph_edge_changes(upserts, deletes, TAG_EDGE_TYPE, model)
+    return {
+        "affectedDocs": len(affected),
+        "edgeCount": len(selected),
+        "upserted": len(upserts),
+        "deleted": len(deletes),
+    }
 
 
 def _collect_doc_tags() -> tuple[dict[str, list[str]], list[str]]:
@@ -432,35 +850,39 @@ def _collect_doc_tags() -> tuple[dict[str, list[str]], list[str]]:
     return doc_tags, sorted(all_tags)
 
 
-def _collect_needed_pairs(doc_tags: dict[str, list[str]]) -> set[tuple[str, str]]:
-    """공통 태그가 있는 문서쌍에서 필요한 태그 쌍만 수집."""
+def _collect_needed_pairs(
+    doc_tags: dict[str, list[str]],
+    doc_pairs: Optional[list[tuple[str, str, set[str]]]] = None,
+) -> set[tuple[str, str]]:
+    """공통 태그가 있는 문서쌍(doc_pairs 지정 시 해당 쌍만)에서 필요한 태그 쌍만 수집."""
     needed: set[tuple[str, str]] = set()
-    ids = sorted(doc_tags.keys())
-    for i, a in enumerate(ids):
-        set_a = set(doc_tags[a])
-        for b in ids[i + 1:]:
-            if set_a & set(doc_tags[b]):
-                for ta in doc_tags[a]:
-                    for tb in doc_tags[b]:
-                        if ta != tb:
-                            key = (ta, tb) if ta <= tb else (tb, ta)
-                            needed.add(key)
+    if doc_pairs is None:
+        doc_pairs = semantic_service.iter_cotagged_pairs(doc_tags)
+    for a, b, _ in doc_pairs:
+        for ta in doc_tags[a]:
+            for tb in doc_tags[b]:
+                if ta != tb:
+                    key = (ta, tb) if ta <= tb else (tb, ta)
+                    needed.add(key)
     return needed
 
 
 def _build_centroid_sims(
     centroids: dict[str, np.ndarray],
+    needed_pairs: Optional[set[tuple[str, str]]] = None,
+    top_k: Optional[int] = None,
 ) -> dict[tuple[str, str], float]:
-    """centroid 벡터 간 cosine similarity 딕셔너리."""
-    norm_c = {t: float(np.linalg.norm(v)) for t, v in centroids.items()}
-    sims: dict[tuple[str, str], float] = {}
-    tags_c = list(centroids.keys())
-    for i, a in enumerate(tags_c):
-        for b in tags_c[i + 1:]:
-            key = (a, b) if a <= b else (b, a)
-            denom = norm_c[a] * norm_c[b] + 1e-12
-            sims[key] = float(np.dot(centroids[a], centroids[b]) / denom)
-    return sims
+    """
+    centroid 벡터 간 cosine similarity 딕셔너리 (NumPy 벡터화).
+    - needed_pairs: 문서 edge 계산에서 실제 조회하는 태그 쌍만 계산
+    - top_k: 태그별 상위 k개 이웃만 유지 (블록 행렬곱)
+    둘 다 없으면 전체 쌍 — 태그 수가 많을 때는 사용하지 말 것.
+    """
+    if needed_pairs is not None:
+        return semantic_service.centroid_pair_sims(centroids, needed_pairs)
+    if top_k is not None:
+        return semantic_service.centroid_topk_sims(centroids, top_k)
+    return semantic_service.centroid_topk_sims(centroids, max(0, len(centroids) - 1))
 
 
 def _rebuild_semantic_graph_edges(
@@ -468,12 +890,16 @@ def _rebuild_semantic_graph_edges(
     top_n: int = TAG_EDGE_TOP_N,
     k_per_node: int = TAG_EDGE_K,
     min_docs: int = 1,
+    changed_doc_ids: Optional[list[str]] = None,
+    touched_tags: Optional[set[str]] = None,
 ) -> dict:
     """
     engine:
       "auto"   — AI 키가 있으면 ai, 없으면 korean_centroid
       "ai"     — GPT-4o-mini 태그 유사도 (API 키 필요)
       "korean_centroid" — ko-sroberta-sts 한국어 centroid 유사도 (로컬)
+    changed_doc_ids: 지정 시 같은 모델의 기존 edge가 있으면 변경 문서 주변만 증분 재계산
+    touched_tags: centroid가 바뀐 태그 (증분 범위 확장용)
     """
     doc_tags, all_tags_list = _collect_doc_tags()
     if len(all_tags_list) < 2:
@@ -485,47 +911,59 @@ def _rebuild_semantic_graph_edges(
     if engine == "ai":
         if not AI_AVAILABLE:
             return {"status": "skipped", "reason": "OpenAI API key not set"}
-        needed = _collect_needed_pairs(doc_tags)
-        print(f"[REBUILD:ai] 태그 {len(all_tags_list)}개, 쌍 {len(needed)}개")
-        tag_sims = _compute_tag_similarities_ai(needed)
-        threshold = TAG_EDGE_THRESHOLD_AI
-        edge_rows = _build_doc_edges_ai(
-            tag_sims=tag_sims, threshold=threshold,
-            top_n=top_n, k_per_node=k_per_node,
-        )
         model_used = AI_SIM_MODEL
-
+        threshold = TAG_EDGE_THRESHOLD_AI
     elif engine == "korean_centroid":
-        if not EMBED_AVAILABLE or embed_model is None:
+        if _get_embed_model() is None:
             return {"status": "skipped", "reason": "embedding model unavailable"}
-        centroids, counts = _build_tag_centroids(min_docs=min_docs)
-        tag_rows = [
-            {"tag": t, "vector": v.tolist(), "docCount": counts.get(t, 0)}
-            for t, v in sorted(centroids.items())
-        ]
-        if CHROMA_AVAILABLE:
-            db_service.replace_tag_embeddings(tag_rows, EMBED_MODEL_NAME)
-        tag_sims_c = _build_centroid_sims(centroids)
-        threshold = TAG_EDGE_THRESHOLD_EMBED
-        print(f"[REBUILD:korean_centroid] 태그 {len(all_tags_list)}개, centroid {len(centroids)}개")
-        edge_rows = _build_doc_edges_ai(
-            tag_sims=tag_sims_c, threshold=threshold,
-            top_n=top_n, k_per_node=k_per_node,
-        )
         model_used = EMBED_MODEL_NAME
+        threshold = TAG_EDGE_THRESHOLD_EMBED
+        touched_tags = set(touched_tags or set()) | _sync_tag_centroids(doc_tags)
     else:
         return {"status": "skipped", "reason": f"unknown engine: {engine}"}
 
-    db_service.replace_graph_edges(edge_rows, TAG_EDGE_TYPE, model_used)
-    return {
+    incremental = (
+        changed_doc_ids is not None
+        and db_service.get_graph_edge_model(TAG_EDGE_TYPE) == model_used
+    )
+    if incremental:
+        affected, doc_pairs, existing = _incremental_edge_scope(
+            doc_tags, changed_doc_ids, touched_tags or set()
+        )
+        needed = _collect_needed_pairs(doc_tags, doc_pairs)
+    else:
+        needed = _collect_needed_pairs(doc_tags)
+
+    if engine == "ai":
+        print(f"[REBUILD:ai] 태그 {len(all_tags_list)}개, 쌍 {len(needed)}개")
+        tag_sims = _compute_tag_similarities_ai(needed)
+    else:
+        centroids, counts = _build_tag_centroids(min_docs=min_docs, doc_tags=doc_tags, sync=False)
+        tag_sims = _build_centroid_sims(centroids, needed_pairs=needed)
+        print(f"[REBUILD:korean_centroid] 태그 {len(all_tags_list)}개, centroid {len(centroids)}개")
+
+    summary = {
         "status": "ok",
         "engine": engine,
+        "mode": "incremental" if incremental else "full",
         "tagCount": len(all_tags_list),
-        "edgeCount": len(edge_rows),
         "threshold": threshold,
         "topN": top_n,
         "kPerNode": k_per_node,
     }
+    if incremental:
+        stats = _apply_incremental_edges(
+            affected, doc_pairs, existing, doc_tags, tag_sims,
+            threshold=threshold, top_n=top_n, k_per_node=k_per_node, model=model_used,
+        )
+        return {**summary, **stats}
+
+    edge_rows = _build_doc_edges_ai(
+        tag_sims=tag_sims, threshold=threshold,
+        top_n=top_n, k_per_node=k_per_node, doc_tags=doc_tags,
+    )
+    db_service.replace_graph_edges(edge_rows, TAG_EDGE_TYPE, model_used)
+    return {**summary, "edgeCount": len(edge_rows)}
 
 
 def _safe_rebuild_semantic_graph_edges(
@@ -534,6 +972,8 @@ def _safe_rebuild_semantic_graph_edges(
     top_n: int = TAG_EDGE_TOP_N,
     k_per_node: int = TAG_EDGE_K,
     min_docs: int = 1,
+    changed_doc_ids: Optional[list[str]] = None,
+    touched_tags: Optional[set[str]] = None,
     context: str = "",
 ) -> dict:
     try:
@@ -542,12 +982,131 @@ def _safe_rebuild_semantic_graph_edges(
             top_n=top_n,
             k_per_node=k_per_node,
             min_docs=min_docs,
+            changed_doc_ids=changed_doc_ids,
+            touched_tags=touched_tags,
         )
         return {"ok": True, "context": context, **res}
     except Exception as e:
         return {"ok": False, "context": context, "status": "error", "reason": str(e)}
 
 
+# 마지막으로 명시된 그래프 파라미터 (/api/graph/rebuild-semantic) — 예약·증분 재계산도 같은 값으로 계산.
+# 스케줄러 워커에서만 읽고 쓴다 (재계산은 직렬화됨).
+_GRAPH_PARAM_KEYS = ("top_n", "k_per_node", "min_docs")
+_graph_params: dict[str, int] = {"top_n": TAG_EDGE_TOP_N, "k_per_node": TAG_EDGE_K, "min_docs": 1}
+
+
+def _scheduled_rebuild(doc_ids: list[str], contexts: list[str], **options) -> dict:
+    """
+    스케줄러 워커에서 실행: 변경 문서의 centroid 증분 갱신 → 그래프 재계산.
+    옵션 없이 문서 변경분만 있으면 해당 문서 주변만 증분 재계산한다.
+    top_n/k_per_node/min_docs가 생략되면 마지막으로 명시된 값을 쓴다.
+    """
+    _graph_params.update({key: options[key] for key in _GRAPH_PARAM_KEYS if key in options})
+    touched = _safe_update_tag_centroids(doc_ids) if doc_ids else set()
+    if doc_ids and not options:
+        return _safe_rebuild_semantic_graph_edges(
+            context=",".join(contexts),
+            changed_doc_ids=doc_ids,
+            touched_tags=touched,
+            **_graph_params,
+        )
+    return _safe_rebuild_semantic_graph_edges(context=",".join(contexts), **{**_graph_params, **options})
+
+
+rebuild_scheduler = RebuildScheduler(_scheduled_rebuild, quiet_period=REBUILD_DEBOUNCE_SEC)
+
+
+def _doc_collection():
+    # vector_index 워커 스레드에서 호출 — warm-up 중이면 여기서 로드 완료를 기다린다
+    client = _get_chroma_client()
+    if client is None or _get_embed_model() is None:
+        raise RuntimeError("chroma or embedding model not available")
+    return client.get_or_create_collection(DOC_COLLECTION)
+
+
+def _vector_chunks(content: str) -> list[str]:
+    # Chroma에는 HTML을 걷어 낸 본문 청크를 저장 (청크별 해시로 바뀐 청크만 encode)
+    return _chunk_texts(_to_plain_text(content))
+
+
+# encode는 _encode_chunks 경유 — 문서 임베딩(_get_doc_embeddings)과 같은 청크라
+# chunk_embeddings 캐시를 공유해 청크당 한 번만 encode한다
+vector_index = VectorIndex(
+    _doc_collection, _encode_chunks, flush_interval=VECTOR_FLUSH_SEC, chunk_fn=_vector_chunks
+)
+
+
+def _vector_index_enabled() -> bool:
+    """
+    벡터 색인 쓰기 대상 여부 — 로드를 기다리거나 일으키지 않는다.
+    warm-up 전·중에도 True: 변경은 대기열에 올리고 vector_index 워커가 로드 완료를 기다려 반영.
+    """
+    return all(r.state in ("idle", "loading") or r.peek() is not None for r in (chroma_resource, embed_resource))
+
+
+def _vector_index_ready() -> bool:
+    """Chroma·임베딩 모델이 이미 로드됨 (검색 등 요청 안에서 바로 써야 하는 경로용)."""
+    return chroma_resource.peek() is not None and embed_resource.peek() is not None
+
+
+@app.on_event("shutdown")
+def _flush_pending_rebuild():
+    # 종료 전 대기 중인 변경분 반영 (centroid 증분 상태 유실 방지)
+    rebuild_scheduler.flush(timeout=30.0)
+    rebuild_scheduler.stop()
+    vector_index.flush(timeout=30.0)
+    vector_index.stop()
+    embedder = embed_resource.peek()
+    if embedder is not None:
+        embedder.stop()
+    doc_service.flush_meta()
+    http_client.close()
+
+
+# ─── 모델 warm-up / readiness ───────────────────────
+_LAZY_RESOURCES = (embed_resource, chroma_resource, kiwi_resource)
+
+
+def _warm_up_resources():
+    for resource in _LAZY_RESOURCES:
+        resource.get()
+
+
+@app.on_event("startup")
+def _start_warm_up():
+    # 서버는 바로 요청을 받고, 무거운 모델은 백그라운드에서 미리 로드
+    if WARMUP_ON_START:
+        threading.Thread(target=_warm_up_resources, name="model-warmup", daemon=True).start()
+
+
+@app.get("/api/ready")
+def api_ready():
+    """
+    구성 요소별 준비 상태. 문서 API는 항상 사용 가능하고(ready=true),
+    embedding/chroma/kiwi는 idle → loading → ready | error 순으로 바뀐다.
+    """
+    components = {resource.name: resource.status() for resource in _LAZY_RESOURCES}
+    components["embedding"]["config"] = EMBED_CONFIG.to_dict()
+    components["ai"] = {"state": "ready" if AI_AVAILABLE else "disabled", "error": None, "loadSeconds": None}
+    return {
+        "ready": True,
+        "warm": all(c["state"] in ("ready", "error", "disabled") for c in components.values()),
+        "components": components,
+    }
+
+
+@app.get("/api/embedding/status")
+def api_embedding_status():
+    """임베딩 백엔드 설정과 마이크로 배칭 지표 (대기열 깊이, 배치 크기)."""
+    embedder = embed_resource.peek()
+    return {
+        **embed_resource.status(),
+        "config": EMBED_CONFIG.to_dict(),
+        "batcher": embedder.stats() if embedder is not None else None,
+    }
+
+
 # ═══════════════════════════════════════════════════
 # Chroma 엔드포인트 (기존 유지)
 # ═══════════════════════════════════════════════════
@@ -566,40 +1125,153 @@ class QueryReq(BaseModel):
 
 @app.post("/upsert")
 def upsert(req: UpsertReq):
-    if not CHROMA_AVAILABLE:
+    client = _get_chroma_client()
+    if client is None:
         return {"status": "skipped", "reason": "chroma not available"}
-    coll = chroma_client.get_or_create_collection(req.collection)
+    coll = client.get_or_create_collection(req.collection)
     embeddings = None
     if req.documents:
-        embeddings = embed_model.encode(req.documents).tolist()
-    coll.add(
+        model = _get_embed_model()
+        if model is None:
+            return {"status": "skipped", "reason": "embedding model unavailable"}
+        embeddings = model.encode(req.documents).tolist()
+    # PersistentClient는 쓰기 시 자동 영속화 — 별도 persist() 불필요
+    coll.upsert(
         ids=req.ids,
-        documents=req.documents or [],
-        metadatas=req.metadatas or [],
+        documents=req.documents or None,
+        metadatas=req.metadatas or None,
         embeddings=embeddings,
     )
-    chroma_client.persist()
     return {"status": "ok", "count": len(req.ids)}
 
 
 @app.post("/query")
 def query(req: QueryReq):
-    if not CHROMA_AVAILABLE:
+    client = _get_chroma_client()
+    if client is None or _get_embed_model() is None:
         return {"results": []}
-    coll = chroma_client.get_or_create_collection(req.collection)
+    coll = client.get_or_create_collection(req.collection)
     if req.query is None:
         return {"results": []}
-    q_emb = embed_model.encode([req.query]).tolist()[0]
+    q_emb = _query_embedding(req.query)
     res = coll.query(query_embeddings=[q_emb], n_results=req.top_k)
     return {"ids": res["ids"], "distances": res.get("distances", [])}
 
 
+# ─── 검색어 임베딩 LRU 캐시 ─────────────────────────
+# 반복 검색·타이핑 중 검색(type-ahead)은 같은 문자열이 잦아 encode를 건너뛴다
+QUERY_EMBED_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=QUERY_EMBED_CACHE_SIZE)
+def _encode_query_cached(text: str) -> tuple[float, ...]:
+    return tuple(_get_embed_model().encode([text])[0].tolist())
+
+
+def _query_embedding(text: str) -> list[float]:
+    return list(_encode_query_cached(" ".join(text.split())))
+
+
+# ═══════════════════════════════════════════════════
+# 전문 검색 색인 (db_service search_docs / doc_fts)
+# ═══════════════════════════════════════════════════
+SEARCH_SYNC_BATCH = 500
+_search_sync_lock = threading.Lock()
+_search_synced = False
+
+
+def _search_row(doc_id: str) -> Optional[dict]:
+    doc = get_doc(doc_id)
+    if doc is None:
+        return None
+    return {
+        "docId": doc["id"],
+        "title": doc["title"],
+        "body": _to_plain_text(doc.get("content", "")),
+        "tags": get_tags_for_doc(doc["id"]),
+        "updatedAt": doc.get("updatedAt", ""),
+    }
+
+
+def _index_docs_for_search(doc_ids: list[str]):
+    """문서 검색 색인 갱신 (없어진 문서는 색인에서 제거)."""
+    rows: list[dict] = []
+    missing: list[str] = []
+    for doc_id in doc_ids:
+        row = _search_row(doc_id)
+        if row is None:
+            missing.append(doc_id)
+        else:
+            rows.append(row)
+    db_service.upsert_search_docs(rows)
+    db_service.delete_search_docs(missing)
+
+
+def _safe_index_docs_for_search(doc_ids: list[str]):
+    try:
+        _index_docs_for_search(doc_ids)
+    except Exception:
+        pass
+
+
+def _sync_search_index() -> dict:
+    """
+    색인과 문서 메타를 비교해 변경(updatedAt/태그)·누락 문서만 다시 색인하고 삭제된 문서 제거.
+    기존 볼트의 최초 색인과 서버 밖에서 바뀐 문서 반영용.
+    """
+    indexed = db_service.list_search_doc_versions()
+    current = {d["id"]: (d.get("updatedAt", ""), " ".join(d.get("tags") or [])) for d in list_docs()}
+    stale = [doc_id for doc_id, version in current.items() if indexed.get(doc_id) != version]
+    removed = [doc_id for doc_id in indexed if doc_id not in current]
+    for start in range(0, len(stale), SEARCH_SYNC_BATCH):
+        _index_docs_for_search(stale[start:start + SEARCH_SYNC_BATCH])
+    db_service.delete_search_docs(removed)
+    return {"indexed": len(stale), "removed": len(removed), "total": len(current)}
+
+
+def _ensure_search_index():
+    """프로세스당 1회 색인 동기화 (이후에는 문서 변경 API가 색인을 갱신)."""
+    global _search_synced
+    if _search_synced:
+        return
+    with _search_sync_lock:
+        if not _search_synced:
+            _sync_search_index()
+            _search_synced = True
+
+
 # ═══════════════════════════════════════════════════
 # 문서 API
 # ═══════════════════════════════════════════════════
+DOC_PAGE_MAX = 500
+
+
 @app.get("/api/docs")
-def api_list_docs(folder: Optional[str] = None):
-    return list_docs(folder)
+def api_list_docs(
+    folder: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    updated_since: Optional[str] = None,
+):
+    """
+    limit/cursor 없이 호출하면 기존처럼 전체 목록(list),
+    있으면 {items, total, nextCursor} 페이지 (nextCursor를 다음 요청의 cursor로 전달).
+    """
+    paged = limit is not None or cursor is not None
+    if not paged and not tag and not updated_since:
+        return list_docs(folder)
+    if limit is not None:
+        limit = max(1, min(limit, DOC_PAGE_MAX))
+    elif paged:
+        limit = DOC_PAGE_MAX
+    try:
+        page = doc_service.list_docs_page(
+            limit=limit, cursor=cursor, folder=folder, tag=tag, updated_since=updated_since
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page if paged else page["items"]
 
 
 @app.get("/api/docs/{doc_id}")
@@ -628,21 +1300,6 @@ class OpenExternalReq(BaseModel):
 
 @app.post("/api/docs")
 def api_save_doc(req: SaveDocReq, id: str = ""):
-    new_id = save_doc(id, req.title, req.content)
-    # best-effort: SQLite meta + vector upsert
-    try:
-        from datetime import datetime, timezone
-        db_service.save_meta_document(new_id, req.title, datetime.now(timezone.utc).isoformat())
-    except Exception:
-        pass
-    try:
-        if CHROMA_AVAILABLE and req.content:
-            coll = chroma_client.get_or_create_collection("my_graph_collection")
-            emb = embed_model.encode([req.content]).tolist()
-            coll.add(ids=[new_id], documents=[req.content], metadatas=[{"title": req.title}], embeddings=emb)
-            chroma_client.persist()
-    except Exception:
-        pass
     # 자동 태그: #해시태그 + NLP 명사 추출 후 기존 태그와 병합
     extracted_all: list[str] = []
     if req.auto_tag and req.content:
@@ -652,28 +1309,48 @@ def api_save_doc(req: SaveDocReq, id: str = ""):
             pass
     if req.auto_tag_nlp and req.content:
         try:
-            extracted_all.extend(extract_keywords_nlp(req.content, top_k=AUTO_TAG_LIMIT))
+            extracted_all.extend(_extract_tags_cached(
+                "nlp", f"kiwi/k{AUTO_TAG_LIMIT}", req.content,
+                lambda: extract_keywords_nlp(req.content, top_k=AUTO_TAG_LIMIT),
+            ))
         except Exception:
             pass
     if req.auto_tag_ai and req.content and AI_AVAILABLE:
         try:
-            extracted_all.extend(_extract_keywords_ai(req.content, top_k=AUTO_TAG_LIMIT))
-        except Exception:
-            pass
-    if extracted_all:
-        try:
-            existing = get_tags_for_doc(new_id)
-            extracted_unique = list(dict.fromkeys(extracted_all))[:AUTO_TAG_LIMIT]
-            merged = list(dict.fromkeys(existing + extracted_unique))[:AUTO_TAG_LIMIT]
-            old_norm = set(_normalize_tag_list(existing))
-            new_norm = set(_normalize_tag_list(merged))
-            changed = old_norm ^ new_norm
-            if changed:
-                db_service.invalidate_tag_similarity_cache(list(changed), AI_SIM_MODEL)
-            set_tags_for_doc(new_id, merged)
+            extracted_all.extend(_extract_tags_cached(
+                "ai", f"{AI_TAG_MODEL}/k{AUTO_TAG_LIMIT}", req.content,
+                lambda: _extract_keywords_ai(req.content, top_k=AUTO_TAG_LIMIT),
+            ))
         except Exception:
             pass
-    rebuild = _safe_rebuild_semantic_graph_edges(context="save_doc")
+    # 문서 저장 + 태그 병합은 meta.json 한 번 기록으로 묶음
+    with doc_service.meta_batch():
+        new_id = save_doc(id, req.title, req.content)
+        if extracted_all:
+            try:
+                existing = get_tags_for_doc(new_id)
+                extracted_unique = list(dict.fromkeys(extracted_all))[:AUTO_TAG_LIMIT]
+                merged = list(dict.fromkeys(existing + extracted_unique))[:AUTO_TAG_LIMIT]
+                old_norm = set(_normalize_tag_list(existing))
+                new_norm = set(_normalize_tag_list(merged))
+                changed = old_norm ^ new_norm
+                if changed:
+                    db_service.invalidate_tag_similarity_cache(list(changed), AI_SIM_MODEL)
+                set_tags_for_doc(new_id, merged)
+            except Exception:
+                pass
+    _safe_index_docs_for_search([new_id])
+    # best-effort: SQLite meta + vector upsert (write-behind, 내용이 같으면 encode 생략)
+    try:
+        from datetime import datetime, timezone
+        db_service.save_meta_document(new_id, req.title, datetime.now(timezone.utc).isoformat())
+    except Exception:
+        pass
+    if _vector_index_enabled():
+        saved = get_doc(new_id)
+        title = saved["title"] if saved else (req.title or new_id)
+        vector_index.upsert(new_id, req.content, {"title": title})
+    rebuild = rebuild_scheduler.request("save_doc", [new_id])
     return {"id": new_id, "rebuild": rebuild}
 
 
@@ -720,6 +1397,12 @@ def api_network_status():
     return {"connected": _check_internet()}
 
 
+@app.get("/api/network/http-stats")
+def api_http_stats():
+    """공용 HTTP 클라이언트 지표 (요청 수, 새 연결/재사용 연결, HTTP/2 여부, 호스트별 요청 수)."""
+    return http_client.stats()
+
+
 @app.get("/api/ai/status")
 def api_ai_status():
     """AI(OpenAI) 사용 가능 여부: API 키로 연결 확인 + 사용 가능 모델 목록"""
@@ -742,40 +1425,13 @@ def api_ai_status():
     }
 
 
-def _fetch_url_meta(url: str) -> dict:
-    """URL 페이지에서 Open Graph / Twitter Card 메타 정보 추출"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    }
-    with httpx.Client(timeout=10, follow_redirects=True) as client:
-        r = client.get(url, headers=headers)
-        r.raise_for_status()
-        html = r.text
-
-    def _get_meta(prop: str) -> Optional[str]:
-        # property="og:title" content="..."
-        for pattern in [
-            rf'<meta[^>]+(?:property|name)=["\'](?:og:{prop}|twitter:{prop})["\'][^>]+content=["\']([^"\']+)["\']',
-            rf'<meta[^>]+content=["\']([^"\']+)["\'][^>]+(?:property|name)=["\'](?:og:{prop}|twitter:{prop})["\']',
-        ]:
-            m = re.search(pattern, html, re.I | re.DOTALL)
-            if m:
-                return m.group(1).strip()
-        return None
-
-    title = _get_meta("title")
-    if not title:
-        m = re.search(r"<title[^>]*>([^<]+)</title>", html, re.I)
-        title = m.group(1).strip() if m else url
+URL_ANALYZE_TEXT_CHARS = 12000  # AI 분석에 넘기는 본문 분량 (URL 캐시에도 이만큼 저장)
 
-    description = _get_meta("description")
-    image = _get_meta("image")
-    if image and image.startswith("/"):
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        image = f"{parsed.scheme}://{parsed.netloc}{image}"
 
-    return {"title": title, "description": description or "", "image": image or "", "url": url}
+def _fetch_url_meta(url: str) -> dict:
+    """URL 페이지에서 Open Graph / Twitter Card 메타 정보 추출 (URL 캐시 → <head>까지만 스트리밍으로 읽음)"""
+    entry, _ = url_ingest.load(url, timeout=10, max_text_chars=URL_ANALYZE_TEXT_CHARS)
+    return {**entry["meta"], "url": url}
 
 
 @app.get("/api/url-meta")
@@ -786,7 +1442,7 @@ def api_fetch_url_meta(url: str = ""):
         raise HTTPException(status_code=400, detail="Invalid URL")
     try:
         return _fetch_url_meta(u)
-    except httpx.HTTPError as e:
+    except (httpx.HTTPError, url_ingest.UrlFetchError) as e:
         raise HTTPException(status_code=502, detail=f"Failed to fetch URL: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -796,35 +1452,14 @@ def api_fetch_url_meta(url: str = ""):
 # URL 분석 → 문서 자동 생성
 # ═══════════════════════════════════════════════════
 
-def _fetch_page_text(url: str) -> tuple[str, str]:
-    """URL에서 전체 HTML을 가져온 뒤 본문 텍스트와 raw HTML 반환"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/120.0.0.0 Safari/537.36",
-        "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
-    }
-    with httpx.Client(timeout=20, follow_redirects=True) as client:
-        r = client.get(url, headers=headers)
-        r.raise_for_status()
-        html = r.text
-
-    body = re.sub(r"<script[^>]*>.*?</script>", " ", html, flags=re.I | re.S)
-    body = re.sub(r"<style[^>]*>.*?</style>", " ", body, flags=re.I | re.S)
-    body = re.sub(r"<[^>]+>", " ", body)
-    body = re.sub(r"\s+", " ", body).strip()
-    return body, html
-
-
 def _ai_analyze_url(url: str, page_text: str, meta: dict) -> dict:
     """GPT로 URL 페이지를 분석하여 제목, 요약, 태그를 생성"""
     if not AI_AVAILABLE:
         raise RuntimeError("OpenAI API 키가 설정되지 않았습니다")
 
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = http_client.openai_client(OPENAI_API_KEY)
 
-    truncated = page_text[:12000]
+    truncated = page_text[:URL_ANALYZE_TEXT_CHARS]
     meta_hint = ""
     if meta.get("title"):
         meta_hint += f"메타 제목: {meta['title']}\n"
@@ -897,14 +1532,13 @@ _FOLDER_TAXONOMY: list[str] = [
 
 
 def _ai_classify_folder(title: str, tags: list[str]) -> dict:
-    """AI가 문서를 적절한 폴더에 배치.
+    """AI가 문서에 맞는 폴더를 제안 (폴더는 만들지 않음 — created는 새 폴더 여부).
     우선순위: ① 사용자가 직접 만든 폴더 → ② 표준 분류 체계 → ③ '기타'
     """
     if not AI_AVAILABLE:
         return {"folder": "", "created": False}
 
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = http_client.openai_client(OPENAI_API_KEY)
 
     existing_folders = list_folders()
     tags_str = ", ".join(tags) if tags else "(없음)"
@@ -969,11 +1603,7 @@ JSON만 답해: {{"folder": "폴더명"}}"""
         if folder_name not in valid:
             folder_name = "기타"
 
-        is_new = folder_name not in existing_folders
-        if is_new:
-            create_folder(folder_name)
-
-        return {"folder": folder_name, "created": is_new}
+        return {"folder": folder_name, "created": folder_name not in existing_folders}
     except Exception:
         return {"folder": "", "created": False}
 
@@ -982,37 +1612,42 @@ class UrlAnalyzeReq(BaseModel):
     url: str
 
 
-@app.post("/api/url/analyze")
-def api_analyze_url(req: UrlAnalyzeReq):
-    """URL → 메타정보 + 본문 스크래핑 → AI 분석 (제목/요약/태그)"""
-    u = (req.url or "").strip()
-    if not u.startswith("http://") and not u.startswith("https://"):
-        raise HTTPException(status_code=400, detail="유효한 URL이 아닙니다 (http:// 또는 https://)")
-    if not AI_AVAILABLE:
-        raise HTTPException(status_code=503, detail="AI 미연결 — OpenAI API 키를 설정하세요")
-
-    try:
-        meta = _fetch_url_meta(u)
-    except Exception:
-        meta = {"title": u, "description": "", "image": "", "url": u}
-
+def _analyze_url(u: str, folder: Optional[str] = None) -> dict:
+    """
+    URL → 메타정보 + 본문 스크래핑 → AI 분석 (제목/요약/태그) → 폴더 분류.
+    folder를 주면 AI 폴더 분류 대신 그 폴더를 사용. 실패는 HTTPException.
+    폴더는 제안만 — 만드는 것은 호출한 쪽 (일괄 가져오기는 저장 트랜잭션 안에서).
+    """
+    # URL 캐시 → 없거나 만료되면 한 번만 받아 메타 정보와 본문 텍스트를 함께 추출 (바이트 상한 스트리밍)
     try:
-        page_text, _ = _fetch_page_text(u)
+        entry, _ = url_ingest.load(u, need_text=True, timeout=20, max_text_chars=URL_ANALYZE_TEXT_CHARS)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"페이지를 가져올 수 없습니다: {e}")
+    meta, page_text = {**entry["meta"], "url": u}, entry["text"]
 
     if len(page_text) < 20:
         raise HTTPException(status_code=422, detail="페이지에서 충분한 텍스트를 추출할 수 없습니다")
 
-    try:
-        analysis = _ai_analyze_url(u, page_text, meta)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI 분석 실패: {e}")
+    # 같은 본문·모델로 분석한 결과가 있으면 재사용 (폴더 분류는 현재 폴더 목록 기준이라 매번 수행)
+    analysis = entry["analysis"] if entry.get("analysisModel") == AI_TAG_MODEL else None
+    cached = analysis is not None
+    if analysis is None:
+        try:
+            analysis = _ai_analyze_url(u, page_text, meta)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"AI 분석 실패: {e}")
+        try:
+            url_ingest.save_analysis(u, analysis, AI_TAG_MODEL)
+        except Exception:
+            pass
 
     ai_title = analysis.get("title", meta.get("title", u))
     ai_tags = analysis.get("tags", [])
 
-    folder_result = _ai_classify_folder(ai_title, ai_tags)
+    if folder is None:
+        folder_result = _ai_classify_folder(ai_title, ai_tags)
+    else:
+        folder_result = {"folder": folder, "created": False}
 
     return {
         "url": u,
@@ -1023,17 +1658,209 @@ def api_analyze_url(req: UrlAnalyzeReq):
         "image": meta.get("image", ""),
         "folder": folder_result.get("folder", ""),
         "folderCreated": folder_result.get("created", False),
+        "cached": cached,
     }
 
 
+def _check_analyze_request(u: str):
+    if not u.startswith("http://") and not u.startswith("https://"):
+        raise HTTPException(status_code=400, detail="유효한 URL이 아닙니다 (http:// 또는 https://)")
+
+
+@app.post("/api/url/analyze")
+def api_analyze_url(req: UrlAnalyzeReq):
+    """URL → 메타정보 + 본문 스크래핑 → AI 분석 (제목/요약/태그)"""
+    u = (req.url or "").strip()
+    _check_analyze_request(u)
+    if not AI_AVAILABLE:
+        raise HTTPException(status_code=503, detail="AI 미연결 — OpenAI API 키를 설정하세요")
+    result = _analyze_url(u)
+    if result["folderCreated"]:
+        create_folder(result["folder"])
+    return result
+
+
+# ─── URL 일괄 가져오기 ─────────────────────────────────────────────────────────
+URL_IMPORT_MAX = int(os.environ.get("MY_GRAPH_URL_IMPORT_MAX", "1000"))
+URL_IMPORT_CONCURRENCY = int(os.environ.get("MY_GRAPH_URL_IMPORT_CONCURRENCY", "4"))
+URL_IMPORT_PER_HOST = int(os.environ.get("MY_GRAPH_URL_IMPORT_PER_HOST", "2"))
+
+
+class UrlImportReq(BaseModel):
+    urls: List[str]
+    folder: Optional[str] = None  # 지정하면 AI 폴더 분류 대신 이 폴더에 배치
+    concurrency: Optional[int] = None
+
+
+def _url_doc_content(url: str, title: str, summary: str) -> str:
+    """UrlSavePanel 저장 형식과 같은 문서 본문 (원본 링크 머리말 + 제목 + 요약)."""
+    link = html_lib.escape(url, quote=True)
+    return (
+        f'<p>🔗 <strong>원본 링크</strong><br/><a href="{link}" target="_blank" rel="noopener noreferrer">{link}</a></p><hr/>'
+        f"<h2>{html_lib.escape(title)}</h2><p>{html_lib.escape(summary)}</p>"
+    )
+
+
+def _save_imported_docs(results: list[tuple[int, dict]]) -> list[tuple[int, Optional[str], Optional[str]]]:
+    """
+    분석 결과를 문서로 저장 — 폴더 생성과 문서 메타 변경은 한 트랜잭션.
+    반환: [(index, docId | None, error | None)]
+    """
+    saved: list[tuple[int, Optional[str], Optional[str]]] = []
+    changed_tags: set[str] = set()
+    with doc_service.meta_batch():
+        existing_folders = set(list_folders())
+        for name in dict.fromkeys(r["folder"] for _, r in results if r["folder"]):
+            if name not in existing_folders:
+                create_folder(name)
+        for index, r in results:
+            try:
+                doc_id = save_doc(
+                    f"url_{uuid.uuid4().hex[:12]}", r["title"], _url_doc_content(r["url"], r["title"], r["summary"])
+                )
+                if r["folder"]:
+                    set_doc_folder(doc_id, r["folder"])
+                tags = list(dict.fromkeys(r["tags"]))[:AUTO_TAG_LIMIT]
+                if tags:
+                    set_tags_for_doc(doc_id, tags)
+                    changed_tags.update(_normalize_tag_list(tags))
+                saved.append((index, doc_id, None))
+            except Exception as e:
+                saved.append((index, None, str(e)))
+
+    doc_ids = [doc_id for _, doc_id, _ in saved if doc_id]
+    if changed_tags:
+        db_service.invalidate_tag_similarity_cache(list(changed_tags), AI_SIM_MODEL)
+    _safe_index_docs_for_search(doc_ids)
+    now = datetime.now(timezone.utc).isoformat()
+    by_index = dict(results)
+    for index, doc_id, _ in saved:
+        if not doc_id:
+            continue
+        r = by_index[index]
+        try:
+            db_service.save_meta_document(doc_id, r["title"], now)
+        except Exception:
+            pass
+        if _vector_index_enabled():
+            vector_index.upsert(doc_id, _url_doc_content(r["url"], r["title"], r["summary"]), {"title": r["title"]})
+    return saved
+
+
+def _import_url_events(urls: list[str], folder: Optional[str], concurrency: int) -> Iterator[str]:
+    """NDJSON 이벤트: start → (analyzed | error | skipped)* → (saved | error)* → done"""
+
+    def emit(event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False) + "\n"
+
+    yield emit({"type": "start", "total": len(urls)})
+    pending: dict[int, str] = {}
+    seen: set[str] = set()
+    failed = 0
+    for index, u in enumerate(urls):
+        try:
+            _check_analyze_request(u)
+        except HTTPException as e:
+            failed += 1
+            yield emit({"type": "error", "index": index, "url": u, "status": e.status_code, "error": e.detail})
+            continue
+        key = url_ingest.normalize_url(u)
+        if key in seen:
+            yield emit({"type": "skipped", "index": index, "url": u, "reason": "duplicate"})
+            continue
+        seen.add(key)
+        pending[index] = u
+
+    host_slots: dict[str, threading.BoundedSemaphore] = {}
+    slots_lock = threading.Lock()
+
+    def _one(u: str) -> dict:
+        # 같은 호스트는 URL_IMPORT_PER_HOST개까지만 동시에 받고(캐시에 적재), AI 단계는 캐시를 읽는다
+        host = urlsplit(u).hostname or ""
+        with slots_lock:
+            slot = host_slots.setdefault(host, threading.BoundedSemaphore(max(1, URL_IMPORT_PER_HOST)))
+        with slot:
+            try:
+                url_ingest.load(u, need_text=True, timeout=20, max_text_chars=URL_ANALYZE_TEXT_CHARS)
+            except Exception:
+                pass  # 실패는 캐시된 실패로 _analyze_url이 보고
+        return _analyze_url(u, folder=folder)
+
+    analyzed: list[tuple[int, dict]] = []
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="url-import")
+    try:
+        futures = {pool.submit(_one, u): index for index, u in pending.items()}
+        for future in as_completed(futures):
+            index = futures[future]
+            u = pending[index]
+            try:
+                result = future.result()
+            except HTTPException as e:
+                failed += 1
+                yield emit({"type": "error", "index": index, "url": u, "status": e.status_code, "error": e.detail})
+                continue
+            except Exception as e:
+                failed += 1
+                yield emit({"type": "error", "index": index, "url": u, "status": 500, "error": str(e)})
+                continue
+            analyzed.append((index, result))
+            yield emit({
+                "type": "analyzed", "index": index, "url": u, "title": result["title"],
+                "tags": result["tags"], "folder": result["folder"], "cached": result["cached"],
+            })
+    finally:
+        # 클라이언트가 끊으면 아직 시작하지 않은 작업은 취소
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    analyzed.sort(key=lambda item: item[0])
+    doc_ids: list[str] = []
+    for index, doc_id, error in _save_imported_docs(analyzed):
+        if doc_id:
+            doc_ids.append(doc_id)
+            yield emit({"type": "saved", "index": index, "url": pending[index], "id": doc_id})
+        else:
+            failed += 1
+            yield emit({"type": "error", "index": index, "url": pending[index], "status": 500, "error": error})
+    rebuild = rebuild_scheduler.request("url_import", doc_ids) if doc_ids else None
+    yield emit({"type": "done", "created": len(doc_ids), "failed": failed, "rebuild": rebuild})
+
+
+@app.post("/api/url/import")
+def api_import_urls(req: UrlImportReq):
+    """
+    URL 목록 일괄 가져오기 — 진행 상황을 NDJSON으로 스트리밍.
+    가져오기·AI 분석·폴더 분류는 제한된 동시성(호스트별 상한 포함)으로 실행하고,
+    문서 생성은 메타 트랜잭션 한 번, 그래프 재계산 요청은 마지막에 한 번만 보낸다.
+    """
+    if not AI_AVAILABLE:
+        raise HTTPException(status_code=503, detail="AI 미연결 — OpenAI API 키를 설정하세요")
+    urls = [(u or "").strip() for u in req.urls if (u or "").strip()]
+    if not urls:
+        raise HTTPException(status_code=400, detail="URL 목록이 비어 있습니다")
+    if len(urls) > URL_IMPORT_MAX:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {URL_IMPORT_MAX}개까지 가져올 수 있습니다")
+    concurrency = max(1, min(req.concurrency or URL_IMPORT_CONCURRENCY, 16))
+    folder = (req.folder or "").strip() or None
+    return StreamingResponse(_import_url_events(urls, folder, concurrency), media_type="application/x-ndjson")
+
+
+@app.get("/api/url/cache-stats")
+def api_url_cache_stats():
+    """URL 캐시 지표 (행 수, 히트/재검증/만료 후 재사용/실패 캐시 횟수, 히트율)."""
+    return url_ingest.cache_stats()
+
+
 @app.delete("/api/docs/{doc_id}")
 def api_delete_doc(doc_id: str):
     delete_doc(doc_id)
     try:
         db_service.delete_meta_document(doc_id)
+        db_service.delete_search_docs([doc_id])
     except Exception:
         pass
-    rebuild = _safe_rebuild_semantic_graph_edges(context="delete_doc")
+    if _vector_index_enabled():
+        vector_index.delete([doc_id])
+    rebuild = rebuild_scheduler.request("delete_doc", [doc_id])
     return {"status": "ok", "rebuild": rebuild}
 
 
@@ -1049,7 +1876,11 @@ def api_list_trash():
 def api_restore_from_trash(doc_id: str):
     if not restore_from_trash(doc_id):
         raise HTTPException(status_code=404, detail="Trash item not found")
-    rebuild = _safe_rebuild_semantic_graph_edges(context="restore_doc")
+    _safe_index_docs_for_search([doc_id])
+    restored = get_doc(doc_id)
+    if restored is not None and _vector_index_enabled():
+        vector_index.upsert(restored["id"], restored["content"], {"title": restored["title"]})
+    rebuild = rebuild_scheduler.request("restore_doc", [doc_id])
     return {"status": "ok", "rebuild": rebuild}
 
 
@@ -1057,9 +1888,139 @@ def api_restore_from_trash(doc_id: str):
 def api_delete_from_trash(doc_id: str):
     if not delete_from_trash_permanently(doc_id):
         raise HTTPException(status_code=404, detail="Trash item not found")
+    try:
+        db_service.delete_doc_embeddings([doc_id])
+    except Exception:
+        pass
     return {"status": "ok"}
 
 
+# ═══════════════════════════════════════════════════
+# 검색 API
+# ═══════════════════════════════════════════════════
+@app.get("/api/search")
+def api_search(q: str = "", limit: int = 20, offset: int = 0):
+    """
+    제목·본문·태그 전문 검색 (FTS5 trigram + bm25).
+    snippet/title의 일치 구간은 <mark>…</mark>로 표시된다.
+    """
+    _ensure_search_index()
+    limit = max(1, min(limit, 100))
+    result = db_service.search_docs(q, limit=limit, offset=max(0, offset))
+    return {"query": q, **result}
+
+
+HYBRID_CANDIDATES = 50  # 융합 전 각 검색기가 가져오는 후보 수
+VECTOR_CHUNK_FANOUT = 3  # 문서당 여러 청크가 걸릴 수 있으므로 청크 후보는 문서 수의 배수로
+HYBRID_SNIPPET_CHARS = 160
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-search")
+
+
+def _vector_search(q: str, n: int) -> list[tuple[str, str]]:
+    """
+    Chroma 최근접 문서 [(문서 ID, 가장 가까운 청크 본문)] (임베딩/Chroma 불가 시 빈 목록).
+    청크 단위로 검색하고 문서마다 최상위 청크 하나만 남긴다.
+    """
+    if not _vector_index_ready():
+        return []  # warm-up 중에는 전문 검색 결과만
+    try:
+        coll = _doc_collection()
+        count = coll.count()
+        if count == 0:
+            return []
+        res = coll.query(
+            query_embeddings=[_query_embedding(q)],
+            n_results=min(n * VECTOR_CHUNK_FANOUT, count),
+            include=["metadatas", "documents"],
+        )
+    except Exception:
+        return []
+    hits: dict[str, str] = {}
+    for entry_id, meta, text in zip(
+        (res.get("ids") or [[]])[0],
+        (res.get("metadatas") or [[]])[0],
+        (res.get("documents") or [[]])[0],
+    ):
+        hits.setdefault(doc_id_of(entry_id, meta), text or "")
+        if len(hits) >= n:
+            break
+    return list(hits.items())
+
+
+@app.get("/api/search/hybrid")
+def api_search_hybrid(q: str = "", limit: int = 20):
+    """
+    전문 검색(bm25)과 벡터 검색(Chroma)을 동시에 실행해 reciprocal rank fusion으로 합친 결과.
+    items: [{id, title, snippet, score, ranks: {lexical?, vector?}}]
+    """
+    q = q.strip()
+    if not q:
+        return {"query": q, "items": [], "sources": {"lexical": 0, "vector": 0}}
+    _ensure_search_index()
+    limit = max(1, min(limit, 100))
+    n = max(limit, HYBRID_CANDIDATES)
+    lexical_future = _search_executor.submit(db_service.search_docs, q, n)
+    vector_future = _search_executor.submit(_vector_search, q, n)
+    lexical = lexical_future.result()
+    vector_hits = vector_future.result()
+
+    hits = {item["id"]: item for item in lexical["items"]}
+    # 벡터 결과는 검색 색인에 있는(삭제/휴지통이 아닌) 문서만 사용
+    previews = db_service.get_search_doc_previews([d for d, _ in vector_hits if d not in hits])
+    vector_hits = [(d, chunk) for d, chunk in vector_hits if d in hits or d in previews]
+    vector_ids = [d for d, _ in vector_hits]
+    # 벡터로만 찾은 문서는 일치한 청크를 미리보기로 (긴 문서의 뒷부분도 근거가 보이도록)
+    chunk_snippets = {d: _to_plain_text(chunk)[:HYBRID_SNIPPET_CHARS] for d, chunk in vector_hits}
+
+    fused = semantic_service.reciprocal_rank_fusion({
+        "lexical": [item["id"] for item in lexical["items"]],
+        "vector": vector_ids,
+    })[:limit]
+    items = []
+    for doc_id, score, ranks in fused:
+        shown = hits.get(doc_id) or previews[doc_id]
+        snippet = shown["snippet"] if doc_id in hits else (chunk_snippets.get(doc_id) or shown["snippet"])
+        items.append({
+            "id": doc_id,
+            "title": shown["title"],
+            "snippet": snippet,
+            "score": score,
+            "ranks": ranks,
+        })
+    return {
+        "query": q,
+        "items": items,
+        "sources": {"lexical": len(lexical["items"]), "vector": len(vector_ids), "lexicalMode": lexical["mode"]},
+    }
+
+
+# ═══════════════════════════════════════════════════
+# 벡터 색인 API
+# ═══════════════════════════════════════════════════
+def _iter_vector_docs():
+    """재색인용 전체 문서 스트림 (doc_id, 본문, 메타데이터) — 한 번에 한 문서씩 읽음."""
+    for item in list_docs():
+        doc = get_doc(item["id"])
+        if doc is not None:
+            yield doc["id"], doc["content"], {"title": doc["title"]}
+
+
+@app.post("/api/index/reindex")
+def api_reindex_vectors():
+    """
+    Chroma 문서 벡터 전체 재색인 (백그라운드 작업).
+    내용 해시가 같은 문서는 encode를 건너뛰고, 삭제·휴지통 문서의 벡터는 제거한다.
+    """
+    if not _vector_index_enabled():
+        return {"status": "skipped", "reason": "chroma or embedding model not available"}
+    return vector_index.start_reindex(_iter_vector_docs)
+
+
+@app.get("/api/index/status")
+def api_vector_index_status():
+    return {"available": _vector_index_ready(), **vector_index.status()}
+
+
 # ═══════════════════════════════════════════════════
 # 태그 API
 # ═══════════════════════════════════════════════════
@@ -1086,17 +2047,24 @@ def api_set_tags(doc_id: str, req: SetTagsReq):
     if changed:
         db_service.invalidate_tag_similarity_cache(list(changed), AI_SIM_MODEL)
     set_tags_for_doc(doc_id, limited)
-    rebuild = _safe_rebuild_semantic_graph_edges(context="set_tags")
+    _safe_index_docs_for_search([doc_id])
+    rebuild = rebuild_scheduler.request("set_tags", [doc_id])
     return {"status": "ok", "rebuild": rebuild}
 
 
+@app.get("/api/tags/extraction-cache")
+def api_tag_extraction_cache():
+    """자동 태그 추출 캐시 히트율·행 수."""
+    return db_service.extraction_cache_stats()
+
+
 @app.get("/api/tags/similarity")
 def api_tag_similarity(tag: str, top_k: int = 8, min_docs: int = 1):
     """
     태그 컨텍스트 임베딩 기반 거리 분석.
     - 태그 벡터: 해당 태그 문서들의 본문 임베딩 평균(centroid)
     """
-    if embed_model is None:
+    if _get_embed_model() is None:
         return {
             "available": False,
             "baseTag": tag,
@@ -1118,22 +2086,15 @@ def api_tag_similarity(tag: str, top_k: int = 8, min_docs: int = 1):
             "neighbors": [],
         }
 
-    rows = []
-    for other_tag, other_vec in centroids.items():
-        if other_tag == tag:
-            continue
-        denom = base_norm * float(np.linalg.norm(other_vec)) + 1e-12
-        sim = float(np.dot(base_vec, other_vec) / denom)
-        rows.append(
-            {
-                "tag": other_tag,
-                "similarity": round(sim, 6),
-                "distance": round(1.0 - sim, 6),
-                "docCount": counts.get(other_tag, 0),
-            }
-        )
-
-    rows.sort(key=lambda x: x["similarity"], reverse=True)
+    rows = [
+        {
+            "tag": other_tag,
+            "similarity": round(sim, 6),
+            "distance": round(1.0 - sim, 6),
+            "docCount": counts.get(other_tag, 0),
+        }
+        for other_tag, sim in semantic_service.centroid_neighbors(centroids, tag)
+    ]
     return {
         "available": True,
         "baseTag": tag,
@@ -1150,7 +2111,19 @@ def api_graph_edges(edge_type: str = TAG_EDGE_TYPE, min_weight: float = 0.0, lim
         min_weight=min_weight,
         limit=max(1, min(10000, limit)),
     )
-    return {"edgeType": edge_type, "count": len(rows), "edges": rows}
+    status = rebuild_scheduler.status()
+    return {
+        "edgeType": edge_type,
+        "count": len(rows),
+        "edges": rows,
+        "graphVersion": status["graphVersion"],
+        "rebuildPending": status["dirty"] or status["running"],
+    }
+
+
+@app.get("/api/graph/rebuild-status")
+def api_rebuild_status():
+    return {**rebuild_scheduler.status(), "tagSimilarityCache": db_service.tag_similarity_cache_stats()}
 
 
 @app.post("/api/graph/rebuild-semantic")
@@ -1160,12 +2133,13 @@ def api_rebuild_semantic_graph(
     k_per_node: int = TAG_EDGE_K,
     min_docs: int = 1,
 ):
-    result = _safe_rebuild_semantic_graph_edges(
+    # 백그라운드 재계산과 직렬화되며, 대기 중인 문서 변경분도 함께 반영
+    result = rebuild_scheduler.run_now(
+        context="rebuild_api",
         engine=engine,
         top_n=max(1, min(10, top_n)),
         k_per_node=max(1, min(20, k_per_node)),
         min_docs=max(1, min(20, min_docs)),
-        context="rebuild_api",
     )
     return result
 
@@ -1178,6 +2152,12 @@ def api_list_folders():
     return list_folders()
 
 
+@app.get("/api/folders/counts")
+def api_folder_doc_counts():
+    """폴더별 문서 수 {total, folders} — 파일 목록은 페이지 단위로 받으므로 개수는 따로 조회."""
+    return doc_service.count_docs_by_folder()
+
+
 class FolderReq(BaseModel):
     name: str
 
@@ -1198,7 +2178,15 @@ def api_rename_folder(name: str, req: RenameFolderReq):
 
 @app.delete("/api/folders/{name}")
 def api_delete_folder(name: str):
-    return delete_folder(name)
+    doc_ids = [d["id"] for d in list_docs(folder=name)]
+    folders = delete_folder(name)
+    try:
+        db_service.delete_search_docs(doc_ids)
+    except Exception:
+        pass
+    if _vector_index_enabled():
+        vector_index.delete(doc_ids)
+    return folders
 
 
 class SetFolderReq(BaseModel):
@@ -1279,14 +2267,20 @@ def _make_backup_zip() -> Path:
     tmp_dir = Path(tempfile.gettempdir())
     zip_path = tmp_dir / f"my-graph-backup-{ts}.zip"
 
+    # 대기 중인 meta 변경 기록. SQLite 백엔드는 meta.json으로 내보내 백업 형식을 유지 (meta.db는 복구 시 재생성)
+    sqlite_meta = doc_service.META_BACKEND == "sqlite"
+    doc_service.export_meta_json()
     with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
         for p in data_dir.rglob("*"):
+            if sqlite_meta and p.parent == data_dir and p.name.startswith("meta.db"):
+                continue
             if p.is_file():
                 zf.write(p, p.relative_to(data_dir))
     return zip_path
 
 
 def _restore_from_zip(uploaded_zip: Path):
+    global _search_synced
     data_dir = Path(doc_service.DATA_DIR)
     data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1304,9 +2298,11 @@ def _restore_from_zip(uploaded_zip: Path):
         backup_dir.mkdir(parents=True, exist_ok=True)
         snapshot = backup_dir / f"restore_before_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         if data_dir.exists():
+            doc_service.export_meta_json()
             shutil.copytree(data_dir, snapshot, dirs_exist_ok=True)
 
-        # 전체 데이터 디렉토리를 복구본으로 교체
+        # 전체 데이터 디렉토리를 복구본으로 교체 (meta.db 연결은 닫고 복구 후 meta.json에서 재이관)
+        doc_service.reset_meta_store()
         for child in data_dir.iterdir():
             if child.is_dir():
                 shutil.rmtree(child)
@@ -1319,6 +2315,8 @@ def _restore_from_zip(uploaded_zip: Path):
                 shutil.copytree(child, target, dirs_exist_ok=True)
             else:
                 shutil.copy2(child, target)
+        doc_service.reset_meta_store()
+    _search_synced = False  # 복구된 문서 기준으로 다음 검색 시 재색인
 
 
 @app.get("/api/backup/download")
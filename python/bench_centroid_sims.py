@@ -0,0 +1,95 @@
+"""
+bench_centroid_sims.py — 태그 centroid 유사도 엔진 벤치마크
+기존 파이썬 이중 루프(_build_centroid_sims 구 구현)와 NumPy 엔진 비교.
+
+사용법:
+  python bench_centroid_sims.py                 # 1k / 5k / 10k 태그
+  python bench_centroid_sims.py --tags 3000 --dim 768
+
+구 루프는 T²/2 쌍을 dict로 만들기 때문에 --legacy-max 보다 큰 T에서는
+1,000개 태그 부분집합으로 쌍당 시간을 측정해 전체 시간을 추정(est.)한다.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+import semantic_service
+
+
+def legacy_loop(centroids: dict[str, np.ndarray]) -> dict[tuple[str, str], float]:
+    norm_c = {t: float(np.linalg.norm(v)) for t, v in centroids.items()}
+    sims: dict[tuple[str, str], float] = {}
+    tags_c = list(centroids.keys())
+    for i, a in enumerate(tags_c):
+        for b in tags_c[i + 1:]:
+            key = (a, b) if a <= b else (b, a)
+            denom = norm_c[a] * norm_c[b] + 1e-12
+            sims[key] = float(np.dot(centroids[a], centroids[b]) / denom)
+    return sims
+
+
+def _make_centroids(n: int, dim: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    mat = rng.standard_normal((n, dim)).astype(np.float32)
+    return {f"tag{i:05d}": mat[i] for i in range(n)}
+
+
+def _make_needed_pairs(tags: list[str], per_tag: int, seed: int = 0) -> set[tuple[str, str]]:
+    """문서 공동 태깅에서 나오는 쌍을 흉내 낸 무작위 쌍 (태그당 per_tag개)."""
+    rnd = random.Random(seed)
+    pairs: set[tuple[str, str]] = set()
+    for a in tags:
+        for b in rnd.sample(tags, min(per_tag, len(tags))):
+            if a != b:
+                pairs.add((a, b) if a <= b else (b, a))
+    return pairs
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def run(n: int, dim: int, legacy_max: int, top_k: int, per_tag: int):
+    centroids = _make_centroids(n, dim)
+    total_pairs = n * (n - 1) // 2
+
+    if n <= legacy_max:
+        legacy_s, legacy = _timed(legacy_loop, centroids)
+        legacy_label = f"{legacy_s:8.2f}s"
+        legacy_size = len(legacy)
+    else:
+        sample = dict(list(centroids.items())[:1000])
+        sample_s, _ = _timed(legacy_loop, sample)
+        legacy_s = sample_s / (1000 * 999 // 2) * total_pairs
+        legacy_label = f"{legacy_s:8.2f}s est."
+        legacy_size = total_pairs
+
+    needed = _make_needed_pairs(list(centroids.keys()), per_tag)
+    pair_s, pair_sims = _timed(semantic_service.centroid_pair_sims, centroids, needed)
+    topk_s, topk_sims = _timed(semantic_service.centroid_topk_sims, centroids, top_k)
+
+    print(
+        f"T={n:>6} dim={dim} | legacy {legacy_label} ({legacy_size:,} pairs)"
+        f" | needed-pairs {pair_s:6.3f}s ({len(pair_sims):,} pairs)"
+        f" | top-{top_k} {topk_s:6.3f}s ({len(topk_sims):,} pairs)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="centroid similarity benchmark")
+    parser.add_argument("--tags", type=int, nargs="*", default=[1000, 5000, 10000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--legacy-max", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--pairs-per-tag", type=int, default=30)
+    args = parser.parse_args()
+    for n in args.tags:
+        run(n, args.dim, args.legacy_max, args.top_k, args.pairs_per_tag)
+
+
+if __name__ == "__main__":
+    main()
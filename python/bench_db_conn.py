@@ -0,0 +1,59 @@
+"""
+bench_db_conn.py — db_service 호출당 연결 오버헤드 마이크로 벤치마크
+호출마다 connect + WAL PRAGMA + 스키마 스크립트 실행 + close 하던 기존 방식과
+스레드별 영속 연결(현재 _get_conn)을 같은 쿼리로 비교한다.
+
+사용법:
+  python bench_db_conn.py [--calls 2000]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="db_service connection overhead benchmark")
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["MY_GRAPH_DB_PATH"] = os.path.join(tmp.name, "bench.db")
+    import db_service
+
+    db_service.replace_graph_edges(
+        [
+            {"sourceDocId": f"d{i}", "targetDocId": f"d{i + 1}", "weight": 0.5, "distance": 0.5}
+            for i in range(500)
+        ],
+        "tag_semantic",
+        "bench",
+    )
+    schema = "\n".join(db_service._MIGRATIONS)
+
+    def legacy_call():
+        conn = sqlite3.connect(db_service.DB_PATH)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+        conn.execute("SELECT model FROM graph_edges WHERE edgeType = ? LIMIT 1", ("tag_semantic",)).fetchone()
+        conn.close()
+
+    def pooled_call():
+        db_service.get_graph_edge_model("tag_semantic")
+
+    for label, fn in (("per-call connect", legacy_call), ("pooled", pooled_call)):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(args.calls):
+            fn()
+        per_call = (time.perf_counter() - t0) / args.calls * 1e6
+        print(f"{label:>17}: {per_call:8.1f} µs/call ({args.calls} calls)")
+
+    db_service.close_conn()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+bench_embeddings.py — 임베딩 백엔드 벤치마크
+고정된 한국어 문서 집합으로 torch / ONNX fp32 / ONNX int8 처리량(docs/s)과
+torch 대비 코사인 일치도(평균·최소)를 비교한다.
+
+사용법:
+  python bench_embeddings.py                                  # all-MiniLM-L6-v2, 512 docs
+  python bench_embeddings.py --model jhgan/ko-sroberta-sts --max-seq 256 --threads 4
+  python bench_embeddings.py --backends torch onnx-int8 --docs 2000
+  python bench_embeddings.py --parallel 16                    # 동시 단건 encode: 직접 호출 vs 마이크로 배칭
+
+ONNX 변환 결과는 --onnx-dir에 캐시되므로 첫 실행의 변환 시간은 측정에서 제외된다.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from embedding_service import EmbeddingBatcher, EmbeddingConfig, create_provider
+
+# 고정 말뭉치 — 길이가 다른 문장을 섞어 padding 영향까지 포함되도록 구성
+KOREAN_SENTENCES = [
+    "오늘 회의에서 다음 분기 제품 로드맵을 확정했다.",
+    "그래프 뷰에서 태그 간 유사도가 높은 문서들이 가까이 모인다.",
+    "서울의 봄은 짧지만 벚꽃이 피는 주간에는 한강 공원이 붐빈다.",
+    "파이썬 비동기 프로그래밍에서는 이벤트 루프를 막지 않는 것이 중요하다.",
+    "데이터베이스 인덱스는 읽기를 빠르게 하지만 쓰기 비용을 늘린다.",
+    "주말에는 가족과 함께 제주도 올레길을 걸었다.",
+    "머신러닝 모델을 양자화하면 정확도 손실을 조금 감수하고 추론 속도를 얻는다.",
+    "독서 모임에서 이번 달 책으로 장편 소설을 골랐다.",
+    "회고록 초안: 프로젝트 초기에 요구사항을 더 자주 검증했어야 했다.",
+    "커피 원두는 로스팅 후 일주일 정도 지났을 때 향이 가장 좋다.",
+    "문서 편집기의 자동 저장 주기를 짧게 하면 디스크 쓰기가 늘어난다.",
+    "한국어 형태소 분석기는 조사와 어미를 분리해 명사를 추출한다.",
+    "운동 기록: 아침 5킬로미터 달리기, 평균 페이스 6분.",
+    "지식 관리 도구는 메모 사이의 연결을 드러내는 데 목적이 있다.",
+    "여행 준비물 목록에 여권, 충전기, 우산을 추가했다.",
+    "검색 결과는 제목 일치에 가중치를 두고 본문 일치로 보완한다.",
+]
+
+
+def make_corpus(n: int) -> list[str]:
+    """문장 1~4개를 결정적으로 이어 붙여 n개 문서를 만든다."""
+    docs = []
+    k = len(KOREAN_SENTENCES)
+    for i in range(n):
+        count = 1 + i % 4
+        docs.append(" ".join(KOREAN_SENTENCES[(i * 7 + j * 3) % k] for j in range(count)))
+    return docs
+
+
+def _configs(args) -> dict[str, EmbeddingConfig]:
+    common = dict(model_name=args.model, max_seq_length=args.max_seq, threads=args.threads, onnx_dir=args.onnx_dir)
+    available = {
+        "torch": EmbeddingConfig(backend="torch", **common),
+        "onnx-fp32": EmbeddingConfig(backend="onnx", quantize=False, **common),
+        "onnx-int8": EmbeddingConfig(backend="onnx", quantize=True, **common),
+    }
+    return {name: available[name] for name in args.backends}
+
+
+def run(args):
+    corpus = make_corpus(args.docs)
+    results: dict[str, np.ndarray] = {}
+    print(f"model={args.model} docs={len(corpus)} batch={args.batch_size} "
+          f"max_seq={args.max_seq or 'default'} threads={args.threads or 'default'}")
+    for name, config in _configs(args).items():
+        t0 = time.perf_counter()
+        provider = create_provider(config)
+        load_s = time.perf_counter() - t0
+        provider.encode(corpus[: args.batch_size], batch_size=args.batch_size)  # warm-up
+        t0 = time.perf_counter()
+        vectors = provider.encode(corpus, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - t0
+        results[name] = vectors
+
+        agreement = ""
+        baseline = results.get("torch")
+        if baseline is not None and name != "torch":
+            a = baseline / np.linalg.norm(baseline, axis=1, keepdims=True)
+            b = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            cos = (a * b).sum(axis=1)
+            agreement = f" | cosine vs torch mean {cos.mean():.5f} min {cos.min():.5f}"
+        print(
+            f"{name:>10} | load {load_s:6.2f}s | {len(corpus) / elapsed:8.1f} docs/s"
+            f" ({elapsed:6.2f}s){agreement}"
+        )
+
+
+def run_parallel(args):
+    """저장 요청이 몰릴 때처럼 여러 스레드가 문서 1개씩 encode — 직접 호출과 배처 비교."""
+    corpus = make_corpus(args.docs)
+    config = _configs(args)[args.backends[0]]
+    provider = create_provider(config)
+    batcher = EmbeddingBatcher(provider, max_batch=args.batch_size)
+    print(f"model={args.model} backend={args.backends[0]} docs={len(corpus)} threads={args.parallel}")
+    for name, encoder in (("direct", provider), ("batched", batcher)):
+        encoder.encode(corpus[:4])  # warm-up
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+            list(pool.map(lambda text: encoder.encode([text]), corpus))
+        elapsed = time.perf_counter() - t0
+        print(f"{name:>10} | {len(corpus) / elapsed:8.1f} docs/s ({elapsed:6.2f}s)")
+    print(f"   batcher | {batcher.stats()}")
+    batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="embedding backend benchmark")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="*", default=["torch", "onnx-fp32", "onnx-int8"],
+                        choices=["torch", "onnx-fp32", "onnx-int8"])
+    parser.add_argument("--docs", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-seq", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--onnx-dir", default="./onnx_models")
+    parser.add_argument("--parallel", type=int, default=0, help="동시 단건 encode 스레드 수 (0이면 백엔드 비교)")
+    args = parser.parse_args()
+    if args.parallel:
+        run_parallel(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
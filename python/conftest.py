@@ -0,0 +1,22 @@
+"""
+conftest.py — app 모듈을 쓰는 테스트의 공통 fixture
+임시 데이터 디렉토리·메타데이터 DB로 doc_service를 다시 읽고, 워밍업과 벡터 색인은 끈다.
+파일별 설정은 각 테스트 모듈에서 같은 이름의 fixture로 덧붙인다.
+"""
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("MY_GRAPH_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("MY_GRAPH_DB_PATH", str(tmp_path / "metadata.db"))
+    monkeypatch.setenv("MY_GRAPH_WARMUP", "0")
+    import db_service
+    import doc_service
+    importlib.reload(doc_service)
+    monkeypatch.setattr(db_service, "DB_PATH", str(tmp_path / "metadata.db"))
+    import app
+    monkeypatch.setattr(app, "_vector_index_enabled", lambda: False)
+    return app
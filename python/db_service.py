@@ -4,8 +4,14 @@ sqliteAdapter.ts를 Python으로 이식
 """
 import sqlite3
 import os
+import sys
+import threading
 import json
+import re
+from array import array
+from collections import OrderedDict
 from pathlib import Path
+from typing import Callable, Iterable
 from datetime import datetime, timezone
 
 _DEFAULT_DB_PATH = os.path.join(
@@ -16,12 +22,11 @@ _DEFAULT_DB_PATH = os.path.join(
 DB_PATH = os.environ.get("MY_GRAPH_DB_PATH", _DEFAULT_DB_PATH)
 
 
-def _get_conn() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.executescript("""
+# 스키마 마이그레이션: 인덱스 + 1 = 스키마 버전. 새 변경은 항상 뒤에 추가한다.
+# 항목은 SQL 스크립트 또는 데이터 변환이 필요한 경우 conn을 받는 함수.
+_MIGRATIONS: list[str | Callable[[sqlite3.Connection], None]] = [
+    # v1 — 초기 스키마 (버전 관리 도입 이전 DB와 호환되도록 IF NOT EXISTS 유지)
+    """
         CREATE TABLE IF NOT EXISTS documents (
             id TEXT PRIMARY KEY,
             title TEXT,
@@ -80,10 +85,318 @@ def _get_conn() -> sqlite3.Connection:
             updatedAt TEXT NOT NULL,
             PRIMARY KEY (tagA, tagB)
         );
+        CREATE TABLE IF NOT EXISTS doc_embeddings (
+            docId TEXT NOT NULL,
+            model TEXT NOT NULL,
+            contentHash TEXT NOT NULL,
+            vectorJson TEXT NOT NULL,
+            updatedAt TEXT NOT NULL,
+            PRIMARY KEY (docId, model)
+        );
+        CREATE TABLE IF NOT EXISTS tag_vector_sums (
+            tag TEXT NOT NULL,
+            model TEXT NOT NULL,
+            sumJson TEXT NOT NULL,
+            docCount INTEGER NOT NULL DEFAULT 0,
+            updatedAt TEXT NOT NULL,
+            PRIMARY KEY (tag, model)
+        );
+        CREATE TABLE IF NOT EXISTS tag_centroid_members (
+            docId TEXT NOT NULL,
+            model TEXT NOT NULL,
+            tagsJson TEXT NOT NULL,
+            contentHash TEXT NOT NULL,
+            vectorJson TEXT NOT NULL,
+            updatedAt TEXT NOT NULL,
+            PRIMARY KEY (docId, model)
+        );
+    """,
+    # v2 — 벡터 컬럼 JSON → packed float BLOB (+ dim)
+    lambda conn: _migrate_vector_blobs(conn),
+    # v3 — 전문 검색 색인 (search_docs + FTS5 trigram)
+    lambda conn: _migrate_search_index(conn),
+    # v4 — 청크 임베딩 (내용 해시 단위 벡터 캐시 + 문서별 청크 구성)
+    """
+        CREATE TABLE IF NOT EXISTS chunk_embeddings (
+            model TEXT NOT NULL,
+            chunkHash TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            dim INTEGER NOT NULL,
+            updatedAt TEXT NOT NULL,
+            PRIMARY KEY (model, chunkHash)
+        );
+        CREATE TABLE IF NOT EXISTS doc_chunks (
+            docId TEXT NOT NULL,
+            model TEXT NOT NULL,
+            chunkIndex INTEGER NOT NULL,
+            chunkHash TEXT NOT NULL,
+            startOffset INTEGER NOT NULL,
+            endOffset INTEGER NOT NULL,
+            PRIMARY KEY (docId, model, chunkIndex)
+        );
+        CREATE INDEX IF NOT EXISTS idx_doc_chunks_hash ON doc_chunks(model, chunkHash);
+    """,
+    # v5 — 태그 유사도 캐시 키에 model 포함 (model, tagA, tagB) + 무효화용 (model, tagB) 인덱스
+    """
+        CREATE TABLE tag_similarity_cache_v5 (
+            model TEXT NOT NULL,
+            tagA TEXT NOT NULL,
+            tagB TEXT NOT NULL,
+            score REAL NOT NULL,
+            updatedAt TEXT NOT NULL,
+            PRIMARY KEY (model, tagA, tagB)
+        ) WITHOUT ROWID;
+        INSERT OR REPLACE INTO tag_similarity_cache_v5 (model, tagA, tagB, score, updatedAt)
+            SELECT model, tagA, tagB, score, updatedAt FROM tag_similarity_cache;
+        DROP TABLE tag_similarity_cache;
+        ALTER TABLE tag_similarity_cache_v5 RENAME TO tag_similarity_cache;
+        CREATE INDEX IF NOT EXISTS idx_tag_similarity_b ON tag_similarity_cache(model, tagB);
+    """,
+    # v6 — 자동 태그 추출 결과 캐시 (추출기·모델·평문 해시 단위, 최근 사용 순 제거)
+    """
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            extractor TEXT NOT NULL,
+            model TEXT NOT NULL,
+            textHash TEXT NOT NULL,
+            resultJson TEXT NOT NULL,
+            createdAt TEXT NOT NULL,
+            lastUsedAt TEXT NOT NULL,
+            PRIMARY KEY (extractor, model, textHash)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_extraction_cache_used ON extraction_cache(lastUsedAt);
+    """,
+    # v7 — URL 수집 캐시 (정규화 URL 단위 메타·본문·AI 분석 + 재검증 헤더, 실패 캐시)
+    """
+        CREATE TABLE IF NOT EXISTS url_cache (
+            url TEXT PRIMARY KEY,
+            metaJson TEXT,
+            text TEXT,
+            textHash TEXT,
+            analysisJson TEXT,
+            analysisModel TEXT,
+            etag TEXT,
+            lastModified TEXT,
+            error TEXT,
+            status INTEGER,
+            fetchedAt REAL NOT NULL,
+            expiresAt REAL NOT NULL,
+            lastUsedAt REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_url_cache_used ON url_cache(lastUsedAt);
+    """,
+    # v8 — 2글자 검색어 색인 (doc_bigram: 제목·본문·태그의 2-gram 토큰 FTS5)
+    lambda conn: _migrate_bigram_index(conn),
+]
+
+# ─── 벡터 BLOB 직렬화 ─────────────────────────────
+# 임베딩은 little-endian float32, centroid 누적 합계는 정밀도 유지를 위해 float64로 저장
+
+def _pack_vector(vector, typecode: str = "f") -> bytes:
+    dtype = getattr(vector, "dtype", None)
+    if dtype is not None:  # numpy 배열은 리스트 변환 없이 바로 직렬화
+        return vector.astype("<f4" if typecode == "f" else "<f8", copy=False).tobytes()
+    packed = array(typecode, vector)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_vector(blob: bytes, typecode: str = "f") -> list[float]:
+    values = array(typecode)
+    values.frombytes(blob)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tolist()
+
+
+def _migrate_vector_blobs(conn: sqlite3.Connection):
+    """
+    vectorJson/sumJson(TEXT) 컬럼 테이블을 vector/sum(BLOB) + dim 컬럼으로 재생성하고
+    기존 JSON 행은 그대로 변환해 옮긴다.
+    """
+    specs = [
+        # (테이블, JSON 컬럼, BLOB 컬럼, typecode, 새 테이블 DDL)
+        ("tag_embeddings", "vectorJson", "vector", "f", """
+            CREATE TABLE tag_embeddings (
+                tag TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                docCount INTEGER NOT NULL DEFAULT 0,
+                model TEXT NOT NULL,
+                updatedAt TEXT NOT NULL
+            )"""),
+        ("doc_embeddings", "vectorJson", "vector", "f", """
+            CREATE TABLE doc_embeddings (
+                docId TEXT NOT NULL,
+                model TEXT NOT NULL,
+                contentHash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                updatedAt TEXT NOT NULL,
+                PRIMARY KEY (docId, model)
+            )"""),
+        ("tag_vector_sums", "sumJson", "sum", "d", """
+            CREATE TABLE tag_vector_sums (
+                tag TEXT NOT NULL,
+                model TEXT NOT NULL,
+                sum BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                docCount INTEGER NOT NULL DEFAULT 0,
+                updatedAt TEXT NOT NULL,
+                PRIMARY KEY (tag, model)
+            )"""),
+        ("tag_centroid_members", "vectorJson", "vector", "f", """
+            CREATE TABLE tag_centroid_members (
+                docId TEXT NOT NULL,
+                model TEXT NOT NULL,
+                tagsJson TEXT NOT NULL,
+                contentHash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                updatedAt TEXT NOT NULL,
+                PRIMARY KEY (docId, model)
+            )"""),
+    ]
+    with conn:
+        for table, json_col, blob_col, typecode, ddl in specs:
+            rows = [dict(r) for r in conn.execute(f"SELECT * FROM {table}").fetchall()]
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(ddl)
+            for row in rows:
+                try:
+                    vector = json.loads(row.pop(json_col) or "[]")
+                except Exception:
+                    continue
+                row[blob_col] = _pack_vector(vector, typecode)
+                row["dim"] = len(vector)
+                cols = ", ".join(row.keys())
+                marks = ", ".join("?" for _ in row)
+                conn.execute(f"INSERT INTO {table} ({cols}) VALUES ({marks})", list(row.values()))
+
+
+def _migrate_search_index(conn: sqlite3.Connection):
+    """
+    search_docs(원본 텍스트) + doc_fts(external content FTS5, trigram 토크나이저).
+    trigram은 형태소 분석 없이 한국어 부분 문자열 검색이 가능하다.
+    FTS5/trigram을 지원하지 않는 SQLite(3.34 미만)에서는 search_docs만 만들고 LIKE 검색으로 동작.
+    """
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS search_docs (
+            rowid INTEGER PRIMARY KEY,
+            docId TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL DEFAULT '',
+            body TEXT NOT NULL DEFAULT '',
+            tags TEXT NOT NULL DEFAULT '',
+            updatedAt TEXT NOT NULL DEFAULT ''
+        );
     """)
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS doc_fts USING fts5(
+                title, body, tags,
+                content='search_docs', content_rowid='rowid',
+                tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS search_docs_ai AFTER INSERT ON search_docs BEGIN
+                INSERT INTO doc_fts(rowid, title, body, tags)
+                VALUES (new.rowid, new.title, new.body, new.tags);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_docs_ad AFTER DELETE ON search_docs BEGIN
+                INSERT INTO doc_fts(doc_fts, rowid, title, body, tags)
+                VALUES ('delete', old.rowid, old.title, old.body, old.tags);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_docs_au AFTER UPDATE ON search_docs BEGIN
+                INSERT INTO doc_fts(doc_fts, rowid, title, body, tags)
+                VALUES ('delete', old.rowid, old.title, old.body, old.tags);
+                INSERT INTO doc_fts(rowid, title, body, tags)
+                VALUES (new.rowid, new.title, new.body, new.tags);
+            END;
+        """)
+    except sqlite3.OperationalError:
+        pass
+
+
+def _migrate_bigram_index(conn: sqlite3.Connection):
+    """
+    doc_bigram(FTS5, unicode61) — 단어를 겹치는 2글자 토큰으로 미리 쪼개 저장한다.
+    trigram이 못 찾는 2글자 한국어 명사(그래, 분석 …)도 색인으로 찾는다.
+    토큰 생성은 Python(_bigram_tokens)이 하므로 삽입은 upsert_search_docs가, 삭제는 트리거가 맡는다.
+    FTS5가 없으면 만들지 않고 LIKE 검색으로 동작.
+    """
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS doc_bigram USING fts5(
+                grams, tokenize='unicode61 remove_diacritics 0'
+            );
+            CREATE TRIGGER IF NOT EXISTS search_docs_bigram_ad AFTER DELETE ON search_docs BEGIN
+                DELETE FROM doc_bigram WHERE rowid = old.rowid;
+            END;
+        """)
+    except sqlite3.OperationalError:
+        return
+    rows = conn.execute("SELECT rowid, title, body, tags FROM search_docs").fetchall()
+    conn.executemany(
+        "INSERT INTO doc_bigram (rowid, grams) VALUES (?, ?)",
+        [(r[0], _bigram_tokens(r[1], r[2], r[3])) for r in rows],
+    )
+
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready: set[str] = set()
+
+
+def _migrate(conn: sqlite3.Connection):
+    """schema_version 기준으로 미적용 마이그레이션만 실행 (프로세스·DB 파일당 1회)."""
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    row = conn.execute("SELECT MAX(version) AS v FROM schema_version").fetchone()
+    current = int(row["v"] or 0)
+    for version, step in enumerate(_MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        if callable(step):
+            step(conn)
+        else:
+            conn.executescript(step)
+        conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+        conn.commit()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    스레드별 영속 연결 반환.
+    - 연결/PRAGMA 설정은 스레드당 1회, 스키마 마이그레이션은 DB 파일당 1회
+    - 연결을 유지하므로 sqlite3 statement 캐시(cached_statements)가 호출 간 재사용됨
+    """
+    conns: dict[str, sqlite3.Connection] = getattr(_local, "conns", None) or {}
+    _local.conns = conns
+    conn = conns.get(DB_PATH)
+    if conn is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        with _schema_lock:
+            if DB_PATH not in _schema_ready:
+                _migrate(conn)
+                _schema_ready.add(DB_PATH)
+        conns[DB_PATH] = conn
+    elif conn.in_transaction:
+        # 이전 호출이 예외로 끝나 열린 트랜잭션은 버린다 (부분 반영 방지)
+        conn.rollback()
     return conn
 
 
+def close_conn():
+    """현재 스레드의 연결 종료 (테스트/종료 처리용)."""
+    conns: dict[str, sqlite3.Connection] = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
+
+
 def save_meta_document(doc_id: str, title: str, updated_at: str):
     conn = _get_conn()
     conn.execute(
@@ -91,7 +404,6 @@ def save_meta_document(doc_id: str, title: str, updated_at: str):
         (doc_id, title, updated_at),
     )
     conn.commit()
-    conn.close()
 
 
 def delete_meta_document(doc_id: str):
@@ -99,7 +411,6 @@ def delete_meta_document(doc_id: str):
     conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
     conn.execute("DELETE FROM tags WHERE docId = ?", (doc_id,))
     conn.commit()
-    conn.close()
 
 
 def set_tags_for_doc(doc_id: str, tags: list[str]):
@@ -110,20 +421,17 @@ def set_tags_for_doc(doc_id: str, tags: list[str]):
         [(doc_id, t) for t in tags],
     )
     conn.commit()
-    conn.close()
 
 
 def get_tags_for_doc(doc_id: str) -> list[str]:
     conn = _get_conn()
     rows = conn.execute("SELECT tag FROM tags WHERE docId = ?", (doc_id,)).fetchall()
-    conn.close()
     return [r["tag"] for r in rows]
 
 
 def get_all_docs() -> list[dict]:
     conn = _get_conn()
     rows = conn.execute("SELECT id, title, updatedAt FROM documents").fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
@@ -131,13 +439,11 @@ def save_graph_json(json_str: str):
     conn = _get_conn()
     conn.execute("INSERT INTO graph_store (json) VALUES (?)", (json_str,))
     conn.commit()
-    conn.close()
 
 
 def load_latest_graph_json() -> str | None:
     conn = _get_conn()
     row = conn.execute("SELECT json FROM graph_store ORDER BY id DESC LIMIT 1").fetchone()
-    conn.close()
     return row["json"] if row else None
 
 
@@ -168,7 +474,6 @@ def save_image_asset(
         ),
     )
     conn.commit()
-    conn.close()
 
 
 def list_image_assets(doc_id: str | None = None, limit: int = 100) -> list[dict]:
@@ -194,7 +499,6 @@ def list_image_assets(doc_id: str | None = None, limit: int = 100) -> list[dict]
             """,
             (limit,),
         ).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
@@ -208,13 +512,14 @@ def replace_tag_embeddings(tag_rows: list[dict], model: str):
     conn.execute("DELETE FROM tag_embeddings")
     conn.executemany(
         """
-        INSERT INTO tag_embeddings (tag, vectorJson, docCount, model, updatedAt)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO tag_embeddings (tag, vector, dim, docCount, model, updatedAt)
+        VALUES (?, ?, ?, ?, ?, ?)
         """,
         [
             (
                 row["tag"],
-                json.dumps(row["vector"], ensure_ascii=False),
+                _pack_vector(row["vector"]),
+                len(row["vector"]),
                 int(row.get("docCount", 0)),
                 model,
                 now,
@@ -223,7 +528,343 @@ def replace_tag_embeddings(tag_rows: list[dict], model: str):
         ],
     )
     conn.commit()
-    conn.close()
+
+
+_IN_CHUNK = 500  # SQLite 바인딩 변수 제한 대비 IN (...) 분할 크기
+
+
+def get_doc_embeddings(doc_ids: list[str], model: str) -> dict[str, tuple[str, list[float]]]:
+    """
+    문서 본문 임베딩 캐시 조회.
+    반환: {docId: (contentHash, vector)} — 캐시에 없는 문서는 포함되지 않음
+    """
+    if not doc_ids:
+        return {}
+    conn = _get_conn()
+    result: dict[str, tuple[str, list[float]]] = {}
+    for start in range(0, len(doc_ids), _IN_CHUNK):
+        chunk = doc_ids[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT docId, contentHash, vector FROM doc_embeddings WHERE model = ? AND docId IN ({placeholders})",
+            [model] + chunk,
+        ).fetchall()
+        for r in rows:
+            result[r["docId"]] = (r["contentHash"], _unpack_vector(r["vector"]))
+    return result
+
+
+def save_doc_embeddings(rows: list[dict], model: str):
+    """rows: [{docId, contentHash, vector}] — (docId, model) 단위로 덮어쓰기"""
+    if not rows:
+        return
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO doc_embeddings (docId, model, contentHash, vector, dim, updatedAt)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (row["docId"], model, row["contentHash"], _pack_vector(row["vector"]), len(row["vector"]), now)
+            for row in rows
+        ],
+    )
+    conn.commit()
+
+
+def delete_doc_embeddings(doc_ids: list[str]):
+    """문서 임베딩 캐시 삭제 (모든 모델, 청크 구성 포함)."""
+    if not doc_ids:
+        return
+    conn = _get_conn()
+    released: set[tuple[str, str]] = set()
+    for start in range(0, len(doc_ids), _IN_CHUNK):
+        chunk = doc_ids[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        conn.execute(f"DELETE FROM doc_embeddings WHERE docId IN ({placeholders})", chunk)
+        released.update(
+            (r["model"], r["chunkHash"])
+            for r in conn.execute(
+                f"SELECT model, chunkHash FROM doc_chunks WHERE docId IN ({placeholders})", chunk
+            )
+        )
+        conn.execute(f"DELETE FROM doc_chunks WHERE docId IN ({placeholders})", chunk)
+    _prune_chunk_embeddings(conn, released)
+    conn.commit()
+
+
+# ─── 청크 임베딩 ──────────────────────────────────
+# chunk_embeddings는 (model, 청크 내용 해시) → 벡터. 문서가 바뀌어도 내용이 같은 청크는 재사용하고,
+# 어느 문서의 doc_chunks에서도 참조되지 않게 된 벡터는 청크 구성을 바꾸거나 문서를 지울 때 정리한다.
+
+def get_chunk_embeddings(hashes: list[str], model: str) -> dict[str, list[float]]:
+    """반환: {chunkHash: vector} — 캐시에 없는 해시는 포함되지 않음"""
+    if not hashes:
+        return {}
+    conn = _get_conn()
+    result: dict[str, list[float]] = {}
+    for start in range(0, len(hashes), _IN_CHUNK):
+        chunk = hashes[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT chunkHash, vector FROM chunk_embeddings WHERE model = ? AND chunkHash IN ({placeholders})",
+            [model] + chunk,
+        ).fetchall()
+        for r in rows:
+            result[r["chunkHash"]] = _unpack_vector(r["vector"])
+    return result
+
+
+def save_chunk_embeddings(rows: list[dict], model: str):
+    """rows: [{chunkHash, vector}]"""
+    if not rows:
+        return
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO chunk_embeddings (model, chunkHash, vector, dim, updatedAt)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(model, row["chunkHash"], _pack_vector(row["vector"]), len(row["vector"]), now) for row in rows],
+    )
+    conn.commit()
+
+
+def replace_doc_chunks(chunks_by_doc: dict[str, list[dict]], model: str):
+    """
+    문서별 청크 구성 교체. chunks_by_doc: {docId: [{chunkHash, start, end}]} (순서 = chunkIndex)
+    이전 구성에만 있던 청크 벡터는 다른 문서가 참조하지 않으면 삭제.
+    """
+    if not chunks_by_doc:
+        return
+    conn = _get_conn()
+    doc_ids = list(chunks_by_doc)
+    released: set[tuple[str, str]] = set()
+    for start in range(0, len(doc_ids), _IN_CHUNK):
+        chunk = doc_ids[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        released.update(
+            (model, r["chunkHash"])
+            for r in conn.execute(
+                f"SELECT chunkHash FROM doc_chunks WHERE model = ? AND docId IN ({placeholders})",
+                [model] + chunk,
+            )
+        )
+        conn.execute(f"DELETE FROM doc_chunks WHERE model = ? AND docId IN ({placeholders})", [model] + chunk)
+    conn.executemany(
+        """
+        INSERT INTO doc_chunks (docId, model, chunkIndex, chunkHash, startOffset, endOffset)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (doc_id, model, index, row["chunkHash"], row["start"], row["end"])
+            for doc_id, rows in chunks_by_doc.items()
+            for index, row in enumerate(rows)
+        ],
+    )
+    _prune_chunk_embeddings(conn, released)
+    conn.commit()
+
+
+def get_doc_chunks(doc_id: str, model: str) -> list[dict]:
+    """[{chunkIndex, chunkHash, start, end}] (chunkIndex 순)"""
+    rows = _get_conn().execute(
+        """
+        SELECT chunkIndex, chunkHash, startOffset, endOffset FROM doc_chunks
+        WHERE docId = ? AND model = ? ORDER BY chunkIndex
+        """,
+        (doc_id, model),
+    ).fetchall()
+    return [
+        {"chunkIndex": r["chunkIndex"], "chunkHash": r["chunkHash"], "start": r["startOffset"], "end": r["endOffset"]}
+        for r in rows
+    ]
+
+
+def _prune_chunk_embeddings(conn: sqlite3.Connection, released: set[tuple[str, str]]):
+    """released (model, chunkHash) 중 더 이상 참조되지 않는 벡터만 삭제 (커밋은 호출자)."""
+    if not released:
+        return
+    conn.executemany(
+        """
+        DELETE FROM chunk_embeddings WHERE model = ? AND chunkHash = ? AND NOT EXISTS (
+            SELECT 1 FROM doc_chunks WHERE model = ? AND chunkHash = ?
+        )
+        """,
+        [(model, digest, model, digest) for model, digest in released],
+    )
+
+
+def list_tag_embeddings(model: str) -> list[dict]:
+    """태그 centroid 임베딩 전체 조회. [{tag, vector, docCount}]"""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT tag, vector, docCount FROM tag_embeddings WHERE model = ? ORDER BY tag",
+        (model,),
+    ).fetchall()
+    return [
+        {"tag": r["tag"], "vector": _unpack_vector(r["vector"]), "docCount": r["docCount"]}
+        for r in rows
+    ]
+
+
+def load_tag_embedding_matrix(model: str, min_docs: int = 1):
+    """
+    태그 centroid 전체를 하나의 연속 float32 행렬로 로드 (행 단위 디코딩 없음).
+    반환: (matrix [T, D], {tag: row index}, docCounts [T])
+    차원이 다른 행(모델 교체 잔여분)은 가장 많은 차원 기준으로 제외한다.
+    """
+    import numpy as np
+
+    conn = _get_conn()
+    dim_row = conn.execute(
+        """
+        SELECT dim FROM tag_embeddings WHERE model = ? AND docCount >= ?
+        GROUP BY dim ORDER BY COUNT(*) DESC LIMIT 1
+        """,
+        (model, int(min_docs)),
+    ).fetchone()
+    if dim_row is None:
+        return np.zeros((0, 0), dtype=np.float32), {}, np.zeros(0, dtype=np.int64)
+    dim = int(dim_row["dim"])
+    rows = conn.execute(
+        """
+        SELECT tag, vector, docCount FROM tag_embeddings
+        WHERE model = ? AND docCount >= ? AND dim = ?
+        ORDER BY tag
+        """,
+        (model, int(min_docs), dim),
+    ).fetchall()
+    buf = b"".join(r["vector"] for r in rows)
+    matrix = np.frombuffer(buf, dtype="<f4").reshape(len(rows), dim)
+    index = {r["tag"]: i for i, r in enumerate(rows)}
+    counts = np.fromiter((r["docCount"] for r in rows), dtype=np.int64, count=len(rows))
+    return matrix, index, counts
+
+
+def list_tag_centroid_member_ids(model: str) -> list[str]:
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT docId FROM tag_centroid_members WHERE model = ?", (model,)
+    ).fetchall()
+    return [r["docId"] for r in rows]
+
+
+def get_tag_centroid_members(doc_ids: list[str], model: str) -> dict[str, dict]:
+    """
+    문서가 현재 centroid 합계에 기여하고 있는 내용 조회.
+    반환: {docId: {tags, contentHash, vector}}
+    """
+    if not doc_ids:
+        return {}
+    conn = _get_conn()
+    result: dict[str, dict] = {}
+    for start in range(0, len(doc_ids), _IN_CHUNK):
+        chunk = doc_ids[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"""
+            SELECT docId, tagsJson, contentHash, vector FROM tag_centroid_members
+            WHERE model = ? AND docId IN ({placeholders})
+            """,
+            [model] + chunk,
+        ).fetchall()
+        for r in rows:
+            try:
+                result[r["docId"]] = {
+                    "tags": json.loads(r["tagsJson"]),
+                    "contentHash": r["contentHash"],
+                    "vector": _unpack_vector(r["vector"]),
+                }
+            except Exception:
+                continue
+    return result
+
+
+def get_tag_vector_sums(tags: list[str], model: str) -> dict[str, tuple[list[float], int]]:
+    """태그별 임베딩 합계/문서 수 조회. 반환: {tag: (sum, docCount)}"""
+    if not tags:
+        return {}
+    conn = _get_conn()
+    result: dict[str, tuple[list[float], int]] = {}
+    for start in range(0, len(tags), _IN_CHUNK):
+        chunk = tags[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT tag, sum, docCount FROM tag_vector_sums WHERE model = ? AND tag IN ({placeholders})",
+            [model] + chunk,
+        ).fetchall()
+        for r in rows:
+            result[r["tag"]] = (_unpack_vector(r["sum"], "d"), int(r["docCount"]))
+    return result
+
+
+def apply_tag_centroid_changes(
+    members: list[dict],
+    removed_doc_ids: list[str],
+    tag_rows: list[dict],
+    model: str,
+):
+    """
+    증분 centroid 갱신을 하나의 트랜잭션으로 반영.
+    members: [{docId, tags, contentHash, vector}] — 문서별 현재 기여분
+    removed_doc_ids: 기여분을 제거할 문서
+    tag_rows: [{tag, sum, vector, docCount}] — 변경된 태그만. docCount 0이면 삭제
+    """
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO tag_centroid_members (docId, model, tagsJson, contentHash, vector, dim, updatedAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    m["docId"],
+                    model,
+                    json.dumps(m["tags"], ensure_ascii=False),
+                    m["contentHash"],
+                    _pack_vector(m["vector"]),
+                    len(m["vector"]),
+                    now,
+                )
+                for m in members
+            ],
+        )
+        conn.executemany(
+            "DELETE FROM tag_centroid_members WHERE docId = ? AND model = ?",
+            [(doc_id, model) for doc_id in removed_doc_ids],
+        )
+        alive = [row for row in tag_rows if int(row.get("docCount", 0)) > 0]
+        dead = [row["tag"] for row in tag_rows if int(row.get("docCount", 0)) <= 0]
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO tag_vector_sums (tag, model, sum, dim, docCount, updatedAt)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (row["tag"], model, _pack_vector(row["sum"], "d"), len(row["sum"]), int(row["docCount"]), now)
+                for row in alive
+            ],
+        )
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO tag_embeddings (tag, vector, dim, docCount, model, updatedAt)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (row["tag"], _pack_vector(row["vector"]), len(row["vector"]), int(row["docCount"]), model, now)
+                for row in alive
+            ],
+        )
+        conn.executemany(
+            "DELETE FROM tag_vector_sums WHERE tag = ? AND model = ?",
+            [(tag, model) for tag in dead],
+        )
+        conn.executemany("DELETE FROM tag_embeddings WHERE tag = ?", [(tag,) for tag in dead])
 
 
 def replace_graph_edges(edge_rows: list[dict], edge_type: str, model: str):
@@ -255,16 +896,208 @@ def replace_graph_edges(edge_rows: list[dict], edge_type: str, model: str):
         ],
     )
     conn.commit()
-    conn.close()
+
+
+def get_graph_edge_model(edge_type: str) -> str | None:
+    """현재 저장된 edgeType 엣지를 만든 모델 (엣지 없으면 None)."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT model FROM graph_edges WHERE edgeType = ? LIMIT 1", (edge_type,)
+    ).fetchone()
+    return row["model"] if row else None
+
+
+def list_graph_edges_for_docs(doc_ids: list[str], edge_type: str) -> list[dict]:
+    """문서 집합 중 하나라도 끝점으로 갖는 엣지 조회 (증분 재계산용)."""
+    if not doc_ids:
+        return []
+    conn = _get_conn()
+    seen: set[tuple[str, str]] = set()
+    result: list[dict] = []
+    for start in range(0, len(doc_ids), _IN_CHUNK):
+        chunk = doc_ids[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"""
+            SELECT sourceDocId, targetDocId, weight, distance, evidenceJson FROM graph_edges
+            WHERE edgeType = ? AND sourceDocId IN ({placeholders})
+            UNION
+            SELECT sourceDocId, targetDocId, weight, distance, evidenceJson FROM graph_edges
+            WHERE edgeType = ? AND targetDocId IN ({placeholders})
+            """,
+            [edge_type] + chunk + [edge_type] + chunk,
+        ).fetchall()
+        for r in rows:
+            key = (r["sourceDocId"], r["targetDocId"])
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                evidence = json.loads(r["evidenceJson"] or "[]")
+            except Exception:
+                evidence = []
+            result.append({
+                "sourceDocId": r["sourceDocId"],
+                "targetDocId": r["targetDocId"],
+                "weight": r["weight"],
+                "distance": r["distance"],
+                "evidence": evidence,
+            })
+    return result
+
+
+def apply_graph_edge_changes(
+    upserts: list[dict],
+    deletes: list[tuple[str, str]],
+    edge_type: str,
+    model: str,
+):
+    """
+    바뀐 엣지만 upsert/delete (증분 재계산용).
+    upserts: [{sourceDocId,targetDocId,weight,distance,evidence}]
+    deletes: [(sourceDocId, targetDocId)]
+    """
+    if not upserts and not deletes:
+        return
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO graph_edges
+            (sourceDocId, targetDocId, edgeType, weight, distance, evidenceJson, model, updatedAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(sourceDocId, targetDocId, edgeType) DO UPDATE SET
+                weight = excluded.weight,
+                distance = excluded.distance,
+                evidenceJson = excluded.evidenceJson,
+                model = excluded.model,
+                updatedAt = excluded.updatedAt
+            """,
+            [
+                (
+                    row["sourceDocId"],
+                    row["targetDocId"],
+                    edge_type,
+                    float(row["weight"]),
+                    float(row["distance"]),
+                    json.dumps(row.get("evidence", []), ensure_ascii=False),
+                    model,
+                    now,
+                )
+                for row in upserts
+            ],
+        )
+        conn.executemany(
+            "DELETE FROM graph_edges WHERE sourceDocId = ? AND targetDocId = ? AND edgeType = ?",
+            [(s, t, edge_type) for s, t in deletes],
+        )
+
+
+# ─── 태그 유사도 캐시 ──────────────────────────────
+# 재계산마다 필요한 쌍만 (model, tagA, tagB) 키로 조회하고, 최근 조회한 쌍은 프로세스 내 LRU에 둔다.
+# 테이블이 수백만 쌍으로 커져도 메모리·조회 시간은 필요한 쌍 수에만 비례한다.
+TAG_SIM_LRU_SIZE = int(os.environ.get("MY_GRAPH_TAG_SIM_LRU", "200000"))
+_PAIR_LOOKUP_CHUNK = 50_000  # 임시 테이블 1회 적재 크기 (메모리 상한)
+
+
+class _PairLRU:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items: OrderedDict[tuple, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list[tuple]) -> dict[tuple, float]:
+        found: dict[tuple, float] = {}
+        with self._lock:
+            for key in keys:
+                score = self._items.get(key)
+                if score is None:
+                    continue
+                self._items.move_to_end(key)
+                found[key] = score
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict[tuple, float]):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            for key, score in items.items():
+                self._items[key] = score
+                self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def discard(self, predicate: Callable[[tuple], bool]):
+        with self._lock:
+            for key in [k for k in self._items if predicate(k)]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._items), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+
+_tag_sim_lru = _PairLRU(TAG_SIM_LRU_SIZE)
+
+
+def get_tag_similarities(pairs: Iterable[tuple[str, str]], model: str) -> dict[tuple[str, str], float]:
+    """
+    필요한 (tagA, tagB) 쌍만 조회. 반환: {(tagA, tagB): score} — 캐시에 없는 쌍은 포함되지 않음.
+    LRU에 없는 쌍은 임시 테이블에 넣고 PK (model, tagA, tagB)로 join해 한 번에 읽는다.
+    """
+    wanted = list(dict.fromkeys(pairs))
+    if not wanted:
+        return {}
+    lru_keys = [(DB_PATH, model, a, b) for a, b in wanted]
+    result = {(k[2], k[3]): score for k, score in _tag_sim_lru.get_many(lru_keys).items()}
+    missing = [pair for pair in wanted if pair not in result]
+    if not missing:
+        return result
+
+    conn = _get_conn()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _tag_pair_lookup (tagA TEXT NOT NULL, tagB TEXT NOT NULL)")
+    found: dict[tuple[str, str], float] = {}
+    try:
+        for start in range(0, len(missing), _PAIR_LOOKUP_CHUNK):
+            conn.executemany(
+                "INSERT INTO _tag_pair_lookup (tagA, tagB) VALUES (?, ?)",
+                missing[start : start + _PAIR_LOOKUP_CHUNK],
+            )
+            rows = conn.execute(
+                """
+                SELECT c.tagA, c.tagB, c.score
+                FROM _tag_pair_lookup p
+                JOIN tag_similarity_cache c
+                  ON c.model = ? AND c.tagA = p.tagA AND c.tagB = p.tagB
+                """,
+                (model,),
+            ).fetchall()
+            for r in rows:
+                found[(r["tagA"], r["tagB"])] = r["score"]
+            conn.execute("DELETE FROM _tag_pair_lookup")
+    finally:
+        conn.commit()
+    _tag_sim_lru.put_many({(DB_PATH, model, a, b): score for (a, b), score in found.items()})
+    result.update(found)
+    return result
 
 
 def get_tag_similarity_cache(model: str) -> dict[tuple[str, str], float]:
+    """모델의 캐시 전체 (진단·내보내기용 — 재계산에서는 get_tag_similarities 사용)."""
     conn = _get_conn()
     rows = conn.execute(
         "SELECT tagA, tagB, score FROM tag_similarity_cache WHERE model = ?",
         (model,),
     ).fetchall()
-    conn.close()
     return {(r["tagA"], r["tagB"]): r["score"] for r in rows}
 
 
@@ -274,13 +1107,13 @@ def save_tag_similarity_cache(pairs: list[dict], model: str):
     now = datetime.now(timezone.utc).isoformat()
     conn.executemany(
         """
-        INSERT OR REPLACE INTO tag_similarity_cache (tagA, tagB, score, model, updatedAt)
+        INSERT OR REPLACE INTO tag_similarity_cache (model, tagA, tagB, score, updatedAt)
         VALUES (?, ?, ?, ?, ?)
         """,
-        [(p["tagA"], p["tagB"], float(p["score"]), model, now) for p in pairs],
+        [(model, p["tagA"], p["tagB"], float(p["score"]), now) for p in pairs],
     )
     conn.commit()
-    conn.close()
+    _tag_sim_lru.put_many({(DB_PATH, model, p["tagA"], p["tagB"]): float(p["score"]) for p in pairs})
 
 
 def invalidate_tag_similarity_cache(tags: list[str], model: str):
@@ -288,13 +1121,26 @@ def invalidate_tag_similarity_cache(tags: list[str], model: str):
     if not tags:
         return
     conn = _get_conn()
-    placeholders = ",".join("?" for _ in tags)
-    conn.execute(
-        f"DELETE FROM tag_similarity_cache WHERE model = ? AND (tagA IN ({placeholders}) OR tagB IN ({placeholders}))",
-        [model] + tags + tags,
-    )
+    for start in range(0, len(tags), _IN_CHUNK):
+        chunk = tags[start : start + _IN_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        conn.execute(
+            f"DELETE FROM tag_similarity_cache WHERE model = ? AND tagA IN ({placeholders})",
+            [model] + chunk,
+        )
+        conn.execute(
+            f"DELETE FROM tag_similarity_cache WHERE model = ? AND tagB IN ({placeholders})",
+            [model] + chunk,
+        )
     conn.commit()
-    conn.close()
+    removed = set(tags)
+    _tag_sim_lru.discard(
+        lambda k: k[0] == DB_PATH and k[1] == model and (k[2] in removed or k[3] in removed)
+    )
+
+
+def tag_similarity_cache_stats() -> dict:
+    return _tag_sim_lru.stats()
 
 
 def list_graph_edges(edge_type: str = "tag_semantic", min_weight: float = 0.0, limit: int = 2000) -> list[dict]:
@@ -309,7 +1155,6 @@ def list_graph_edges(edge_type: str = "tag_semantic", min_weight: float = 0.0, l
         """,
         (edge_type, float(min_weight), int(limit)),
     ).fetchall()
-    conn.close()
     result: list[dict] = []
     for r in rows:
         item = dict(r)
@@ -320,3 +1165,363 @@ def list_graph_edges(edge_type: str = "tag_semantic", min_weight: float = 0.0, l
         item.pop("evidenceJson", None)
         result.append(item)
     return result
+
+
+# ─── 자동 태그 추출 캐시 ───────────────────────────
+# 같은 평문을 다시 저장하면 Kiwi 분석·AI 호출 없이 이전 결과를 돌려준다.
+# 행 수가 상한을 넘으면 lastUsedAt이 오래된 행부터 지운다.
+EXTRACTION_CACHE_MAX = int(os.environ.get("MY_GRAPH_EXTRACTION_CACHE_MAX", "20000"))
+_extraction_counters: dict[str, dict[str, int]] = {}
+_extraction_lock = threading.Lock()
+
+
+def _count_extraction(extractor: str, field: str):
+    with _extraction_lock:
+        counters = _extraction_counters.setdefault(extractor, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+
+def get_extraction(extractor: str, model: str, text_hash: str) -> list[str] | None:
+    """캐시된 추출 결과. 없으면 None (히트 시 lastUsedAt 갱신)."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT resultJson FROM extraction_cache WHERE extractor = ? AND model = ? AND textHash = ?",
+        (extractor, model, text_hash),
+    ).fetchone()
+    if row is None:
+        _count_extraction(extractor, "misses")
+        return None
+    conn.execute(
+        "UPDATE extraction_cache SET lastUsedAt = ? WHERE extractor = ? AND model = ? AND textHash = ?",
+        (datetime.now(timezone.utc).isoformat(), extractor, model, text_hash),
+    )
+    conn.commit()
+    _count_extraction(extractor, "hits")
+    return json.loads(row["resultJson"])
+
+
+def save_extraction(extractor: str, model: str, text_hash: str, result: list[str]):
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO extraction_cache (extractor, model, textHash, resultJson, createdAt, lastUsedAt)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (extractor, model, text_hash, json.dumps(result, ensure_ascii=False), now, now),
+    )
+    overflow = conn.execute("SELECT COUNT(*) AS n FROM extraction_cache").fetchone()["n"] - EXTRACTION_CACHE_MAX
+    if overflow > 0:
+        conn.execute(
+            """
+            DELETE FROM extraction_cache WHERE (extractor, model, textHash) IN (
+                SELECT extractor, model, textHash FROM extraction_cache ORDER BY lastUsedAt LIMIT ?
+            )
+            """,
+            (overflow,),
+        )
+    conn.commit()
+
+
+def extraction_cache_stats() -> dict:
+    """추출기별 히트/미스(프로세스 시작 이후)·히트율과 저장된 행 수."""
+    conn = _get_conn()
+    rows = conn.execute("SELECT extractor, COUNT(*) AS n FROM extraction_cache GROUP BY extractor").fetchall()
+    entries = {r["extractor"]: r["n"] for r in rows}
+    with _extraction_lock:
+        counters = {name: dict(c) for name, c in _extraction_counters.items()}
+    extractors = {}
+    for name in sorted(set(entries) | set(counters)):
+        c = counters.get(name, {"hits": 0, "misses": 0})
+        total = c["hits"] + c["misses"]
+        extractors[name] = {
+            **c,
+            "hitRate": round(c["hits"] / total, 4) if total else None,
+            "entries": entries.get(name, 0),
+        }
+    return {"capacity": EXTRACTION_CACHE_MAX, "entries": sum(entries.values()), "extractors": extractors}
+
+
+# ─── URL 수집 캐시 ────────────────────────────────
+# 링크 미리보기·URL 분석 결과를 정규화 URL 단위로 보관. 행 수 상한을 넘으면 lastUsedAt 오래된 순 제거.
+URL_CACHE_MAX = int(os.environ.get("MY_GRAPH_URL_CACHE_MAX", "5000"))
+_URL_CACHE_COLUMNS = (
+    "metaJson", "text", "textHash", "analysisJson", "analysisModel",
+    "etag", "lastModified", "error", "status", "fetchedAt", "expiresAt",
+)
+
+
+def get_url_cache(url: str, now: float) -> dict | None:
+    """캐시 행 (meta/analysis는 JSON 해석). 조회 시 lastUsedAt 갱신."""
+    conn = _get_conn()
+    row = conn.execute("SELECT * FROM url_cache WHERE url = ?", (url,)).fetchone()
+    if row is None:
+        return None
+    conn.execute("UPDATE url_cache SET lastUsedAt = ? WHERE url = ?", (now, url))
+    conn.commit()
+    entry = dict(row)
+    entry["meta"] = json.loads(entry.pop("metaJson")) if row["metaJson"] else None
+    entry["analysis"] = json.loads(entry.pop("analysisJson")) if row["analysisJson"] else None
+    return entry
+
+
+def save_url_cache(url: str, entry: dict, now: float):
+    """entry: get_url_cache 형식 (meta/analysis는 dict). 전체 행을 교체한다."""
+    conn = _get_conn()
+    values = {
+        **{c: entry.get(c) for c in _URL_CACHE_COLUMNS},
+        "metaJson": json.dumps(entry["meta"], ensure_ascii=False) if entry.get("meta") is not None else None,
+        "analysisJson": json.dumps(entry["analysis"], ensure_ascii=False) if entry.get("analysis") is not None else None,
+    }
+    columns = ", ".join(("url",) + _URL_CACHE_COLUMNS + ("lastUsedAt",))
+    placeholders = ", ".join("?" for _ in range(len(_URL_CACHE_COLUMNS) + 2))
+    conn.execute(
+        f"INSERT OR REPLACE INTO url_cache ({columns}) VALUES ({placeholders})",
+        [url] + [values[c] for c in _URL_CACHE_COLUMNS] + [now],
+    )
+    overflow = conn.execute("SELECT COUNT(*) AS n FROM url_cache").fetchone()["n"] - URL_CACHE_MAX
+    if overflow > 0:
+        conn.execute(
+            "DELETE FROM url_cache WHERE url IN (SELECT url FROM url_cache ORDER BY lastUsedAt LIMIT ?)",
+            (overflow,),
+        )
+    conn.commit()
+
+
+def url_cache_counts() -> dict:
+    conn = _get_conn()
+    row = conn.execute(
+        """
+        SELECT COUNT(*) AS entries,
+               COALESCE(SUM(error IS NOT NULL), 0) AS negativeEntries,
+               COALESCE(SUM(analysisJson IS NOT NULL), 0) AS analyses
+        FROM url_cache
+        """
+    ).fetchone()
+    return {"capacity": URL_CACHE_MAX, **dict(row)}
+
+
+# ─── 전문 검색 ─────────────────────────────────────
+FTS_MIN_TERM = 3  # trigram 토크나이저가 매칭할 수 있는 최소 글자 수
+BIGRAM_TERM = 2   # doc_bigram으로 찾는 단어 길이
+_SNIPPET_TOKENS = 12
+_WORD_RE = re.compile(r"[^\W_]+")  # unicode61 토큰 문자(글자·숫자)만의 연속
+
+
+def _fts_available(conn: sqlite3.Connection, table: str = "doc_fts") -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def _bigram_tokens(*texts: str) -> str:
+    """단어별 겹치는 2글자 토큰 (문서당 중복 제거, 소문자). "그래프 DB" → "db 그래 래프"."""
+    grams: set[str] = set()
+    for text in texts:
+        for word in _WORD_RE.findall((text or "").lower()):
+            grams.update(word[i:i + 2] for i in range(len(word) - 1))
+    return " ".join(sorted(grams))
+
+
+def _is_bigram_term(term: str) -> bool:
+    return len(term) == BIGRAM_TERM and _WORD_RE.fullmatch(term) is not None
+
+
+def upsert_search_docs(rows: list[dict]):
+    """rows: [{docId, title, body, tags(list), updatedAt}] — FTS 색인은 트리거로 함께 갱신."""
+    if not rows:
+        return
+    conn = _get_conn()
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO search_docs (docId, title, body, tags, updatedAt)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(docId) DO UPDATE SET
+                title = excluded.title,
+                body = excluded.body,
+                tags = excluded.tags,
+                updatedAt = excluded.updatedAt
+            """,
+            [
+                (
+                    r["docId"],
+                    r.get("title") or "",
+                    r.get("body") or "",
+                    " ".join(r.get("tags") or []),
+                    r.get("updatedAt") or "",
+                )
+                for r in rows
+            ],
+        )
+        if _fts_available(conn, "doc_bigram"):
+            for r in rows:
+                rowid = conn.execute(
+                    "SELECT rowid FROM search_docs WHERE docId = ?", (r["docId"],)
+                ).fetchone()[0]
+                conn.execute("DELETE FROM doc_bigram WHERE rowid = ?", (rowid,))
+                conn.execute(
+                    "INSERT INTO doc_bigram (rowid, grams) VALUES (?, ?)",
+                    (rowid, _bigram_tokens(r.get("title"), r.get("body"), " ".join(r.get("tags") or []))),
+                )
+
+
+def delete_search_docs(doc_ids: list[str]):
+    if not doc_ids:
+        return
+    conn = _get_conn()
+    with conn:
+        for start in range(0, len(doc_ids), _IN_CHUNK):
+            chunk = doc_ids[start:start + _IN_CHUNK]
+            marks = ",".join("?" for _ in chunk)
+            conn.execute(f"DELETE FROM search_docs WHERE docId IN ({marks})", chunk)
+
+
+def list_search_doc_versions() -> dict[str, tuple[str, str]]:
+    """색인된 문서 {docId: (updatedAt, tags)} (원본 메타와 동기화 비교용)."""
+    conn = _get_conn()
+    return {
+        r["docId"]: (r["updatedAt"], r["tags"])
+        for r in conn.execute("SELECT docId, updatedAt, tags FROM search_docs")
+    }
+
+
+def get_search_doc_previews(doc_ids: list[str], width: int = 160) -> dict[str, dict]:
+    """색인된 문서의 {docId: {title, snippet(본문 앞부분)}} — 벡터 검색 결과 표시용."""
+    result: dict[str, dict] = {}
+    if not doc_ids:
+        return result
+    conn = _get_conn()
+    for start in range(0, len(doc_ids), _IN_CHUNK):
+        chunk = doc_ids[start:start + _IN_CHUNK]
+        marks = ",".join("?" for _ in chunk)
+        for r in conn.execute(
+            f"""
+            SELECT docId, title, substr(body, 1, ?) AS lead, length(body) AS bodyLen
+            FROM search_docs WHERE docId IN ({marks})
+            """,
+            [width, *chunk],
+        ):
+            snippet = r["lead"] + ("…" if r["bodyLen"] > width else "")
+            result[r["docId"]] = {"title": r["title"], "snippet": snippet}
+    return result
+
+
+def _split_search_terms(query: str) -> list[str]:
+    return [t for t in (query or "").split() if t.strip('"')]
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _like_clause(terms: list[str]) -> tuple[str, list[str]]:
+    """단어마다 제목/본문/태그 중 하나에 포함되어야 하는 AND 조건."""
+    sql = ""
+    params: list[str] = []
+    for term in terms:
+        sql += (
+            " AND (s.title LIKE ? ESCAPE '\\' OR s.body LIKE ? ESCAPE '\\'"
+            " OR s.tags LIKE ? ESCAPE '\\')"
+        )
+        params.extend([_like_pattern(term)] * 3)
+    return sql, params
+
+
+def _bigram_clause(terms: list[str]) -> tuple[str, list[str]]:
+    """2글자 단어들을 doc_bigram MATCH 한 번으로 거르는 AND 조건."""
+    if not terms:
+        return "", []
+    match = " AND ".join(_fts_phrase(t.lower()) for t in terms)
+    return " AND s.rowid IN (SELECT rowid FROM doc_bigram WHERE doc_bigram MATCH ?)", [match]
+
+
+def search_docs(query: str, limit: int = 20, offset: int = 0) -> dict:
+    """
+    전문 검색 → {items: [{id, title, snippet, score}], mode}.
+    - 3글자 이상 단어: FTS5 trigram MATCH (부분 문자열 = 접두어 검색 포함), bm25 정렬
+      (제목 10 : 본문 1 : 태그 5 가중치), 제목/본문 일치 구간은 <mark>로 강조
+    - 2글자 단어(글자·숫자만): doc_bigram 2-gram 색인 MATCH로 거름
+    - 그 외 짧은 단어(1글자, 기호 포함): 색인으로 찾을 수 없어 LIKE 조건으로 함께 적용
+    모든 단어는 AND 조건.
+    """
+    terms = _split_search_terms(query)
+    if not terms:
+        return {"items": [], "mode": "empty"}
+    conn = _get_conn()
+    long_terms = [t for t in terms if len(t) >= FTS_MIN_TERM]
+    short_terms = [t for t in terms if len(t) < FTS_MIN_TERM]
+    bigram_terms: list[str] = []
+    if short_terms and _fts_available(conn, "doc_bigram"):
+        bigram_terms = [t for t in short_terms if _is_bigram_term(t)]
+        short_terms = [t for t in short_terms if not _is_bigram_term(t)]
+    bigram_sql, bigram_params = _bigram_clause(bigram_terms)
+
+    if long_terms and _fts_available(conn):
+        like_sql, like_params = _like_clause(short_terms)
+        match = " AND ".join(_fts_phrase(t) for t in long_terms)
+        rows = conn.execute(
+            f"""
+            SELECT s.docId,
+                   highlight(doc_fts, 0, '<mark>', '</mark>') AS title,
+                   snippet(doc_fts, 1, '<mark>', '</mark>', '…', {_SNIPPET_TOKENS}) AS snippet,
+                   bm25(doc_fts, 10.0, 1.0, 5.0) AS rank
+            FROM doc_fts JOIN search_docs s ON s.rowid = doc_fts.rowid
+            WHERE doc_fts MATCH ?{bigram_sql}{like_sql}
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+            """,
+            [match, *bigram_params, *like_params, int(limit), int(offset)],
+        ).fetchall()
+        items = [
+            {"id": r["docId"], "title": r["title"], "snippet": r["snippet"], "score": -r["rank"]}
+            for r in rows
+        ]
+        return {"items": items, "mode": "fts"}
+
+    # 2-gram 색인 / LIKE 대체 경로: 제목 일치 우선, 최근 수정 순
+    like_sql, like_params = _like_clause(long_terms + short_terms)
+    first = _like_pattern(terms[0])
+    rows = conn.execute(
+        f"""
+        SELECT s.docId, s.title, s.body,
+               (s.title LIKE ? ESCAPE '\\') AS titleHit
+        FROM search_docs s
+        WHERE 1 = 1{bigram_sql}{like_sql}
+        ORDER BY titleHit DESC, s.updatedAt DESC
+        LIMIT ? OFFSET ?
+        """,
+        [first, *bigram_params, *like_params, int(limit), int(offset)],
+    ).fetchall()
+    items = [
+        {
+            "id": r["docId"],
+            "title": r["title"],
+            "snippet": _like_snippet(r["body"], terms[0]),
+            "score": float(r["titleHit"]),
+        }
+        for r in rows
+    ]
+    return {"items": items, "mode": "bigram" if bigram_terms else "like"}
+
+
+def _like_snippet(body: str, term: str, width: int = 40) -> str:
+    """LIKE 경로용 스니펫: 첫 일치 위치 주변 텍스트 + <mark> 강조."""
+    pos = body.lower().find(term.lower())
+    if pos < 0:
+        return body[: width * 2] + ("…" if len(body) > width * 2 else "")
+    start = max(0, pos - width)
+    end = min(len(body), pos + len(term) + width)
+    return (
+        ("…" if start > 0 else "")
+        + body[start:pos]
+        + "<mark>" + body[pos:pos + len(term)] + "</mark>"
+        + body[pos + len(term):end]
+        + ("…" if end < len(body) else "")
+    )
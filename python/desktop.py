@@ -45,7 +45,7 @@ def _wait_for_server(host: str, port: int, timeout: float = 10.0):
     deadline = time.time() + timeout
     while time.time() < deadline:
         try:
-            urllib.request.urlopen(f"http://{host}:{port}/api/docs", timeout=1)
+            urllib.request.urlopen(f"http://{host}:{port}/api/ready", timeout=1)
             return True
         except Exception:
             time.sleep(0.3)
@@ -4,13 +4,23 @@ Electron main.cjs의 IPC 핸들러를 Python으로 이식한 서비스 계층
 """
 import json
 import re
+import atexit
+import base64
+import copy
+import tempfile
 import os
 import uuid
 import math
+import threading
 from pathlib import Path
 from typing import Optional
 from datetime import datetime, timezone
+from bisect import bisect_left
 from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from meta_store import SqliteMetaStore
 
 # 기본 데이터 디렉토리 (환경변수로 오버라이드 가능)
 _DEFAULT_DATA_DIR = os.path.join(
@@ -22,6 +32,12 @@ DATA_DIR = Path(os.environ.get("MY_GRAPH_DATA_DIR", _DEFAULT_DATA_DIR))
 DOCS_DIR = DATA_DIR / "docs"
 TRASH_DIR = DATA_DIR / "trash"
 META_PATH = DATA_DIR / "meta.json"
+META_DB_PATH = DATA_DIR / "meta.db"
+
+# 메타데이터 백엔드: "json"(기본, meta.json) | "sqlite"(meta.db, 인덱스 테이블)
+META_BACKEND = os.environ.get("MY_GRAPH_META_BACKEND", "json").strip().lower()
+# meta.json 변경을 모아서 기록할 지연 시간(초). 0이면 변경(또는 meta_batch) 종료 즉시 기록
+META_FLUSH_DELAY = float(os.environ.get("MY_GRAPH_META_FLUSH_DELAY", "0"))
 
 _EMPTY_META = {
     "documents": {},
@@ -36,17 +52,256 @@ def _ensure_data_dir():
     DOCS_DIR.mkdir(parents=True, exist_ok=True)
     TRASH_DIR.mkdir(parents=True, exist_ok=True)
     if not META_PATH.exists():
-        META_PATH.write_text(json.dumps(_EMPTY_META, ensure_ascii=False, indent=2), encoding="utf-8")
+        _atomic_write_json(META_PATH, _EMPTY_META)
+
+
+def _atomic_write_json(path: Path, data: dict):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 os.replace — 읽는 쪽은 항상 완전한 파일만 본다"""
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
 
 
 def get_meta() -> dict:
-    _ensure_data_dir()
-    return json.loads(META_PATH.read_text(encoding="utf-8"))
+    """meta 전체 사본 (호출자가 수정해도 캐시에 영향 없음)"""
+    if _use_sqlite():
+        return _meta_db().export_meta()
+    with _meta_lock:
+        return copy.deepcopy(_load_meta())
 
 
 def save_meta(meta: dict):
+    if _use_sqlite():
+        _meta_db().import_meta(meta)
+        return
+    with _meta_txn() as cached:
+        cached.clear()
+        cached.update(copy.deepcopy(meta))
+
+
+# ─── meta.json 캐시 ──────────────────────────────
+# 프로세스 단위 캐시: 파일의 (mtime, size)가 바뀌었을 때만 다시 파싱한다.
+# 모든 읽기/읽기-수정-쓰기는 _meta_lock 아래에서 캐시 dict를 직접 다루고,
+# 변경은 dirty 표시 후 meta_batch 종료(또는 META_FLUSH_DELAY 경과) 시 한 번에 기록된다.
+
+_meta_lock = threading.RLock()
+_meta_cache: Optional[dict] = None
+_meta_stat: Optional[tuple[int, int]] = None
+_meta_dirty = False
+_meta_version = 0  # 캐시 내용이 바뀔 때마다 증가 (목록 색인 무효화용)
+_meta_flush_timer: Optional[threading.Timer] = None
+_meta_batch_local = threading.local()
+_meta_stats = {"reads": 0, "hits": 0, "flushes": 0}
+
+
+def _file_stat(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_meta() -> dict:
+    """캐시된 meta dict (호출자는 _meta_lock 보유). 수정은 _meta_txn 안에서만."""
+    global _meta_cache, _meta_stat, _meta_version
+    _meta_stats["reads"] += 1
+    if _meta_cache is not None and _meta_dirty:
+        _meta_stats["hits"] += 1
+        return _meta_cache  # 아직 기록 전인 변경이 최신
+    stat = _file_stat(META_PATH)
+    if _meta_cache is not None and stat is not None and stat == _meta_stat:
+        _meta_stats["hits"] += 1
+        return _meta_cache
     _ensure_data_dir()
-    META_PATH.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    stat = _file_stat(META_PATH)
+    _meta_cache = json.loads(META_PATH.read_text(encoding="utf-8"))
+    _meta_stat = stat
+    _meta_version += 1
+    return _meta_cache
+
+
+def _batch_depth() -> int:
+    return getattr(_meta_batch_local, "depth", 0)
+
+
+@contextmanager
+def meta_batch() -> Iterator[None]:
+    """
+    블록 안의 메타 변경을 모아 한 번에 반영 (중첩 가능).
+    JSON 백엔드는 종료 시 meta.json 한 번만 기록, SQLite 백엔드는 블록 전체가 한 트랜잭션.
+    SQLite 트랜잭션이 롤백되면 블록 안에서 save_doc이 쓴 .md 파일도 되돌린다.
+    """
+    outermost = _batch_depth() == 0
+    _meta_batch_local.depth = _batch_depth() + 1
+    try:
+        if _use_sqlite():
+            if outermost:
+                _meta_batch_local.written = []
+            try:
+                with _meta_db().transaction():
+                    yield
+            except BaseException:
+                if outermost:
+                    _undo_doc_writes(_meta_batch_local.written)
+                raise
+        else:
+            yield
+    finally:
+        _meta_batch_local.depth -= 1
+        if _meta_batch_local.depth == 0:
+            _meta_batch_local.written = None
+            _schedule_flush()
+
+
+def _write_doc_file(file_path: Path, content: str):
+    """문서 파일 기록. SQLite meta_batch 안이면 롤백 때 되돌릴 수 있게 이전 내용을 남긴다."""
+    written = getattr(_meta_batch_local, "written", None)
+    if written is not None:
+        written.append((file_path, file_path.read_bytes() if file_path.exists() else None))
+    file_path.write_text(content, encoding="utf-8")
+
+
+def _undo_doc_writes(written: list[tuple[Path, Optional[bytes]]]):
+    """롤백된 meta_batch의 파일 기록 취소 — 새 파일은 삭제, 덮어쓴 파일은 이전 내용 복원."""
+    for file_path, previous in reversed(written):
+        try:
+            if previous is None:
+                file_path.unlink(missing_ok=True)
+            else:
+                file_path.write_bytes(previous)
+        except OSError:
+            pass
+
+
+@contextmanager
+def _meta_txn() -> Iterator[dict]:
+    """잠금 + 캐시 meta 읽기-수정-쓰기. 블록이 정상 종료되면 변경을 기록 대상으로 표시."""
+    global _meta_cache, _meta_dirty, _meta_version
+    with _meta_lock:
+        with meta_batch():
+            meta = _load_meta()
+            try:
+                yield meta
+            except BaseException:
+                if not _meta_dirty:
+                    _meta_cache = None  # 부분 수정된 캐시는 버리고 파일에서 다시 읽음
+                raise
+            _meta_dirty = True
+            _meta_version += 1
+
+
+def _schedule_flush():
+    global _meta_flush_timer
+    with _meta_lock:
+        if not _meta_dirty:
+            return
+        if META_FLUSH_DELAY <= 0:
+            flush_meta()
+        elif _meta_flush_timer is None:
+            _meta_flush_timer = threading.Timer(META_FLUSH_DELAY, flush_meta)
+            _meta_flush_timer.daemon = True
+            _meta_flush_timer.start()
+
+
+def flush_meta():
+    """대기 중인 meta 변경을 원자적으로 기록 (종료 처리/지연 기록용)"""
+    global _meta_dirty, _meta_stat, _meta_flush_timer
+    with _meta_lock:
+        if _meta_flush_timer is not None:
+            _meta_flush_timer.cancel()
+            _meta_flush_timer = None
+        if not _meta_dirty or _meta_cache is None:
+            return
+        _ensure_data_dir()
+        _atomic_write_json(META_PATH, _meta_cache)
+        _meta_stat = _file_stat(META_PATH)
+        _meta_dirty = False
+        _meta_stats["flushes"] += 1
+
+
+def meta_cache_stats() -> dict:
+    with _meta_lock:
+        return {**_meta_stats, "dirty": _meta_dirty}
+
+
+atexit.register(flush_meta)
+
+
+# ─── SQLite 메타 백엔드 ──────────────────────────
+
+_meta_store: Optional[SqliteMetaStore] = None
+_meta_store_lock = threading.Lock()
+
+
+def _use_sqlite() -> bool:
+    return META_BACKEND == "sqlite"
+
+
+def _meta_db() -> SqliteMetaStore:
+    """meta.db 저장소 (첫 사용 시 비어 있으면 meta.json에서 1회 이관)"""
+    global _meta_store
+    if _meta_store is None:
+        with _meta_store_lock:
+            if _meta_store is None:
+                _ensure_data_dir()
+                store = SqliteMetaStore(META_DB_PATH)
+                if store.is_empty():
+                    _import_meta_json(store)
+                _meta_store = store
+    return _meta_store
+
+
+def _import_meta_json(store: SqliteMetaStore):
+    """meta.json + meta에 없는 .md 파일을 저장소에 적재"""
+    meta = json.loads(META_PATH.read_text(encoding="utf-8")) if META_PATH.exists() else {}
+    documents = meta.setdefault("documents", {})
+    for p in DOCS_DIR.glob("*.md"):
+        documents.setdefault(p.stem, {"title": p.stem, "updatedAt": ""})
+    store.import_meta(meta)
+
+
+def migrate_meta_to_sqlite() -> dict:
+    """meta.json → meta.db 이관 (기존 meta.db 내용은 교체). 이관된 건수 반환."""
+    _ensure_data_dir()
+    store = SqliteMetaStore(META_DB_PATH)
+    _import_meta_json(store)
+    meta = store.export_meta()
+    return {"documents": len(meta["documents"]), "folders": len(meta["folders"])}
+
+
+def export_meta_json(path: Optional[Path] = None) -> Path:
+    """현재 백엔드의 메타데이터를 meta.json 형식으로 기록 (백업/호환용)"""
+    _ensure_data_dir()
+    target = Path(path) if path else META_PATH
+    if not _use_sqlite() and target == META_PATH:
+        flush_meta()
+        return target
+    _atomic_write_json(target, get_meta())
+    return target
+
+
+def reset_meta_store():
+    """백업 복구 등으로 데이터 디렉토리가 교체된 뒤 저장소 연결/캐시를 버리고 다시 연다"""
+    global _meta_store, _meta_cache, _meta_stat, _meta_dirty
+    with _meta_store_lock:
+        if _meta_store is not None:
+            _meta_store.close()
+        _meta_store = None
+    with _meta_lock:
+        _meta_cache = None
+        _meta_stat = None
+        _meta_dirty = False
 
 
 def _safe_id(raw: str) -> str:
@@ -71,26 +326,166 @@ def _new_doc_id(title: str) -> str:
 
 def list_docs(folder: Optional[str] = None) -> list[dict]:
     _ensure_data_dir()
-    meta = get_meta()
+    if _use_sqlite():
+        return _meta_db().list_documents(folder=folder)
     ids = [p.stem for p in DOCS_DIR.glob("*.md")]
     items = []
-    doc_tags_map = meta.get("documentTags", {})
-    for doc_id in ids:
-        d = meta.get("documents", {}).get(doc_id, {})
-        doc_folder = meta.get("documentFolders", {}).get(doc_id)
-        items.append({
-            "id": doc_id,
-            "title": d.get("title", doc_id),
-            "updatedAt": d.get("updatedAt", ""),
-            "folder": doc_folder,
-            "tags": doc_tags_map.get(doc_id, []),
-        })
+    with _meta_lock:
+        meta = _load_meta()
+        doc_tags_map = meta.get("documentTags", {})
+        for doc_id in ids:
+            d = meta.get("documents", {}).get(doc_id, {})
+            doc_folder = meta.get("documentFolders", {}).get(doc_id)
+            items.append({
+                "id": doc_id,
+                "title": d.get("title", doc_id),
+                "updatedAt": d.get("updatedAt", ""),
+                "folder": doc_folder,
+                "tags": list(doc_tags_map.get(doc_id, [])),
+            })
     items.sort(key=lambda x: x.get("updatedAt", ""), reverse=True)
     if folder:
         items = [it for it in items if it.get("folder") == folder]
     return items
 
 
+def list_docs_page(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    folder: Optional[str] = None,
+    tag: Optional[str] = None,
+    updated_since: Optional[str] = None,
+) -> dict:
+    """
+    updatedAt 내림차순 커서 페이지네이션 목록 → {items, total, nextCursor}.
+    디렉토리 스캔 대신 색인(SQLite 테이블 / meta 캐시 기반 정렬 색인)에서 필터와 커서를 적용.
+    잘못된 cursor는 ValueError.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    if limit is not None and limit <= 0:
+        raise ValueError("limit must be positive")
+    if _use_sqlite():
+        fetch = limit + 1 if limit is not None else None
+        items, total = _meta_db().list_documents_page(fetch, after, folder, tag, updated_since)
+    else:
+        with _meta_lock:
+            meta = _load_meta()
+            index = _doc_list_index(meta)
+            keys, total = index.page(limit + 1 if limit is not None else None, after, folder, tag, updated_since)
+            items = [index.item(meta, key) for key in keys]
+    next_cursor = None
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        next_cursor = _encode_cursor(items[-1]["updatedAt"], items[-1]["id"])
+    return {"items": items, "total": total, "nextCursor": next_cursor}
+
+
+def _encode_cursor(updated_at: str, doc_id: str) -> str:
+    raw = json.dumps([updated_at, doc_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, doc_id = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(updated_at, str) or not isinstance(doc_id, str):
+        raise ValueError("invalid cursor")
+    return updated_at, doc_id
+
+
+class _DocListIndex:
+    """
+    meta.json 백엔드용 목록 색인: (updatedAt, id) 오름차순 정렬 키와 폴더/태그별 키 목록.
+    list_docs와 같이 docs/*.md 파일이 문서 목록 기준 (meta에 없는 파일 포함, 파일 없는 meta 항목 제외).
+    meta 캐시나 docs 디렉토리가 바뀔 때만 다시 만들어지고, 페이지 조회는 bisect + 역순 순회.
+    """
+
+    def __init__(self, meta: dict, doc_ids: Iterable[str]):
+        documents = meta.get("documents", {})
+        doc_folders = meta.get("documentFolders", {})
+        doc_tags = meta.get("documentTags", {})
+        self.keys = sorted((documents.get(doc_id, {}).get("updatedAt", ""), doc_id) for doc_id in doc_ids)
+        self.by_folder: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        self.by_tag: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        for key in self.keys:
+            doc_folder = doc_folders.get(key[1])
+            if doc_folder:
+                self.by_folder[doc_folder].append(key)
+            for t in set(doc_tags.get(key[1], [])):
+                self.by_tag[t].append(key)
+
+    def page(
+        self,
+        limit: Optional[int],
+        after: Optional[tuple[str, str]],
+        folder: Optional[str],
+        tag: Optional[str],
+        updated_since: Optional[str],
+    ) -> tuple[list[tuple[str, str]], int]:
+        candidates = [self.keys]
+        if folder:
+            candidates.append(self.by_folder.get(folder, []))
+        if tag:
+            candidates.append(self.by_tag.get(tag, []))
+        # 가장 짧은 목록을 순회하고 나머지 조건은 집합 포함 여부로 확인
+        candidates.sort(key=len)
+        base = candidates[0]
+        others = [set(c) for c in candidates[1:] if c is not self.keys]
+        lo = bisect_left(base, (updated_since, "")) if updated_since else 0
+        hi = bisect_left(base, after) if after is not None else len(base)
+
+        if others:
+            total = sum(1 for key in base[lo:] if all(key in o for o in others))
+        else:
+            total = len(base) - lo
+        result: list[tuple[str, str]] = []
+        for i in range(hi - 1, lo - 1, -1):
+            key = base[i]
+            if others and not all(key in o for o in others):
+                continue
+            result.append(key)
+            if limit is not None and len(result) >= limit:
+                break
+        return result, total
+
+    @staticmethod
+    def item(meta: dict, key: tuple[str, str]) -> dict:
+        doc_id = key[1]
+        d = meta.get("documents", {}).get(doc_id, {})
+        return {
+            "id": doc_id,
+            "title": d.get("title", doc_id),
+            "updatedAt": d.get("updatedAt", ""),
+            "folder": meta.get("documentFolders", {}).get(doc_id),
+            "tags": list(meta.get("documentTags", {}).get(doc_id, [])),
+        }
+
+
+_doc_index: Optional[tuple[tuple, _DocListIndex]] = None
+
+
+def _doc_list_index(meta: dict) -> _DocListIndex:
+    """현재 meta 캐시 버전 + docs 디렉토리 상태의 목록 색인 (호출자는 _meta_lock 보유)"""
+    global _doc_index
+    version = (_meta_version, _file_stat(DOCS_DIR))
+    if _doc_index is None or _doc_index[0] != version:
+        _doc_index = (version, _DocListIndex(meta, (p.stem for p in DOCS_DIR.glob("*.md"))))
+    return _doc_index[1]
+
+
+def count_docs_by_folder() -> dict:
+    """{total, folders: {폴더: 문서 수}} — 목록 색인에서 계산 (파일 목록을 내려받지 않고 폴더 패널 표시용)."""
+    _ensure_data_dir()
+    if _use_sqlite():
+        return _meta_db().count_documents_by_folder()
+    with _meta_lock:
+        index = _doc_list_index(_load_meta())
+        return {"total": len(index.keys), "folders": {f: len(keys) for f, keys in index.by_folder.items()}}
+
+
 def get_doc(doc_id: str) -> Optional[dict]:
     _ensure_data_dir()
     safe = _safe_id(doc_id)
@@ -98,8 +493,11 @@ def get_doc(doc_id: str) -> Optional[dict]:
     if not file_path.exists():
         return None
     content = file_path.read_text(encoding="utf-8")
-    meta = get_meta()
-    d = meta.get("documents", {}).get(safe, {})
+    if _use_sqlite():
+        d = _meta_db().get_document(safe) or {}
+    else:
+        with _meta_lock:
+            d = dict(_load_meta().get("documents", {}).get(safe, {}))
     return {
         "id": safe,
         "title": d.get("title", safe),
@@ -113,20 +511,26 @@ def save_doc(doc_id: str, title: str, content: str) -> str:
     # 신규 생성(doc_id 없음)은 항상 고유 ID를 발급해 기존 문서 덮어쓰기를 방지
     safe = _safe_id(doc_id) if doc_id else _new_doc_id(title)
     file_path = DOCS_DIR / f"{safe}.md"
-    file_path.write_text(content or "", encoding="utf-8")
-
-    meta = get_meta()
-    from datetime import datetime, timezone
-    existing = meta.get("documents", {}).get(safe, {})
-    # 빈 제목으로 저장 시 기존 제목 유지 (ID가 표시되는 현상 방지)
-    effective_title = (title or "").strip() or existing.get("title") or safe
-    meta.setdefault("documents", {})[safe] = {
-        "title": effective_title,
-        "updatedAt": datetime.now(timezone.utc).isoformat(),
-    }
-    meta.setdefault("documentFolders", {}).setdefault(safe, None)
-    meta.setdefault("documentTags", {}).setdefault(safe, [])
-    save_meta(meta)
+    _write_doc_file(file_path, content or "")
+
+    if _use_sqlite():
+        store = _meta_db()
+        with store.transaction():
+            existing = store.get_document(safe) or {}
+            effective_title = (title or "").strip() or existing.get("title") or safe
+            store.upsert_document(safe, effective_title, datetime.now(timezone.utc).isoformat())
+        return safe
+
+    with _meta_txn() as meta:
+        existing = meta.get("documents", {}).get(safe, {})
+        # 빈 제목으로 저장 시 기존 제목 유지 (ID가 표시되는 현상 방지)
+        effective_title = (title or "").strip() or existing.get("title") or safe
+        meta.setdefault("documents", {})[safe] = {
+            "title": effective_title,
+            "updatedAt": datetime.now(timezone.utc).isoformat(),
+        }
+        meta.setdefault("documentFolders", {}).setdefault(safe, None)
+        meta.setdefault("documentTags", {}).setdefault(safe, [])
     return safe
 
 
@@ -135,35 +539,52 @@ def delete_doc(doc_id: str):
     _ensure_data_dir()
     safe = _safe_id(doc_id)
     file_path = DOCS_DIR / f"{safe}.md"
-    if not file_path.exists():
-        meta = get_meta()
+    if _use_sqlite():
+        _delete_doc_sqlite(safe, file_path)
+        return
+    with _meta_txn() as meta:
+        if file_path.exists():
+            doc_meta = meta.get("documents", {}).get(safe, {})
+            tags = meta.get("documentTags", {}).get(safe, [])
+            folder = meta.get("documentFolders", {}).get(safe)
+            content = file_path.read_text(encoding="utf-8")
+            trash_meta = {
+                "id": safe,
+                "title": doc_meta.get("title", safe),
+                "folder": folder,
+                "tags": tags,
+                "updatedAt": doc_meta.get("updatedAt", ""),
+                "deletedAt": datetime.now(timezone.utc).isoformat(),
+            }
+            trash_file = TRASH_DIR / f"{safe}.md"
+            trash_meta_file = TRASH_DIR / f"{safe}.meta.json"
+            trash_file.write_text(content, encoding="utf-8")
+            trash_meta_file.write_text(json.dumps(trash_meta, ensure_ascii=False, indent=2), encoding="utf-8")
+            file_path.unlink()
         meta.get("documents", {}).pop(safe, None)
         meta.get("documentTags", {}).pop(safe, None)
         meta.get("documentFolders", {}).pop(safe, None)
-        save_meta(meta)
-        return
-    meta = get_meta()
-    doc_meta = meta.get("documents", {}).get(safe, {})
-    tags = meta.get("documentTags", {}).get(safe, [])
-    folder = meta.get("documentFolders", {}).get(safe)
-    content = file_path.read_text(encoding="utf-8")
-    trash_meta = {
-        "id": safe,
-        "title": doc_meta.get("title", safe),
-        "folder": folder,
-        "tags": tags,
-        "updatedAt": doc_meta.get("updatedAt", ""),
-        "deletedAt": datetime.now(timezone.utc).isoformat(),
-    }
-    trash_file = TRASH_DIR / f"{safe}.md"
-    trash_meta_file = TRASH_DIR / f"{safe}.meta.json"
-    trash_file.write_text(content, encoding="utf-8")
-    trash_meta_file.write_text(json.dumps(trash_meta, ensure_ascii=False, indent=2), encoding="utf-8")
-    file_path.unlink()
-    meta.get("documents", {}).pop(safe, None)
-    meta.get("documentTags", {}).pop(safe, None)
-    meta.get("documentFolders", {}).pop(safe, None)
-    save_meta(meta)
+
+
+def _delete_doc_sqlite(safe: str, file_path: Path):
+    with _meta_db().transaction():
+        old = _meta_db().remove_document(safe) or {}
+        if not file_path.exists():
+            return
+        content = file_path.read_text(encoding="utf-8")
+        trash_meta = {
+            "id": safe,
+            "title": old.get("title") or safe,
+            "folder": old.get("folder"),
+            "tags": old.get("tags", []),
+            "updatedAt": old.get("updatedAt", ""),
+            "deletedAt": datetime.now(timezone.utc).isoformat(),
+        }
+        (TRASH_DIR / f"{safe}.md").write_text(content, encoding="utf-8")
+        (TRASH_DIR / f"{safe}.meta.json").write_text(
+            json.dumps(trash_meta, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        file_path.unlink()
 
 
 def list_trash() -> list[dict]:
@@ -188,16 +609,25 @@ def restore_from_trash(doc_id: str) -> bool:
     trash_meta_file = TRASH_DIR / f"{safe}.meta.json"
     if not trash_file.exists() or not trash_meta_file.exists():
         return False
-    meta = get_meta()
     trash_meta = json.loads(trash_meta_file.read_text(encoding="utf-8"))
     content = trash_file.read_text(encoding="utf-8")
-    meta.setdefault("documents", {})[safe] = {
-        "title": trash_meta.get("title", safe),
-        "updatedAt": datetime.now(timezone.utc).isoformat(),
-    }
-    meta.setdefault("documentFolders", {})[safe] = trash_meta.get("folder")
-    meta.setdefault("documentTags", {})[safe] = trash_meta.get("tags", [])
-    save_meta(meta)
+    if _use_sqlite():
+        _meta_db().upsert_document(
+            safe,
+            trash_meta.get("title", safe),
+            datetime.now(timezone.utc).isoformat(),
+            folder=trash_meta.get("folder"),
+            tags=trash_meta.get("tags", []),
+            replace_membership=True,
+        )
+    else:
+        with _meta_txn() as meta:
+            meta.setdefault("documents", {})[safe] = {
+                "title": trash_meta.get("title", safe),
+                "updatedAt": datetime.now(timezone.utc).isoformat(),
+            }
+            meta.setdefault("documentFolders", {})[safe] = trash_meta.get("folder")
+            meta.setdefault("documentTags", {})[safe] = trash_meta.get("tags", [])
     dest = DOCS_DIR / f"{safe}.md"
     dest.write_text(content, encoding="utf-8")
     trash_file.unlink()
@@ -325,70 +755,91 @@ def extract_keywords_nlp(html_content: str, top_k: int = 8) -> list[str]:
 
 
 def get_tags_for_doc(doc_id: str) -> list[str]:
-    meta = get_meta()
-    return meta.get("documentTags", {}).get(doc_id, [])
+    if _use_sqlite():
+        return _meta_db().get_tags(doc_id)
+    with _meta_lock:
+        return list(_load_meta().get("documentTags", {}).get(doc_id, []))
 
 
 def set_tags_for_doc(doc_id: str, tags: list[str]):
-    meta = get_meta()
-    meta.setdefault("documentTags", {})[doc_id] = tags
-    save_meta(meta)
+    if _use_sqlite():
+        _meta_db().set_tags(doc_id, tags)
+        return
+    with _meta_txn() as meta:
+        meta.setdefault("documentTags", {})[doc_id] = list(tags)
 
 
 def get_all_tags() -> list[str]:
-    meta = get_meta()
+    if _use_sqlite():
+        return _meta_db().all_tags()
     tag_set: set[str] = set()
-    for tags in meta.get("documentTags", {}).values():
-        tag_set.update(tags)
+    with _meta_lock:
+        for tags in _load_meta().get("documentTags", {}).values():
+            tag_set.update(tags)
     return sorted(tag_set)
 
 
 # ─── 폴더 (논리적 카테고리) ───────────────────────
 
 def list_folders() -> list[str]:
-    meta = get_meta()
-    return meta.get("folders", [])
+    if _use_sqlite():
+        return _meta_db().list_folders()
+    with _meta_lock:
+        return list(_load_meta().get("folders", []))
 
 
 def create_folder(name: str) -> list[str]:
-    meta = get_meta()
-    folders = meta.setdefault("folders", [])
-    if name not in folders:
-        folders.append(name)
-    save_meta(meta)
-    return folders
+    if _use_sqlite():
+        _meta_db().create_folder(name)
+        return _meta_db().list_folders()
+    with _meta_txn() as meta:
+        folders = meta.setdefault("folders", [])
+        if name not in folders:
+            folders.append(name)
+        return list(folders)
 
 
 def rename_folder(old_name: str, new_name: str) -> list[str]:
-    meta = get_meta()
-    folders = meta.setdefault("folders", [])
-    if old_name in folders:
-        idx = folders.index(old_name)
-        folders[idx] = new_name
-    doc_folders = meta.setdefault("documentFolders", {})
-    for k in doc_folders:
-        if doc_folders[k] == old_name:
-            doc_folders[k] = new_name
-    save_meta(meta)
-    return folders
+    if _use_sqlite():
+        _meta_db().rename_folder(old_name, new_name)
+        return _meta_db().list_folders()
+    with _meta_txn() as meta:
+        folders = meta.setdefault("folders", [])
+        if old_name in folders:
+            idx = folders.index(old_name)
+            folders[idx] = new_name
+        doc_folders = meta.setdefault("documentFolders", {})
+        for k in doc_folders:
+            if doc_folders[k] == old_name:
+                doc_folders[k] = new_name
+        return list(folders)
 
 
 def delete_folder(name: str) -> list[str]:
-    meta = get_meta()
-    doc_folders = meta.setdefault("documentFolders", {})
-    # 폴더 안의 모든 문서 삭제
-    for doc_id in list(doc_folders.keys()):
-        if doc_folders.get(doc_id) == name:
-            delete_doc(doc_id)
-    meta["folders"] = [f for f in meta.get("folders", []) if f != name]
-    save_meta(meta)
-    return meta["folders"]
+    if _use_sqlite():
+        store = _meta_db()
+        with store.transaction():
+            # 폴더 안의 모든 문서 삭제
+            for doc_id in store.docs_in_folder(name):
+                delete_doc(doc_id)
+            store.delete_folder(name)
+        return store.list_folders()
+    with _meta_txn() as meta:
+        doc_folders = meta.setdefault("documentFolders", {})
+        # 폴더 안의 모든 문서 삭제
+        for doc_id in list(doc_folders.keys()):
+            if doc_folders.get(doc_id) == name:
+                delete_doc(doc_id)
+        meta["folders"] = [f for f in meta.get("folders", []) if f != name]
+        return list(meta["folders"])
 
 
 def set_doc_folder(doc_id: str, folder: Optional[str]):
-    meta = get_meta()
-    meta.setdefault("documentFolders", {})[doc_id] = folder
-    save_meta(meta)
+    if _use_sqlite():
+        _meta_db().set_doc_folder(doc_id, folder)
+        return
+    with _meta_txn() as meta:
+        meta.setdefault("documentFolders", {})[doc_id] = folder
 
 
 # ─── 이미지 저장 ─────────────────────────────────
@@ -0,0 +1,569 @@
+"""
+embedding_service.py — 문서/질의 임베딩 제공자 (백엔드 교체 가능)
+  - torch: sentence-transformers 모델을 그대로 사용 (기본)
+  - onnx : sentence-transformers 모델의 transformer를 ONNX로 내보내고(int8 동적 양자화)
+           onnxruntime CPU 세션으로 추론, pooling/normalize는 numpy로 재현
+           → 내보내기 이후에는 torch 없이 동작하고 CPU 추론이 빠르다.
+
+설정 (환경변수):
+  MY_GRAPH_EMBED_MODEL     모델 이름 또는 로컬 경로 (기본 all-MiniLM-L6-v2)
+  MY_GRAPH_EMBED_BACKEND   torch | onnx
+  MY_GRAPH_EMBED_MAX_SEQ   최대 토큰 길이 (미지정 시 모델 기본값)
+  MY_GRAPH_EMBED_THREADS   추론 스레드 수 (미지정 시 라이브러리 기본값)
+  MY_GRAPH_EMBED_QUANTIZE  onnx int8 양자화 여부 (기본 1)
+  MY_GRAPH_ONNX_DIR        ONNX 변환 결과 캐시 디렉터리
+
+긴 문서는 chunk()로 모델 최대 길이 이하의 겹치는 토큰 구간으로 나눠 청크별로 임베딩한다.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+ONNX_CACHE_DIR = os.environ.get("MY_GRAPH_ONNX_DIR", "./onnx_models")
+BACKENDS = ("torch", "onnx")
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+    return value not in ("0", "false", "no")
+
+
+def _hub_repo_id(model_name: str) -> str:
+    # sentence-transformers와 같은 규칙: 조직 없는 이름은 sentence-transformers/ 소속
+    if os.path.isdir(model_name) or "/" in model_name:
+        return model_name
+    return f"sentence-transformers/{model_name}"
+
+
+# ─── 설정 ────────────────────────────────────────
+class EmbeddingConfig:
+    """임베딩 백엔드 설정. cache_key는 모델을 로드하지 않고 계산 가능 (임베딩 캐시 키)."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        backend: str = "torch",
+        max_seq_length: Optional[int] = None,
+        threads: Optional[int] = None,
+        quantize: bool = True,
+        onnx_dir: str = ONNX_CACHE_DIR,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown embedding backend: {backend}")
+        self.model_name = model_name
+        self.backend = backend
+        self.max_seq_length = max_seq_length
+        self.threads = threads
+        self.quantize = quantize
+        self.onnx_dir = onnx_dir
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingConfig":
+        return cls(
+            model_name=os.environ.get("MY_GRAPH_EMBED_MODEL", "").strip() or DEFAULT_MODEL,
+            backend=os.environ.get("MY_GRAPH_EMBED_BACKEND", "").strip().lower() or "torch",
+            max_seq_length=_env_int("MY_GRAPH_EMBED_MAX_SEQ"),
+            threads=_env_int("MY_GRAPH_EMBED_THREADS"),
+            quantize=_env_flag("MY_GRAPH_EMBED_QUANTIZE", True),
+        )
+
+    @property
+    def cache_key(self) -> str:
+        """
+        같은 키 = 같은 벡터 공간. torch 기본 설정은 기존 캐시와 호환되도록 모델 이름 그대로,
+        양자화/길이 제한처럼 벡터가 달라지는 설정은 접미사로 구분한다.
+        """
+        key = self.model_name
+        if self.backend == "onnx":
+            key += "@onnx-int8" if self.quantize else "@onnx"
+        if self.max_seq_length:
+            key += f"@seq{self.max_seq_length}"
+        return key
+
+    def to_dict(self) -> dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "maxSeqLength": self.max_seq_length,
+            "threads": self.threads,
+            "quantize": self.quantize if self.backend == "onnx" else None,
+            "cacheKey": self.cache_key,
+        }
+
+
+# ─── 제공자 ──────────────────────────────────────
+class EmbeddingProvider:
+    """encode(texts) -> float32 2D ndarray (len(texts) × dim)"""
+
+    backend = ""
+
+    def __init__(self, config: EmbeddingConfig):
+        self.config = config
+
+    @property
+    def cache_key(self) -> str:
+        return self.config.cache_key
+
+    tokenizer = None  # Hugging Face tokenizer (청크 분할용)
+    max_seq_length: Optional[int] = None
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        raise NotImplementedError
+
+    def chunk(self, text: str, window: int, overlap: int) -> list[tuple[int, int]]:
+        """
+        text를 window 토큰(모델 최대 길이 - 특수 토큰 이하)씩 overlap 토큰 겹치게 나눈 문자 구간 목록.
+        모델 길이 안에 들어가는 문서는 [(0, len(text))] 한 구간.
+        """
+        limit = (self.max_seq_length or window + 2) - 2
+        return chunk_spans(text, self.tokenizer, max(8, min(window, limit)), overlap)
+
+    def info(self) -> dict:
+        return self.config.to_dict()
+
+
+class TorchEmbeddingProvider(EmbeddingProvider):
+    backend = "torch"
+
+    def __init__(self, config: EmbeddingConfig):
+        super().__init__(config)
+        if config.threads:
+            import torch
+            torch.set_num_threads(config.threads)
+        from sentence_transformers import SentenceTransformer
+        self._model = SentenceTransformer(config.model_name)
+        if config.max_seq_length:
+            self._model.max_seq_length = config.max_seq_length
+        self.tokenizer = self._model.tokenizer
+        self.max_seq_length = self._model.max_seq_length
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = self._model.encode(
+            list(texts), batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """
+    onnx_dir/<모델>/ 에 변환 결과(model.onnx, model.int8.onnx, tokenizer, pipeline.json)를
+    캐시하고, 없으면 최초 1회 export_onnx_model()로 만든다 (이때만 torch 필요).
+    """
+
+    backend = "onnx"
+
+    def __init__(self, config: EmbeddingConfig):
+        super().__init__(config)
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = export_onnx_model(config.model_name, config.onnx_dir, quantize=config.quantize)
+        with open(model_dir / "pipeline.json", encoding="utf-8") as f:
+            self._pipeline = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.max_seq_length = config.max_seq_length or self._pipeline.get("maxSeqLength") or 512
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if config.threads:
+            options.intra_op_num_threads = config.threads
+            options.inter_op_num_threads = 1
+        model_file = model_dir / ("model.int8.onnx" if config.quantize else "model.onnx")
+        self._session = ort.InferenceSession(
+            str(model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [i.name for i in self._session.get_inputs()]
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # 길이순으로 묶어 배치 내 padding을 줄이고, 결과는 원래 순서로 되돌린다
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: Optional[np.ndarray] = None
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            pooled = self._encode_batch([texts[i] for i in idx])
+            if out is None:
+                out = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            out[idx] = pooled
+        return out
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        tokens = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feed = {name: tokens[name].astype(np.int64) for name in self._input_names if name in tokens}
+        if "token_type_ids" in self._input_names and "token_type_ids" not in feed:
+            feed["token_type_ids"] = np.zeros_like(feed["input_ids"])
+        hidden = self._session.run(None, feed)[0]
+        return _pool(hidden, tokens["attention_mask"], self._pipeline["pooling"], self._pipeline["normalize"])
+
+
+def chunk_spans(text: str, tokenizer, window: int, overlap: int) -> list[tuple[int, int]]:
+    """
+    토큰 offset 기준으로 겹치는 구간을 만든다. offset을 주지 않는 tokenizer(또는 None)는
+    문자 수로 근사 (한국어 기준 토큰당 약 2자).
+    """
+    text = text or ""
+    overlap = max(0, min(overlap, window // 2))
+    offsets = None
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+            offsets = [tuple(o) for o in encoded["offset_mapping"]]
+        except (NotImplementedError, KeyError, TypeError, ValueError):
+            offsets = None
+    if offsets is None:
+        offsets = [(i, min(i + 2, len(text))) for i in range(0, len(text), 2)]
+    if len(offsets) <= window:
+        return [(0, len(text))]
+    spans = []
+    step = window - overlap
+    for start in range(0, len(offsets), step):
+        end = min(start + window, len(offsets))
+        spans.append((offsets[start][0], offsets[end - 1][1]))
+        if end == len(offsets):
+            break
+    return spans
+
+
+def pool_chunks(vectors: np.ndarray, weights: list[float]) -> np.ndarray:
+    """청크 벡터 → 문서 벡터: 청크 길이 가중 평균 (청크가 하나면 그 벡터 그대로)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) == 1:
+        return vectors[0]
+    w = np.asarray(weights, dtype=np.float32)
+    if w.sum() <= 0:
+        w = np.ones(len(vectors), dtype=np.float32)
+    return (vectors * w[:, None]).sum(axis=0) / w.sum()
+
+
+def _pool(hidden: np.ndarray, attention_mask: np.ndarray, mode: str, normalize: bool) -> np.ndarray:
+    """sentence-transformers Pooling/Normalize 모듈과 같은 계산."""
+    mask = attention_mask.astype(np.float32)[..., None]
+    if mode == "cls":
+        pooled = hidden[:, 0]
+    elif mode == "max":
+        pooled = np.where(mask > 0, hidden, -1e9).max(axis=1)
+    else:
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = pooled.astype(np.float32)
+    if normalize:
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled
+
+
+def create_provider(config: Optional[EmbeddingConfig] = None) -> EmbeddingProvider:
+    config = config or EmbeddingConfig.from_env()
+    if config.backend == "onnx":
+        return OnnxEmbeddingProvider(config)
+    return TorchEmbeddingProvider(config)
+
+
+# ─── 마이크로 배칭 ────────────────────────────────
+class _BatchRequest:
+    """EmbeddingBatcher 대기열 항목 — max_batch보다 큰 요청은 조각 단위로 나눠 처리 후 다시 합친다."""
+
+    __slots__ = ("texts", "future", "offset", "parts")
+
+    def __init__(self, texts: list[str], future: Future):
+        self.texts = texts
+        self.future = future
+        self.offset = 0  # 아직 배치에 넣지 않은 첫 텍스트 위치
+        self.parts: list[np.ndarray] = []
+
+    @property
+    def remaining(self) -> int:
+        return len(self.texts) - self.offset
+
+
+class EmbeddingBatcher:
+    """
+    여러 스레드의 encode 호출을 하나의 워커가 모아 한 번의 batch encode로 처리한다.
+    첫 요청 도착 후 max_wait초 또는 max_batch개가 모이면 실행하고, 호출자별 Future에 결과를 나눠 준다.
+    max_batch보다 큰 요청은 max_batch개씩 잘라 한 조각 처리 후 대기열 뒤로 보내므로
+    대량 encode 중에도 뒤에 온 작은 요청(/query 등)이 조각 사이에 처리된다.
+    모델은 워커 스레드에서만 호출되므로 동시 encode 경합이 없고 메모리는 배치 하나 분량만 쓴다.
+    provider와 같은 encode()/cache_key/info()를 제공해 그대로 대체할 수 있다.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, max_batch: int = 64, max_wait: float = 0.005):
+        self.provider = provider
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._queue: deque[_BatchRequest] = deque()
+        self._queued_items = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._stats = {"requests": 0, "items": 0, "batches": 0, "errors": 0, "maxBatchSize": 0, "lastBatchSize": 0}
+        self._max_queue_depth = 0
+        self._encode_seconds = 0.0
+
+    @property
+    def cache_key(self) -> str:
+        return self.provider.cache_key
+
+    def info(self) -> dict:
+        return self.provider.info()
+
+    def chunk(self, text: str, window: int, overlap: int) -> list[tuple[int, int]]:
+        return self.provider.chunk(text, window, overlap)  # 토큰화만 — 호출 스레드에서 실행
+
+    def submit(self, texts: list[str]) -> Future:
+        """encode 예약. Future.result()는 len(texts) × dim ndarray."""
+        future: Future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("embedding batcher stopped")
+            self._queue.append(_BatchRequest(texts, future))
+            self._queued_items += len(texts)
+            self._max_queue_depth = max(self._max_queue_depth, self._queued_items)
+            self._stats["requests"] += 1
+            self._ensure_worker()
+            self._cond.notify_all()
+        return future
+
+    def encode(self, texts: list[str], batch_size: Optional[int] = None) -> np.ndarray:
+        # batch_size는 provider 호환용 — 실제 배치 크기는 워커가 정한다
+        return self.submit(texts).result()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            batches = self._stats["batches"]
+            return {
+                "queueDepth": self._queued_items,
+                "queuedRequests": len(self._queue),
+                "maxQueueDepth": self._max_queue_depth,
+                **self._stats,
+                "avgBatchSize": round(self._stats["items"] / batches, 2) if batches else 0.0,
+                "avgEncodeMs": round(self._encode_seconds * 1000 / batches, 3) if batches else 0.0,
+                "maxBatch": self.max_batch,
+                "maxWaitMs": self.max_wait * 1000,
+            }
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> list[tuple[_BatchRequest, int, int]]:
+        """
+        첫 요청 이후 max_wait 동안(또는 max_batch개까지) 요청을 모아 [(요청, 시작, 끝)] 반환. 종료 시 빈 목록.
+        들어갈 자리가 있는 요청은 통째로 넣고, 배치 첫 요청이 max_batch보다 크면 한 조각만 떼어
+        나머지는 대기열 뒤로 보낸다 (FIFO 순환).
+        """
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+            deadline = time.monotonic() + self.max_wait
+            while self._queued_items < self.max_batch and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = []
+            count = 0
+            while self._queue and (not batch or count + self._queue[0].remaining <= self.max_batch):
+                request = self._queue.popleft()
+                start = request.offset
+                end = start + min(request.remaining, self.max_batch - count)
+                request.offset = end
+                batch.append((request, start, end))
+                count += end - start
+                if request.remaining:
+                    self._queue.append(request)
+                    break
+            self._queued_items -= count
+            return batch
+
+    def _worker(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            texts = [text for request, start, end in batch for text in request.texts[start:end]]
+            started = time.perf_counter()
+            try:
+                vectors = self.provider.encode(texts, batch_size=self.max_batch)
+            except Exception as e:
+                with self._cond:
+                    self._stats["errors"] += 1
+                    # 실패한 요청의 남은 조각은 대기열에서 뺀다
+                    failed = {id(request) for request, _, _ in batch}
+                    for request in [r for r in self._queue if id(r) in failed]:
+                        self._queue.remove(request)
+                        self._queued_items -= request.remaining
+                for request, _, _ in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - started
+            with self._cond:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(texts)
+                self._stats["lastBatchSize"] = len(texts)
+                self._stats["maxBatchSize"] = max(self._stats["maxBatchSize"], len(texts))
+                self._encode_seconds += elapsed
+            offset = 0
+            for request, start, end in batch:
+                request.parts.append(vectors[offset:offset + end - start])
+                offset += end - start
+                if end == len(request.texts):
+                    parts = request.parts
+                    request.future.set_result(parts[0] if len(parts) == 1 else np.concatenate(parts))
+
+
+# ─── ONNX 변환 ───────────────────────────────────
+def _model_file(model_name: str, filename: str) -> Optional[str]:
+    """로컬 디렉터리 또는 Hugging Face 캐시/허브에서 모델 파일 경로 (없으면 None)."""
+    if os.path.isdir(model_name):
+        path = os.path.join(model_name, filename)
+        return path if os.path.exists(path) else None
+    from huggingface_hub import hf_hub_download
+    try:
+        return hf_hub_download(_hub_repo_id(model_name), filename)
+    except Exception:
+        return None
+
+
+def read_st_pipeline(model_name: str) -> dict:
+    """
+    sentence-transformers 모듈 구성(modules.json)에서 pooling 방식·정규화·최대 길이를 읽는다.
+    Dense 등 transformer 뒤에 학습 가능한 층이 붙은 모델은 numpy로 재현할 수 없어 거부한다.
+    """
+    pipeline = {"pooling": "mean", "normalize": False, "maxSeqLength": None}
+    modules_path = _model_file(model_name, "modules.json")
+    modules = []
+    if modules_path:
+        with open(modules_path, encoding="utf-8") as f:
+            modules = json.load(f)
+    for module in modules:
+        kind = module.get("type", "").rsplit(".", 1)[-1]
+        if kind == "Pooling":
+            config_path = _model_file(model_name, f"{module['path']}/config.json")
+            config = {}
+            if config_path:
+                with open(config_path, encoding="utf-8") as f:
+                    config = json.load(f)
+            if config.get("pooling_mode_cls_token") or config.get("pooling_mode") == "cls":
+                pipeline["pooling"] = "cls"
+            elif config.get("pooling_mode_max_tokens") or config.get("pooling_mode") == "max":
+                pipeline["pooling"] = "max"
+        elif kind == "Normalize":
+            pipeline["normalize"] = True
+        elif kind not in ("Transformer", ""):
+            raise ValueError(f"unsupported sentence-transformers module for ONNX: {kind}")
+    bert_config_path = _model_file(model_name, "sentence_bert_config.json")
+    if bert_config_path:
+        with open(bert_config_path, encoding="utf-8") as f:
+            pipeline["maxSeqLength"] = json.load(f).get("max_seq_length")
+    return pipeline
+
+
+def onnx_model_dir(model_name: str, onnx_dir: str = ONNX_CACHE_DIR) -> Path:
+    safe = _hub_repo_id(model_name).strip("/\\").replace("/", "__").replace("\\", "__").replace(":", "")
+    return Path(onnx_dir) / safe
+
+
+def export_onnx_model(model_name: str, onnx_dir: str = ONNX_CACHE_DIR, quantize: bool = True) -> Path:
+    """
+    transformer 본체를 ONNX(batch·길이 동적)로 내보내고 int8 동적 양자화본을 함께 만든다.
+    이미 변환돼 있으면 그대로 반환. 임시 디렉터리에 만든 뒤 이름을 바꿔 중간 상태를 남기지 않는다.
+    """
+    target = onnx_model_dir(model_name, onnx_dir)
+    needed = ["pipeline.json", "model.onnx"] + (["model.int8.onnx"] if quantize else [])
+    if all((target / name).exists() for name in needed):
+        return target
+
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    repo_id = _hub_repo_id(model_name)
+    pipeline = read_st_pipeline(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(repo_id)
+    model = AutoModel.from_pretrained(repo_id).eval()
+    input_names = [n for n in tokenizer.model_input_names if n in ("input_ids", "attention_mask", "token_type_ids")]
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if token_type_ids is not None:
+                inputs["token_type_ids"] = token_type_ids
+            return self.inner(**inputs).last_hidden_state
+
+    sample = tokenizer(["샘플 문장입니다.", "두 번째 예시"], padding=True, return_tensors="pt")
+    kwargs = {name: sample[name] for name in input_names}
+    batch = torch.export.Dim("batch")
+    seq = torch.export.Dim("seq")
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    work = Path(tempfile.mkdtemp(prefix=".export-", dir=str(target.parent)))
+    try:
+        if (target / "model.onnx").exists():
+            shutil.copytree(target, work, dirs_exist_ok=True)
+        else:
+            torch.onnx.export(
+                _Encoder(model),
+                (),
+                str(work / "model.onnx"),
+                kwargs=kwargs,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_shapes={name: {0: batch, 1: seq} for name in input_names},
+                external_data=False,
+                dynamo=True,
+            )
+        if quantize and not (work / "model.int8.onnx").exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(str(work / "model.onnx"), str(work / "model.int8.onnx"), weight_type=QuantType.QInt8)
+        tokenizer.save_pretrained(str(work))
+        with open(work / "pipeline.json", "w", encoding="utf-8") as f:
+            json.dump({**pipeline, "model": model_name, "inputs": input_names}, f, ensure_ascii=False, indent=2)
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(work, target)
+    finally:
+        if work.exists():
+            shutil.rmtree(work, ignore_errors=True)
+    return target
@@ -0,0 +1,192 @@
+"""
+http_client.py — 프로세스 공용 HTTP 클라이언트 (연결 풀 + keep-alive)
+인터넷 확인, OpenAI 호출, URL 메타/본문 조회가 모두 하나의 httpx.Client를 공유해
+같은 호스트로의 요청은 DNS·TCP·TLS 연결을 재사용한다.
+h2 패키지가 설치되어 있으면 HTTP/2를 사용하고, 호스트별 동시 요청 수는 세마포어로 제한한다.
+
+환경 변수:
+  MY_GRAPH_HTTP_TIMEOUT            기본 읽기 타임아웃(초, 20)
+  MY_GRAPH_HTTP_CONNECT_TIMEOUT    연결 타임아웃(초, 5)
+  MY_GRAPH_LLM_TIMEOUT             OpenAI SDK 호출 읽기 타임아웃(초, 120 — 긴 응답 생성 대기)
+  MY_GRAPH_HTTP_MAX_CONNECTIONS    전체 연결 수 상한 (50)
+  MY_GRAPH_HTTP_MAX_KEEPALIVE      유휴 keep-alive 연결 수 상한 (20)
+  MY_GRAPH_HTTP_KEEPALIVE_SEC      유휴 연결 유지 시간(초, 60)
+  MY_GRAPH_HTTP_PER_HOST           호스트별 동시 요청 수 상한 (6, 0이면 제한 없음)
+  MY_GRAPH_HTTP2                   0이면 HTTP/2 비활성화
+"""
+import importlib.util
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import httpx
+
+TIMEOUT = float(os.environ.get("MY_GRAPH_HTTP_TIMEOUT", "20"))
+CONNECT_TIMEOUT = float(os.environ.get("MY_GRAPH_HTTP_CONNECT_TIMEOUT", "5"))
+LLM_TIMEOUT = float(os.environ.get("MY_GRAPH_LLM_TIMEOUT", "120"))
+MAX_CONNECTIONS = int(os.environ.get("MY_GRAPH_HTTP_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE = int(os.environ.get("MY_GRAPH_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_SEC = float(os.environ.get("MY_GRAPH_HTTP_KEEPALIVE_SEC", "60"))
+PER_HOST = int(os.environ.get("MY_GRAPH_HTTP_PER_HOST", "6"))
+HTTP2 = os.environ.get("MY_GRAPH_HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+}
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_openai_clients: dict[str, object] = {}
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_stats = {
+    "requests": 0,          # 호출자 요청 수 (리디렉션 포함 1회)
+    "sent": 0,              # 실제 전송된 HTTP 요청 수 (리디렉션 단계 포함)
+    "newConnections": 0,    # 새 TCP 연결
+    "tlsHandshakes": 0,
+    "errors": 0,
+    "seconds": 0.0,
+}
+_hosts: dict[str, int] = {}
+
+
+def _count(field: str, amount: float = 1):
+    with _lock:
+        _stats[field] += amount
+
+
+def _trace(event: str, info: dict):
+    # httpcore trace — 새 연결/TLS/전송 시점으로 연결 재사용 여부를 집계
+    if event == "connection.connect_tcp.complete":
+        _count("newConnections")
+    elif event == "connection.start_tls.complete":
+        _count("tlsHandshakes")
+    elif event.endswith("send_request_headers.started"):
+        _count("sent")
+
+
+def _on_request(request: httpx.Request):
+    request.extensions["trace"] = _trace
+
+
+def get_client() -> httpx.Client:
+    """공용 클라이언트 (첫 호출 시 생성). OpenAI SDK 요청도 같은 풀을 쓴다."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                http2=HTTP2,
+                follow_redirects=True,
+                timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE,
+                    keepalive_expiry=KEEPALIVE_SEC,
+                ),
+                event_hooks={"request": [_on_request]},
+            )
+        return _client
+
+
+def _host_slot(url: str) -> Optional[threading.BoundedSemaphore]:
+    if PER_HOST <= 0:
+        return None
+    host = httpx.URL(url).host
+    with _lock:
+        _hosts[host] = _hosts.get(host, 0) + 1
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(PER_HOST)
+    return slot
+
+
+def _timeout(timeout: Optional[float]):
+    return httpx.USE_CLIENT_DEFAULT if timeout is None else httpx.Timeout(timeout, connect=min(timeout, CONNECT_TIMEOUT))
+
+
+def request(method: str, url: str, *, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+    """본문까지 읽은 응답 반환. timeout은 이 요청의 읽기 타임아웃(초)."""
+    slot = _host_slot(url)
+    started = time.perf_counter()
+    _count("requests")
+    if slot is not None:
+        slot.acquire()
+    try:
+        return get_client().request(method, url, timeout=_timeout(timeout), **kwargs)
+    except httpx.HTTPError:
+        _count("errors")
+        raise
+    finally:
+        if slot is not None:
+            slot.release()
+        _count("seconds", time.perf_counter() - started)
+
+
+def get(url: str, **kwargs) -> httpx.Response:
+    return request("GET", url, **kwargs)
+
+
+@contextmanager
+def stream(method: str, url: str, *, timeout: Optional[float] = None, **kwargs) -> Iterator[httpx.Response]:
+    """본문을 나눠 읽는 스트리밍 요청. 블록이 끝날 때까지 호스트 슬롯을 점유한다."""
+    slot = _host_slot(url)
+    started = time.perf_counter()
+    _count("requests")
+    if slot is not None:
+        slot.acquire()
+    try:
+        with get_client().stream(method, url, timeout=_timeout(timeout), **kwargs) as response:
+            yield response
+    except httpx.HTTPError:
+        _count("errors")
+        raise
+    finally:
+        if slot is not None:
+            slot.release()
+        _count("seconds", time.perf_counter() - started)
+
+
+def openai_client(api_key: str):
+    """
+    API 키별 OpenAI SDK 클라이언트 캐시 — 공용 연결 풀을 http_client로 주입.
+    SDK는 주입된 클라이언트의 타임아웃(20초)을 물려받으므로 LLM 응답용 타임아웃을 따로 지정한다.
+    """
+    with _lock:
+        client = _openai_clients.get(api_key)
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(
+            api_key=api_key,
+            http_client=get_client(),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        with _lock:
+            client = _openai_clients.setdefault(api_key, client)
+    return client
+
+
+def stats() -> dict:
+    with _lock:
+        snapshot = dict(_stats)
+        hosts = dict(sorted(_hosts.items(), key=lambda kv: -kv[1])[:20])
+    snapshot["seconds"] = round(snapshot["seconds"], 3)
+    snapshot["reusedConnections"] = max(0, snapshot["sent"] - snapshot["newConnections"])
+    snapshot["reuseRate"] = round(snapshot["reusedConnections"] / snapshot["sent"], 4) if snapshot["sent"] else None
+    snapshot["http2"] = HTTP2
+    snapshot["perHostLimit"] = PER_HOST
+    snapshot["hosts"] = hosts
+    return snapshot
+
+
+def close():
+    """종료 시 풀의 연결 정리."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+        _openai_clients.clear()
+    if client is not None:
+        client.close()
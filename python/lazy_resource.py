@@ -0,0 +1,59 @@
+"""
+lazy_resource.py — 무거운 의존성(임베딩 모델, Chroma 등)의 지연 로딩 래퍼
+첫 get() 호출(또는 warm-up 스레드)에서 한 번만 로드하고, 로드 상태를 readiness API에 보고한다.
+"""
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyResource(Generic[T]):
+    """
+    loader()는 최초 get() 시 1회 실행. 실패하면 None을 반환하며 재시도하지 않는다
+    (모델 파일 누락 등은 요청마다 재시도해도 같은 결과이므로).
+    상태: idle → loading → ready | error
+    """
+
+    def __init__(self, name: str, loader: Callable[[], T]):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._state = "idle"
+        self._error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+
+    def get(self) -> Optional[T]:
+        if self._state in ("ready", "error"):
+            return self._value
+        with self._lock:
+            if self._state in ("ready", "error"):
+                return self._value
+            self._state = "loading"
+            started = time.perf_counter()
+            try:
+                self._value = self._loader()
+                self._state = "ready"
+            except Exception as e:
+                self._value = None
+                self._error = f"{type(e).__name__}: {e}"
+                self._state = "error"
+            self._load_seconds = round(time.perf_counter() - started, 3)
+            return self._value
+
+    def peek(self) -> Optional[T]:
+        """로드를 일으키지 않고 현재 값만 반환 (미로드 시 None)."""
+        return self._value if self._state == "ready" else None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "error": self._error,
+            "loadSeconds": self._load_seconds,
+        }
@@ -0,0 +1,399 @@
+"""
+meta_store.py — SQLite 기반 문서 메타데이터 저장소 (meta.json 대체 백엔드)
+documents / documentTags / folders / documentFolders 를 인덱스가 있는 테이블로 관리해
+태그 수정·폴더 이동이 전체 meta.json 재직렬화 없이 트랜잭션 단위로 반영되도록 한다.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS documents (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        updatedAt TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX IF NOT EXISTS idx_documents_updated ON documents(updatedAt DESC, id DESC);
+    CREATE TABLE IF NOT EXISTS document_tags (
+        docId TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (docId, tag)
+    );
+    CREATE INDEX IF NOT EXISTS idx_document_tags_tag ON document_tags(tag);
+    CREATE TABLE IF NOT EXISTS folders (
+        name TEXT PRIMARY KEY,
+        position INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS document_folders (
+        docId TEXT PRIMARY KEY,
+        folder TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_document_folders_folder ON document_folders(folder);
+"""
+
+
+class SqliteMetaStore:
+    """스레드별 연결을 쓰는 메타데이터 저장소. 변경 메서드는 각각 하나의 트랜잭션."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        # 모든 스레드의 연결 — close()가 한꺼번에 닫고 세대를 올리면 각 스레드는 다음 호출에 다시 연다
+        self._conns: set[sqlite3.Connection] = set()
+        self._generation = 0
+
+    # ─── 연결 ────────────────────────────────────
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.generation != self._generation:
+            conn = None  # close()로 이미 닫힌 연결
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # 연결은 만든 스레드만 쓰고, 다른 스레드에서는 close()만 호출한다
+            conn = sqlite3.connect(self.path, cached_statements=128, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+                self._conns.add(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+            self._local.depth = 0
+        elif conn.in_transaction and not self._local.depth:
+            # 이전 호출이 예외로 끝나 열린 트랜잭션은 버린다
+            conn.rollback()
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        BEGIN IMMEDIATE — 동시 요청의 읽기-수정-쓰기가 서로 덮어쓰지 않도록 쓰기 잠금 선점.
+        중첩 호출은 바깥 트랜잭션에 합류해 한 번에 커밋된다.
+        """
+        conn = self._conn()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.depth = 0
+
+    def close(self):
+        """모든 스레드의 연결을 닫는다 (백업 복구로 meta.db 파일을 바꾸기 전)."""
+        with self._init_lock:
+            conns, self._conns = self._conns, set()
+            self._generation += 1
+        for conn in conns:
+            conn.close()
+        self._local.conn = None
+
+    def is_empty(self) -> bool:
+        conn = self._conn()
+        return (
+            conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM folders LIMIT 1").fetchone() is None
+        )
+
+    # ─── 문서 ────────────────────────────────────
+    def get_document(self, doc_id: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT title, updatedAt FROM documents WHERE id = ?", (doc_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def list_documents(self, doc_ids: Optional[list[str]] = None, folder: Optional[str] = None) -> list[dict]:
+        """[{id, title, updatedAt, folder, tags}] — updatedAt 내림차순."""
+        conn = self._conn()
+        sql = """
+            SELECT d.id, d.title, d.updatedAt, f.folder
+            FROM documents d LEFT JOIN document_folders f ON f.docId = d.id
+        """
+        params: list = []
+        if folder:
+            sql += " WHERE f.folder = ?"
+            params.append(folder)
+        sql += " ORDER BY d.updatedAt DESC, d.id DESC"
+        rows = conn.execute(sql, params).fetchall()
+        tags = self._tags_by_doc()
+        wanted = set(doc_ids) if doc_ids is not None else None
+        return [
+            {
+                "id": r["id"],
+                "title": r["title"],
+                "updatedAt": r["updatedAt"],
+                "folder": r["folder"],
+                "tags": tags.get(r["id"], []),
+            }
+            for r in rows
+            if wanted is None or r["id"] in wanted
+        ]
+
+    def count_documents_by_folder(self) -> dict:
+        """{total, folders: {폴더: 문서 수}}"""
+        conn = self._conn()
+        total = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        rows = conn.execute(
+            """
+            SELECT f.folder, COUNT(*) AS n FROM document_folders f
+            JOIN documents d ON d.id = f.docId
+            WHERE f.folder IS NOT NULL GROUP BY f.folder
+            """
+        ).fetchall()
+        return {"total": total, "folders": {r["folder"]: r["n"] for r in rows}}
+
+    def list_documents_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[tuple[str, str]] = None,
+        folder: Optional[str] = None,
+        tag: Optional[str] = None,
+        updated_since: Optional[str] = None,
+    ) -> tuple[list[dict], int]:
+        """
+        (updatedAt, id) 내림차순 keyset 페이지와 필터 전체 건수.
+        after는 직전 페이지 마지막 문서의 (updatedAt, id) — 그보다 뒤의 문서부터 반환.
+        """
+        conn = self._conn()
+        where: list[str] = []
+        params: list = []
+        if folder:
+            where.append("f.folder = ?")
+            params.append(folder)
+        if tag:
+            where.append("EXISTS (SELECT 1 FROM document_tags t WHERE t.docId = d.id AND t.tag = ?)")
+            params.append(tag)
+        if updated_since:
+            where.append("d.updatedAt >= ?")
+            params.append(updated_since)
+        base = "FROM documents d LEFT JOIN document_folders f ON f.docId = d.id"
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+        total = conn.execute(f"SELECT COUNT(*) {base}{where_sql}", params).fetchone()[0]
+
+        page_where = list(where)
+        page_params = list(params)
+        if after is not None:
+            page_where.append("(d.updatedAt, d.id) < (?, ?)")
+            page_params.extend(after)
+        sql = f"SELECT d.id, d.title, d.updatedAt, f.folder {base}"
+        if page_where:
+            sql += f" WHERE {' AND '.join(page_where)}"
+        sql += " ORDER BY d.updatedAt DESC, d.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            page_params.append(limit)
+        rows = conn.execute(sql, page_params).fetchall()
+
+        tags: dict[str, list[str]] = {}
+        ids = [r["id"] for r in rows]
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for t in conn.execute(
+                f"SELECT docId, tag FROM document_tags WHERE docId IN ({marks}) ORDER BY docId, position",
+                chunk,
+            ):
+                tags.setdefault(t["docId"], []).append(t["tag"])
+        items = [
+            {
+                "id": r["id"],
+                "title": r["title"],
+                "updatedAt": r["updatedAt"],
+                "folder": r["folder"],
+                "tags": tags.get(r["id"], []),
+            }
+            for r in rows
+        ]
+        return items, total
+
+    def upsert_document(
+        self,
+        doc_id: str,
+        title: str,
+        updated_at: str,
+        folder: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        replace_membership: bool = False,
+    ):
+        """
+        문서 메타 저장. 기본은 기존 폴더/태그 유지(없으면 빈 값으로 생성),
+        replace_membership=True면 folder/tags로 교체 (휴지통 복원용).
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (id, title, updatedAt) VALUES (?, ?, ?)",
+                (doc_id, title, updated_at),
+            )
+            if replace_membership:
+                conn.execute(
+                    "INSERT OR REPLACE INTO document_folders (docId, folder) VALUES (?, ?)",
+                    (doc_id, folder),
+                )
+                self._write_tags(conn, doc_id, tags or [])
+            else:
+                conn.execute(
+                    "INSERT OR IGNORE INTO document_folders (docId, folder) VALUES (?, NULL)",
+                    (doc_id,),
+                )
+
+    def remove_document(self, doc_id: str) -> Optional[dict]:
+        """문서 메타 삭제. 삭제 전 {title, updatedAt, folder, tags} 반환 (휴지통 기록용)."""
+        with self.transaction() as conn:
+            doc = conn.execute(
+                "SELECT title, updatedAt FROM documents WHERE id = ?", (doc_id,)
+            ).fetchone()
+            folder = conn.execute(
+                "SELECT folder FROM document_folders WHERE docId = ?", (doc_id,)
+            ).fetchone()
+            tags = self._read_tags(conn, doc_id)
+            conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            conn.execute("DELETE FROM document_tags WHERE docId = ?", (doc_id,))
+            conn.execute("DELETE FROM document_folders WHERE docId = ?", (doc_id,))
+        if doc is None and folder is None and not tags:
+            return None
+        return {
+            "title": doc["title"] if doc else None,
+            "updatedAt": doc["updatedAt"] if doc else "",
+            "folder": folder["folder"] if folder else None,
+            "tags": tags,
+        }
+
+    # ─── 태그 ────────────────────────────────────
+    def get_tags(self, doc_id: str) -> list[str]:
+        return self._read_tags(self._conn(), doc_id)
+
+    def set_tags(self, doc_id: str, tags: list[str]):
+        with self.transaction() as conn:
+            self._write_tags(conn, doc_id, tags)
+
+    def all_tags(self) -> list[str]:
+        rows = self._conn().execute(
+            "SELECT DISTINCT tag FROM document_tags ORDER BY tag"
+        ).fetchall()
+        return [r["tag"] for r in rows]
+
+    def _tags_by_doc(self) -> dict[str, list[str]]:
+        result: dict[str, list[str]] = {}
+        for r in self._conn().execute(
+            "SELECT docId, tag FROM document_tags ORDER BY docId, position"
+        ):
+            result.setdefault(r["docId"], []).append(r["tag"])
+        return result
+
+    @staticmethod
+    def _read_tags(conn: sqlite3.Connection, doc_id: str) -> list[str]:
+        rows = conn.execute(
+            "SELECT tag FROM document_tags WHERE docId = ? ORDER BY position", (doc_id,)
+        ).fetchall()
+        return [r["tag"] for r in rows]
+
+    @staticmethod
+    def _write_tags(conn: sqlite3.Connection, doc_id: str, tags: list[str]):
+        conn.execute("DELETE FROM document_tags WHERE docId = ?", (doc_id,))
+        unique = list(dict.fromkeys(tags))
+        conn.executemany(
+            "INSERT INTO document_tags (docId, tag, position) VALUES (?, ?, ?)",
+            [(doc_id, tag, i) for i, tag in enumerate(unique)],
+        )
+
+    # ─── 폴더 ────────────────────────────────────
+    def list_folders(self) -> list[str]:
+        rows = self._conn().execute("SELECT name FROM folders ORDER BY position").fetchall()
+        return [r["name"] for r in rows]
+
+    def create_folder(self, name: str):
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO folders (name, position)
+                VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM folders))
+                """,
+                (name,),
+            )
+
+    def rename_folder(self, old_name: str, new_name: str):
+        with self.transaction() as conn:
+            conn.execute("UPDATE OR IGNORE folders SET name = ? WHERE name = ?", (new_name, old_name))
+            conn.execute("UPDATE document_folders SET folder = ? WHERE folder = ?", (new_name, old_name))
+
+    def delete_folder(self, name: str):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM folders WHERE name = ?", (name,))
+
+    def docs_in_folder(self, name: str) -> list[str]:
+        rows = self._conn().execute(
+            "SELECT docId FROM document_folders WHERE folder = ?", (name,)
+        ).fetchall()
+        return [r["docId"] for r in rows]
+
+    def set_doc_folder(self, doc_id: str, folder: Optional[str]):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO document_folders (docId, folder) VALUES (?, ?)",
+                (doc_id, folder),
+            )
+
+    # ─── meta.json 호환 ──────────────────────────
+    def import_meta(self, meta: dict):
+        """meta.json 구조를 그대로 테이블에 적재 (기존 내용은 교체)."""
+        with self.transaction() as conn:
+            for table in ("documents", "document_tags", "folders", "document_folders"):
+                conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                "INSERT INTO documents (id, title, updatedAt) VALUES (?, ?, ?)",
+                [
+                    (doc_id, d.get("title", doc_id), d.get("updatedAt", ""))
+                    for doc_id, d in (meta.get("documents") or {}).items()
+                ],
+            )
+            for doc_id, tags in (meta.get("documentTags") or {}).items():
+                self._write_tags(conn, doc_id, list(tags or []))
+            conn.executemany(
+                "INSERT OR IGNORE INTO folders (name, position) VALUES (?, ?)",
+                [(name, i) for i, name in enumerate(meta.get("folders") or [])],
+            )
+            conn.executemany(
+                "INSERT INTO document_folders (docId, folder) VALUES (?, ?)",
+                list((meta.get("documentFolders") or {}).items()),
+            )
+
+    def export_meta(self) -> dict:
+        """테이블 내용을 meta.json 구조로 변환."""
+        conn = self._conn()
+        documents = {
+            r["id"]: {"title": r["title"], "updatedAt": r["updatedAt"]}
+            for r in conn.execute("SELECT id, title, updatedAt FROM documents ORDER BY id")
+        }
+        document_folders = {
+            r["docId"]: r["folder"]
+            for r in conn.execute("SELECT docId, folder FROM document_folders ORDER BY docId")
+        }
+        tags = self._tags_by_doc()
+        document_tags = {doc_id: tags.get(doc_id, []) for doc_id in documents}
+        document_tags.update(tags)
+        return {
+            "documents": documents,
+            "documentTags": document_tags,
+            "folders": self.list_folders(),
+            "documentFolders": document_folders,
+        }
@@ -0,0 +1,177 @@
+"""
+rebuild_scheduler.py — 시맨틱 그래프 재계산 스케줄러
+문서 변경 요청은 dirty 표시만 하고 즉시 반환, 일정 시간 조용해지면 변경분을 묶어
+백그라운드 스레드에서 한 번만 재계산한다. 재계산은 동시에 두 개 이상 실행되지 않는다.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+
+
+class RebuildScheduler:
+    """
+    debounce + coalescing 재계산 스케줄러.
+    rebuild_fn(doc_ids: list[str], contexts: list[str], **options) -> dict
+      - doc_ids: 마지막 재계산 이후 변경된 문서 (중복 제거)
+      - contexts: 변경을 일으킨 요청 종류 (save_doc, set_tags …)
+    """
+
+    def __init__(
+        self,
+        rebuild_fn: Callable[..., dict],
+        quiet_period: float = 2.0,
+        max_delay: float = 15.0,
+    ):
+        self._rebuild_fn = rebuild_fn
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._run_lock = threading.Lock()  # 재계산 직렬화 (워커 + run_now)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self._requested_ticket = 0
+        self._completed_ticket = 0
+        self._version = 0
+        self._pending_docs: set[str] = set()
+        self._pending_contexts: list[str] = []
+        self._dirty_since: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._running = False
+        self._last_result: Optional[dict] = None
+        self._last_built_at: Optional[str] = None
+
+    # ─── 요청 ────────────────────────────────────
+    def request(self, context: str, doc_ids: Iterable[str] = ()) -> dict:
+        """그래프를 dirty로 표시하고 재계산 티켓을 발급 (즉시 반환)."""
+        with self._cond:
+            now = time.monotonic()
+            self._requested_ticket += 1
+            ticket = self._requested_ticket
+            self._pending_docs.update(d for d in doc_ids if d)
+            if context and context not in self._pending_contexts:
+                self._pending_contexts.append(context)
+            if self._dirty_since is None:
+                self._dirty_since = now
+            # 연속 변경은 마지막 변경 기준으로 미루되, 최초 변경 후 max_delay는 넘기지 않음
+            self._deadline = min(now + self.quiet_period, self._dirty_since + self.max_delay)
+            self._ensure_worker()
+            self._cond.notify_all()
+            return {
+                "ticket": ticket,
+                "status": "scheduled",
+                "graphVersion": self._version,
+            }
+
+    def run_now(self, context: str = "", **options) -> dict:
+        """
+        대기 중인 변경분을 포함해 요청 스레드에서 즉시 재계산 (명시적 재계산 API용).
+        백그라운드 재계산이 실행 중이면 끝날 때까지 기다린다.
+        """
+        with self._run_lock:
+            with self._cond:
+                ticket, doc_ids, contexts = self._take_pending()
+                if context and context not in contexts:
+                    contexts.append(context)
+                self._requested_ticket = max(self._requested_ticket, ticket)
+            return self._run(ticket, doc_ids, contexts, options)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 재계산을 즉시 실행시키고 완료될 때까지 대기 (종료 처리용)."""
+        with self._cond:
+            target = self._requested_ticket
+            if self._completed_ticket >= target:
+                return True
+            self._deadline = time.monotonic()
+            self._cond.notify_all()
+        return self.wait(target, timeout)
+
+    def wait(self, ticket: int, timeout: Optional[float] = None) -> bool:
+        """ticket 이상의 재계산이 완료될 때까지 대기."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._completed_ticket < ticket:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "graphVersion": self._version,
+                "dirty": self._dirty_since is not None,
+                "running": self._running,
+                "requestedTicket": self._requested_ticket,
+                "completedTicket": self._completed_ticket,
+                "pendingDocs": len(self._pending_docs),
+                "lastBuiltAt": self._last_built_at,
+                "lastResult": self._last_result,
+            }
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    # ─── 내부 ────────────────────────────────────
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._worker, name="graph-rebuild", daemon=True
+            )
+            self._thread.start()
+
+    def _take_pending(self) -> tuple[int, list[str], list[str]]:
+        ticket = self._requested_ticket
+        doc_ids = sorted(self._pending_docs)
+        contexts = list(self._pending_contexts)
+        self._pending_docs.clear()
+        self._pending_contexts.clear()
+        self._dirty_since = None
+        self._deadline = None
+        return ticket, doc_ids, contexts
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._deadline is not None:
+                        remaining = self._deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+            with self._run_lock:
+                with self._cond:
+                    if self._deadline is None:
+                        continue  # run_now가 먼저 처리함
+                    ticket, doc_ids, contexts = self._take_pending()
+                self._run(ticket, doc_ids, contexts, {})
+
+    def _run(self, ticket: int, doc_ids: list[str], contexts: list[str], options: dict) -> dict:
+        with self._cond:
+            self._running = True
+        try:
+            result = self._rebuild_fn(doc_ids=doc_ids, contexts=contexts, **options)
+        except Exception as e:
+            result = {"ok": False, "status": "error", "reason": str(e)}
+        with self._cond:
+            self._running = False
+            self._version += 1
+            self._completed_ticket = max(self._completed_ticket, ticket)
+            self._last_result = result
+            self._last_built_at = datetime.now(timezone.utc).isoformat()
+            self._cond.notify_all()
+        return {**result, "ticket": ticket, "graphVersion": self._version}
@@ -0,0 +1,165 @@
+"""
+semantic_service.py — 태그 시맨틱 그래프 수치 연산 (NumPy)
+app.py의 그래프 재계산 루프 중 태그 centroid 유사도 계산을 벡터화한 엔진과
+공통 태그 문서쌍을 찾는 태그→문서 역색인, 검색 결과 순위 융합(RRF)
+"""
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+PAIR_CHUNK = 65536   # 쌍 단위 gather-dot 1회 처리량
+SIM_BLOCK = 1024     # top-k 블록 행렬곱의 행 블록 크기
+RRF_K = 60           # reciprocal rank fusion 평활 상수 (Cormack et al. 기본값)
+
+
+def stack_centroids(centroids: dict[str, np.ndarray]) -> tuple[list[str], np.ndarray]:
+    """
+    centroid dict → (태그 목록, L2 정규화된 float32 행렬 [T, D]).
+    노름이 0인 벡터는 0 행으로 남겨 모든 유사도가 0이 되도록 한다.
+    """
+    tags = list(centroids.keys())
+    if not tags:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    matrix = np.stack([np.asarray(centroids[t], dtype=np.float32) for t in tags])
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    matrix[(norms <= 0).ravel()] = 0.0
+    return tags, matrix
+
+
+def centroid_pair_sims(
+    centroids: dict[str, np.ndarray],
+    pairs: Iterable[tuple[str, str]],
+    chunk: int = PAIR_CHUNK,
+) -> dict[tuple[str, str], float]:
+    """
+    필요한 태그 쌍만 cosine similarity 계산.
+    centroid가 없는 태그가 포함된 쌍은 결과에서 제외 (조회 시 0.0으로 처리됨).
+    """
+    tags, matrix = stack_centroids(centroids)
+    index = {t: i for i, t in enumerate(tags)}
+    keys: list[tuple[str, str]] = []
+    rows_a: list[int] = []
+    rows_b: list[int] = []
+    for a, b in pairs:
+        ia = index.get(a)
+        ib = index.get(b)
+        if ia is None or ib is None:
+            continue
+        keys.append((a, b) if a <= b else (b, a))
+        rows_a.append(ia)
+        rows_b.append(ib)
+
+    sims: dict[tuple[str, str], float] = {}
+    if not keys:
+        return sims
+    idx_a = np.asarray(rows_a, dtype=np.int64)
+    idx_b = np.asarray(rows_b, dtype=np.int64)
+    for start in range(0, len(keys), chunk):
+        stop = start + chunk
+        dots = np.einsum("ij,ij->i", matrix[idx_a[start:stop]], matrix[idx_b[start:stop]])
+        sims.update(zip(keys[start:stop], dots.tolist()))
+    return sims
+
+
+def centroid_topk_sims(
+    centroids: dict[str, np.ndarray],
+    top_k: int,
+    min_sim: Optional[float] = None,
+    block: int = SIM_BLOCK,
+) -> dict[tuple[str, str], float]:
+    """
+    태그별 상위 top_k 이웃만 남기는 블록 행렬곱 유사도.
+    메모리는 block × T 행렬 하나로 제한되며, 결과는 최대 T × top_k 쌍.
+    """
+    tags, matrix = stack_centroids(centroids)
+    n = len(tags)
+    sims: dict[tuple[str, str], float] = {}
+    if n < 2 or top_k <= 0:
+        return sims
+    k = min(top_k, n - 1)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        scores = matrix[start:stop] @ matrix.T
+        scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # 자기 자신 제외
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        for local, (cols, vals) in enumerate(zip(top.tolist(), top_scores.tolist())):
+            a = tags[start + local]
+            for j, score in zip(cols, vals):
+                if min_sim is not None and score < min_sim:
+                    continue
+                b = tags[j]
+                sims[(a, b) if a <= b else (b, a)] = score
+    return sims
+
+
+def centroid_neighbors(
+    centroids: dict[str, np.ndarray],
+    tag: str,
+) -> list[tuple[str, float]]:
+    """기준 태그와 나머지 전체 태그의 cosine similarity (내림차순)."""
+    tags, matrix = stack_centroids(centroids)
+    if tag not in centroids:
+        return []
+    base = matrix[tags.index(tag)]
+    scores = (matrix @ base).tolist()
+    rows = [(t, s) for t, s in zip(tags, scores) if t != tag]
+    rows.sort(key=lambda x: x[1], reverse=True)
+    return rows
+
+
+def build_tag_postings(doc_tags: dict[str, list[str]]) -> dict[str, list[str]]:
+    """태그 → 해당 태그가 붙은 문서 ID 목록(정렬) 역색인."""
+    postings: dict[str, list[str]] = {}
+    for doc_id, tags in doc_tags.items():
+        for tag in set(tags):
+            postings.setdefault(tag, []).append(doc_id)
+    for ids in postings.values():
+        ids.sort()
+    return postings
+
+
+def iter_cotagged_pairs(
+    doc_tags: dict[str, list[str]],
+    postings: Optional[dict[str, list[str]]] = None,
+) -> Iterator[tuple[str, str, set[str]]]:
+    """
+    공통 태그가 1개 이상인 문서쌍 (a < b, 공통 태그 집합)을 a, b 오름차순으로 생성.
+    posting 목록만 따라가므로 비용은 n² 이 아니라 공동 태깅된 쌍의 수에 비례한다.
+    """
+    if postings is None:
+        postings = build_tag_postings(doc_tags)
+    for a in sorted(doc_tags):
+        shared: dict[str, set[str]] = {}
+        for tag in doc_tags[a]:
+            ids = postings.get(tag, [])
+            for b in ids[bisect_right(ids, a):]:
+                shared.setdefault(b, set()).add(tag)
+        for b in sorted(shared):
+            yield a, b, shared[b]
+
+
+def reciprocal_rank_fusion(
+    rankings: dict[str, list[str]],
+    k: int = RRF_K,
+) -> list[tuple[str, float, dict[str, int]]]:
+    """
+    여러 순위 목록을 RRF 점수 Σ 1/(k + rank)로 융합.
+    rankings: {출처: [id, ...] (1위부터)} → [(id, score, {출처: rank})] 점수 내림차순.
+    점수가 같으면 먼저 등장한 출처의 순위가 높은 쪽이 앞선다.
+    """
+    scores: dict[str, float] = {}
+    ranks: dict[str, dict[str, int]] = {}
+    for source, ids in rankings.items():
+        seen: set[str] = set()
+        for rank, doc_id in enumerate(ids, start=1):
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+            ranks.setdefault(doc_id, {})[source] = rank
+    order = {doc_id: i for i, doc_id in enumerate(scores)}
+    fused = sorted(scores, key=lambda d: (-scores[d], order[d]))
+    return [(doc_id, scores[doc_id], ranks[doc_id]) for doc_id in fused]
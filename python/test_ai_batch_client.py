@@ -0,0 +1,122 @@
+"""
+test_ai_batch_client.py — ChatBatchClient 테스트
+chat-completions 응답 형식을 흉내 내는 로컬 스텁 HTTP 서버를 띄워 실제 HTTP로 호출한다.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_batch_client import AIRequestError, ChatBatchClient, ChatRequest, _Bucket
+
+
+class _StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.fail_first = 0  # 처음 N번은 429
+        self.always_status = None
+
+
+def _make_server(state: _StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with state.lock:
+                state.calls += 1
+                call = state.calls
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            try:
+                time.sleep(0.05)
+                status = state.always_status or (429 if call <= state.fail_first else 200)
+                if status != 200:
+                    payload = {"error": {"message": "slow down"}}
+                    self.send_response(status)
+                    self.send_header("Retry-After", "0")
+                else:
+                    assert self.path == "/v1/chat/completions"
+                    assert self.headers["Authorization"] == "Bearer test-key"
+                    prompt = body["messages"][-1]["content"]
+                    indexes = [int(i) for i in re.findall(r"^(\d+): ", prompt, re.M)]
+                    content = json.dumps([{"i": i, "s": i / 10} for i in indexes])
+                    payload = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "model": body["model"],
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    }
+                    self.send_response(200)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            finally:
+                with state.lock:
+                    state.active -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub():
+    state = _StubState()
+    server = _make_server(state)
+    yield state, f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+def _request(n: int) -> ChatRequest:
+    lines = "\n".join(f"{i}: a{i} | b{i}" for i in range(n))
+    return ChatRequest([{"role": "user", "content": lines}], max_tokens=n * 20)
+
+
+def test_runs_batches_concurrently_and_retries(stub):
+    state, base_url = stub
+    state.fail_first = 2
+    client = ChatBatchClient("test-key", "stub-model", base_url=base_url, concurrency=3, backoff=0.01)
+    results = {}
+    stats = client.run_sync([_request(3) for _ in range(8)], lambda i, content, err: results.setdefault(i, (content, err)))
+
+    assert sorted(results) == list(range(8))
+    assert all(err is None for _, err in results.values())
+    assert json.loads(results[0][0]) == [{"i": 0, "s": 0.0}, {"i": 1, "s": 0.1}, {"i": 2, "s": 0.2}]
+    assert stats["retries"] == 2 and stats["requests"] == 10 and stats["failures"] == 0
+    assert 1 < state.max_active <= 3
+
+
+def test_gives_up_after_max_retries_and_reports_error(stub):
+    state, base_url = stub
+    state.always_status = 503
+    client = ChatBatchClient("test-key", "stub-model", base_url=base_url, max_retries=1, backoff=0.01)
+    errors = []
+    stats = client.run_sync([_request(1)], lambda i, content, err: errors.append(err))
+    assert isinstance(errors[0], AIRequestError) and errors[0].status == 503
+    assert stats["requests"] == 2 and stats["failures"] == 1
+
+    state.always_status = 400  # 재시도 불가 오류는 즉시 실패
+    client = ChatBatchClient("test-key", "stub-model", base_url=base_url, backoff=0.01)
+    client.run_sync([_request(1)], lambda i, content, err: errors.append(err))
+    assert errors[1].status == 400 and client.stats["requests"] == 1
+
+
+def test_bucket_refills_per_minute():
+    now = [0.0]
+    bucket = _Bucket(60, lambda: now[0])  # 초당 1
+    assert bucket.wait_time(60) == 0
+    bucket.consume(60)
+    assert bucket.wait_time(2) == pytest.approx(2.0)
+    now[0] = 1.5
+    assert bucket.wait_time(2) == pytest.approx(0.5)
+    assert bucket.wait_time(1000) == pytest.approx(58.5)  # 한도보다 큰 요청은 가득 차면 통과
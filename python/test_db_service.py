@@ -0,0 +1,262 @@
+"""
+test_db_service.py — db_service 단위 테스트
+임시 SQLite 파일을 사용하므로 실 데이터에 영향 없음.
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def tmp_db(tmp_path, monkeypatch):
+    """각 테스트마다 독립적인 임시 DB 사용"""
+    monkeypatch.setenv("MY_GRAPH_DB_PATH", str(tmp_path / "metadata.db"))
+    import importlib
+    import db_service
+    importlib.reload(db_service)
+    return tmp_path
+
+
+def test_doc_embeddings_roundtrip():
+    import db_service
+    assert db_service.get_doc_embeddings(["a"], "m") == {}
+
+    db_service.save_doc_embeddings(
+        [{"docId": "a", "contentHash": "h1", "vector": [0.5, 1.0]}], "m"
+    )
+    assert db_service.get_doc_embeddings(["a", "b"], "m") == {"a": ("h1", [0.5, 1.0])}
+    # 다른 모델 키는 분리
+    assert db_service.get_doc_embeddings(["a"], "other") == {}
+
+    # 같은 (docId, model)은 덮어쓰기
+    db_service.save_doc_embeddings(
+        [{"docId": "a", "contentHash": "h2", "vector": [2.0, 3.0]}], "m"
+    )
+    assert db_service.get_doc_embeddings(["a"], "m")["a"][0] == "h2"
+
+    db_service.delete_doc_embeddings(["a"])
+    assert db_service.get_doc_embeddings(["a"], "m") == {}
+
+
+def test_chunk_embeddings_are_shared_and_pruned():
+    import db_service
+    db_service.save_chunk_embeddings(
+        [{"chunkHash": "c1", "vector": [1.0, 0.0]}, {"chunkHash": "c2", "vector": [0.0, 1.0]}], "m"
+    )
+    db_service.replace_doc_chunks({
+        "a": [{"chunkHash": "c1", "start": 0, "end": 10}, {"chunkHash": "c2", "start": 8, "end": 20}],
+        "b": [{"chunkHash": "c1", "start": 0, "end": 10}],
+    }, "m")
+    assert db_service.get_chunk_embeddings(["c1", "c2", "c3"], "m") == {"c1": [1.0, 0.0], "c2": [0.0, 1.0]}
+    assert [c["chunkHash"] for c in db_service.get_doc_chunks("a", "m")] == ["c1", "c2"]
+
+    # a의 구성이 바뀌면 더 이상 참조되지 않는 c2만 삭제, b가 쓰는 c1은 유지
+    db_service.save_chunk_embeddings([{"chunkHash": "c3", "vector": [0.5, 0.5]}], "m")
+    db_service.replace_doc_chunks({"a": [{"chunkHash": "c3", "start": 0, "end": 5}]}, "m")
+    assert set(db_service.get_chunk_embeddings(["c1", "c2", "c3"], "m")) == {"c1", "c3"}
+
+    db_service.delete_doc_embeddings(["a", "b"])
+    assert db_service.get_doc_chunks("b", "m") == []
+    assert db_service.get_chunk_embeddings(["c1", "c3"], "m") == {}
+
+
+def test_tag_similarity_targeted_lookup_and_lru():
+    import db_service
+    db_service.save_tag_similarity_cache(
+        [{"tagA": "a", "tagB": "b", "score": 0.5}, {"tagA": "a", "tagB": "c", "score": 0.25}], "m"
+    )
+    db_service.save_tag_similarity_cache([{"tagA": "a", "tagB": "b", "score": 0.9}], "other")
+    # 모델마다 별도 키 — 다른 모델 저장이 덮어쓰지 않음
+    assert db_service.get_tag_similarities([("a", "b"), ("b", "c")], "m") == {("a", "b"): 0.5}
+    assert db_service.get_tag_similarities([("a", "b")], "other") == {("a", "b"): 0.9}
+
+    # LRU를 비워도 DB 조회로 같은 결과, 조회한 쌍은 다시 LRU에 적재
+    db_service._tag_sim_lru.clear()
+    assert db_service.get_tag_similarities({("a", "c"), ("a", "b")}, "m") == {("a", "b"): 0.5, ("a", "c"): 0.25}
+    before = db_service.tag_similarity_cache_stats()["hits"]
+    db_service.get_tag_similarities([("a", "c")], "m")
+    assert db_service.tag_similarity_cache_stats()["hits"] == before + 1
+
+    # 무효화는 DB와 LRU 모두에서 해당 태그 쌍 제거
+    db_service.invalidate_tag_similarity_cache(["c"], "m")
+    assert db_service.get_tag_similarities([("a", "b"), ("a", "c")], "m") == {("a", "b"): 0.5}
+    assert db_service.get_tag_similarity_cache("m") == {("a", "b"): 0.5}
+
+
+def test_extraction_cache_hits_and_evicts_least_recent(monkeypatch):
+    import time
+    import db_service
+    monkeypatch.setattr(db_service, "EXTRACTION_CACHE_MAX", 2)
+    assert db_service.get_extraction("nlp", "kiwi", "h1") is None
+    db_service.save_extraction("nlp", "kiwi", "h1", ["그래프", "태그"])
+    time.sleep(0.002)
+    db_service.save_extraction("ai", "gpt", "h1", ["AI"])
+    assert db_service.get_extraction("nlp", "kiwi", "h1") == ["그래프", "태그"]
+    assert db_service.get_extraction("nlp", "other-model", "h1") is None
+
+    # 상한 초과 시 가장 오래 안 쓰인 행(ai/h1)부터 제거 — nlp/h1은 방금 조회되어 유지
+    time.sleep(0.002)
+    db_service.save_extraction("nlp", "kiwi", "h2", ["문서"])
+    assert db_service.get_extraction("ai", "gpt", "h1") is None
+    assert db_service.get_extraction("nlp", "kiwi", "h1") == ["그래프", "태그"]
+
+    stats = db_service.extraction_cache_stats()
+    assert stats["entries"] == 2
+    assert stats["extractors"]["nlp"] == {"hits": 2, "misses": 2, "hitRate": 0.5, "entries": 2}
+    assert stats["extractors"]["ai"]["entries"] == 0 and stats["extractors"]["ai"]["misses"] == 1
+
+
+def test_apply_tag_centroid_changes():
+    import db_service
+    db_service.apply_tag_centroid_changes(
+        [{"docId": "d1", "tags": ["ai"], "contentHash": "h", "vector": [1.0, 0.0]}],
+        [],
+        [{"tag": "ai", "sum": [1.0, 0.0], "vector": [1.0, 0.0], "docCount": 1}],
+        "m",
+    )
+    assert db_service.list_tag_centroid_member_ids("m") == ["d1"]
+    assert db_service.get_tag_vector_sums(["ai"], "m") == {"ai": ([1.0, 0.0], 1)}
+    assert db_service.list_tag_embeddings("m") == [{"tag": "ai", "vector": [1.0, 0.0], "docCount": 1}]
+
+    # 기여 문서가 빠지면 태그 합계/centroid 모두 삭제
+    db_service.apply_tag_centroid_changes([], ["d1"], [{"tag": "ai", "docCount": 0}], "m")
+    assert db_service.list_tag_centroid_member_ids("m") == []
+    assert db_service.get_tag_vector_sums(["ai"], "m") == {}
+    assert db_service.list_tag_embeddings("m") == []
+
+
+def test_apply_graph_edge_changes_only_touches_given_rows():
+    import db_service
+    edge = lambda s, t, w: {"sourceDocId": s, "targetDocId": t, "weight": w, "distance": 1 - w, "evidence": []}
+    db_service.replace_graph_edges([edge("a", "b", 0.5), edge("c", "d", 0.7)], "tag_semantic", "m")
+    assert db_service.get_graph_edge_model("tag_semantic") == "m"
+
+    db_service.apply_graph_edge_changes(
+        [edge("a", "b", 0.9), edge("a", "e", 0.6)], [("c", "d")], "tag_semantic", "m"
+    )
+    rows = db_service.list_graph_edges_for_docs(["a", "c"], "tag_semantic")
+    assert {(r["sourceDocId"], r["targetDocId"], r["weight"]) for r in rows} == {
+        ("a", "b", 0.9),
+        ("a", "e", 0.6),
+    }
+
+
+def test_schema_migrated_once_and_connection_reused(tmp_db):
+    import threading
+    import db_service
+    conn = db_service._get_conn()
+    assert db_service._get_conn() is conn
+    versions = [r["version"] for r in conn.execute("SELECT version FROM schema_version")]
+    assert versions == list(range(1, len(db_service._MIGRATIONS) + 1))
+
+    # 다른 스레드는 별도 연결을 사용
+    other = []
+    t = threading.Thread(target=lambda: other.append(db_service._get_conn()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_legacy_json_vectors_migrated_to_blobs(tmp_path, monkeypatch):
+    import importlib
+    import sqlite3
+    import db_service
+
+    legacy_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(legacy_path)
+    conn.executescript(db_service._MIGRATIONS[0])
+    conn.execute(
+        "INSERT INTO tag_embeddings (tag, vectorJson, docCount, model, updatedAt) VALUES (?, ?, ?, ?, ?)",
+        ("ai", "[0.25, -1.5, 2.0]", 3, "m", "2026-01-01"),
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("MY_GRAPH_DB_PATH", str(legacy_path))
+    importlib.reload(db_service)
+    assert db_service.list_tag_embeddings("m") == [
+        {"tag": "ai", "vector": [0.25, -1.5, 2.0], "docCount": 3}
+    ]
+
+
+def test_bigram_index_backfilled_from_existing_search_docs(tmp_path, monkeypatch):
+    import importlib
+    import sqlite3
+    import db_service
+
+    path = tmp_path / "v7.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE schema_version (version INTEGER NOT NULL)")
+    for version, step in enumerate(db_service._MIGRATIONS[:7], start=1):
+        if callable(step):
+            step(conn)
+        else:
+            conn.executescript(step)
+        conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+    conn.execute("INSERT INTO search_docs (docId, title, body) VALUES ('a', '회의록', '예산 검토')")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("MY_GRAPH_DB_PATH", str(path))
+    importlib.reload(db_service)
+    res = db_service.search_docs("예산")
+    assert res["mode"] == "bigram" and [r["id"] for r in res["items"]] == ["a"]
+
+
+def test_load_tag_embedding_matrix():
+    import db_service
+    db_service.apply_tag_centroid_changes(
+        [],
+        [],
+        [
+            {"tag": "b", "sum": [2.0, 0.0], "vector": [1.0, 0.0], "docCount": 2},
+            {"tag": "a", "sum": [0.0, 1.0], "vector": [0.0, 1.0], "docCount": 1},
+        ],
+        "m",
+    )
+    matrix, index, counts = db_service.load_tag_embedding_matrix("m")
+    assert matrix.dtype.name == "float32" and matrix.shape == (2, 2)
+    assert index == {"a": 0, "b": 1}
+    assert matrix[index["b"]].tolist() == [1.0, 0.0]
+    assert counts.tolist() == [1, 2]
+
+    matrix, index, _ = db_service.load_tag_embedding_matrix("m", min_docs=2)
+    assert list(index) == ["b"]
+
+
+def test_search_docs_fts_and_like_fallback():
+    import db_service
+    db_service.upsert_search_docs([
+        {"docId": "a", "title": "형태소 분석기 비교", "body": "Kiwi와 Mecab의 형태소 분석 속도", "tags": ["NLP"], "updatedAt": "1"},
+        {"docId": "b", "title": "그래프 DB", "body": "Neo4j 그래프 질의와 형태소 색인", "tags": ["DB"], "updatedAt": "2"},
+        {"docId": "c", "title": "100% 완료", "body": "진행률 메모", "tags": [], "updatedAt": "3"},
+    ])
+    res = db_service.search_docs("형태소")
+    assert res["mode"] == "fts"
+    assert [r["id"] for r in res["items"]] == ["a", "b"]  # 제목 일치 가중치
+    assert "<mark>형태소</mark>" in res["items"][0]["title"]
+    assert "<mark>형태소</mark>" in res["items"][1]["snippet"]
+
+    # 3글자 이상(부분 문자열)과 3글자 미만(LIKE) 단어 AND 조합
+    assert [r["id"] for r in db_service.search_docs("형태소 DB")["items"]] == ["b"]
+    assert [r["id"] for r in db_service.search_docs("분석기")["items"]] == ["a"]
+
+    # 2글자 단어는 2-gram 색인, 기호가 섞인 짧은 단어는 LIKE
+    short = db_service.search_docs("그래")
+    assert short["mode"] == "bigram" and [r["id"] for r in short["items"]] == ["b"]
+    assert [r["id"] for r in db_service.search_docs("분석 db")["items"]] == []
+    assert [r["id"] for r in db_service.search_docs("색인 db")["items"]] == ["b"]  # 태그·대소문자 무관
+    assert [r["id"] for r in db_service.search_docs("형태소 분석")["items"]] == ["a"]
+    assert db_service.search_docs("프D")["items"] == []  # 단어 경계를 넘는 2-gram은 없음
+    assert [r["id"] for r in db_service.search_docs("0%")["items"]] == ["c"]  # LIKE 와일드카드 이스케이프
+    assert db_service.search_docs("0%")["mode"] == "like"
+    assert db_service.search_docs('"') == {"items": [], "mode": "empty"}
+
+    # 갱신/삭제가 FTS 색인에 반영
+    db_service.upsert_search_docs([{"docId": "a", "title": "제목 변경", "body": "내용 없음", "tags": [], "updatedAt": "4"}])
+    assert [r["id"] for r in db_service.search_docs("형태소")["items"]] == ["b"]
+    assert db_service.search_docs("분석")["items"] == []
+    db_service.delete_search_docs(["b"])
+    assert db_service.search_docs("형태소")["items"] == []
+    assert db_service.search_docs("그래")["items"] == []
+    previews = db_service.get_search_doc_previews(["a", "b"], width=2)
+    assert previews == {"a": {"title": "제목 변경", "snippet": "내용…"}}
+    assert db_service.list_search_doc_versions() == {"a": ("4", ""), "c": ("3", "")}
@@ -92,3 +92,227 @@ def test_doc_folder_assignment():
     # 다른 폴더로 필터링하면 안 나와야 함
     filtered2 = doc_service.list_docs(folder="없는폴더")
     assert all(d["id"] != doc_id for d in filtered2)
+
+
+# ─── 페이지네이션 ────────────────────────────────
+
+def _seed_paged_docs(doc_service):
+    doc_service.create_folder("F")
+    ids = []
+    for i in range(7):
+        doc_id = doc_service.save_doc("", f"문서{i}", "내용")
+        if i % 2 == 0:
+            doc_service.set_doc_folder(doc_id, "F")
+        doc_service.set_tags_for_doc(doc_id, ["짝"] if i % 2 == 0 else ["홀"])
+        ids.append(doc_id)
+    return ids
+
+
+def _collect_pages(doc_service, **filters):
+    items, cursor, totals = [], None, set()
+    while True:
+        page = doc_service.list_docs_page(limit=3, cursor=cursor, **filters)
+        items.extend(page["items"])
+        totals.add(page["total"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return items, totals
+
+
+def _check_pagination(doc_service):
+    ids = _seed_paged_docs(doc_service)
+    items, totals = _collect_pages(doc_service)
+    assert [d["id"] for d in items] == [d["id"] for d in doc_service.list_docs()]
+    assert totals == {7}
+
+    items, totals = _collect_pages(doc_service, folder="F", tag="짝")
+    assert {d["id"] for d in items} == set(ids[0::2]) and totals == {4}
+    assert all(d["tags"] == ["짝"] and d["folder"] == "F" for d in items)
+
+    since = doc_service.list_docs()[2]["updatedAt"]
+    page = doc_service.list_docs_page(limit=10, updated_since=since)
+    assert page["total"] == 3 and page["nextCursor"] is None
+
+    with pytest.raises(ValueError):
+        doc_service.list_docs_page(limit=3, cursor="!!not-a-cursor")
+    assert doc_service.count_docs_by_folder() == {"total": 7, "folders": {"F": 4}}
+
+
+def test_list_docs_page_json():
+    import doc_service
+    _check_pagination(doc_service)
+
+
+def test_list_docs_page_json_matches_list_docs_files():
+    import doc_service
+    ids = _seed_paged_docs(doc_service)
+    # meta 없이 추가된 파일은 포함, 파일이 없어진 meta 항목은 제외 (list_docs와 같은 기준)
+    (doc_service.DOCS_DIR / "dropped.md").write_text("외부 추가", encoding="utf-8")
+    (doc_service.DOCS_DIR / f"{ids[0]}.md").unlink()
+    items, totals = _collect_pages(doc_service)
+    assert [d["id"] for d in items] == [d["id"] for d in doc_service.list_docs()]
+    assert "dropped" in {d["id"] for d in items} and ids[0] not in {d["id"] for d in items}
+    assert totals == {7}
+    assert doc_service.count_docs_by_folder() == {"total": 7, "folders": {"F": 3}}
+
+
+def test_list_docs_page_sqlite(sqlite_backend):
+    _check_pagination(sqlite_backend)
+
+
+# ─── meta.json 캐시 / 일괄 기록 ──────────────────
+
+def test_meta_cache_reloads_on_external_change():
+    import json
+    import doc_service
+    doc_id = doc_service.save_doc("", "캐시 문서", "내용")
+    assert doc_service.get_tags_for_doc(doc_id) == []
+    before = doc_service.meta_cache_stats()["hits"]
+    doc_service.get_tags_for_doc(doc_id)
+    assert doc_service.meta_cache_stats()["hits"] == before + 1
+
+    # 다른 프로세스가 meta.json을 바꾸면 (mtime/size 변경) 다시 읽음
+    meta = json.loads(doc_service.META_PATH.read_text(encoding="utf-8"))
+    meta["documentTags"][doc_id] = ["외부"]
+    doc_service.META_PATH.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    assert doc_service.get_tags_for_doc(doc_id) == ["외부"]
+
+
+def test_meta_batch_flushes_once():
+    import doc_service
+    flushes = doc_service.meta_cache_stats()["flushes"]
+    with doc_service.meta_batch():
+        doc_id = doc_service.save_doc("", "일괄 문서", "내용")
+        doc_service.set_tags_for_doc(doc_id, ["A"])
+        doc_service.create_folder("F")
+        doc_service.set_doc_folder(doc_id, "F")
+        # 기록 전에도 같은 프로세스에서는 변경이 보임
+        assert doc_service.list_docs(folder="F")[0]["tags"] == ["A"]
+        assert doc_service.meta_cache_stats()["flushes"] == flushes
+    assert doc_service.meta_cache_stats()["flushes"] == flushes + 1
+    assert doc_service.META_PATH.read_text(encoding="utf-8").count('"F"') == 2
+    assert not list(doc_service.DATA_DIR.glob(".meta.json.*"))
+
+
+def test_meta_concurrent_updates_not_lost():
+    import doc_service
+    from concurrent.futures import ThreadPoolExecutor
+    ids = [doc_service.save_doc("", f"문서{i}", "내용") for i in range(20)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda d: doc_service.set_tags_for_doc(d, [d]), ids))
+    doc_service.reset_meta_store()  # 캐시를 버리고 파일에서 확인
+    assert all(doc_service.get_tags_for_doc(d) == [d] for d in ids)
+
+
+# ─── SQLite 메타 백엔드 ──────────────────────────
+
+@pytest.fixture
+def sqlite_backend(monkeypatch):
+    monkeypatch.setenv("MY_GRAPH_META_BACKEND", "sqlite")
+    import importlib
+    import doc_service
+    importlib.reload(doc_service)
+    yield doc_service
+    doc_service.reset_meta_store()
+
+
+def test_sqlite_backend_crud(sqlite_backend):
+    doc_service = sqlite_backend
+    doc_service.create_folder("연구")
+    doc_id = doc_service.save_doc("", "SQLite 문서", "내용")
+    doc_service.set_doc_folder(doc_id, "연구")
+    doc_service.set_tags_for_doc(doc_id, ["AI", "Python", "AI"])
+
+    assert doc_service.get_doc(doc_id)["title"] == "SQLite 문서"
+    assert doc_service.get_tags_for_doc(doc_id) == ["AI", "Python"]
+    assert [d["id"] for d in doc_service.list_docs(folder="연구")] == [doc_id]
+
+    # 빈 제목 저장 시 기존 제목 유지, 태그/폴더 유지
+    doc_service.save_doc(doc_id, "", "수정")
+    doc = doc_service.list_docs()[0]
+    assert doc["title"] == "SQLite 문서"
+    assert doc["folder"] == "연구" and doc["tags"] == ["AI", "Python"]
+
+    doc_service.rename_folder("연구", "Research")
+    assert doc_service.list_docs(folder="Research")[0]["id"] == doc_id
+
+    doc_service.delete_doc(doc_id)
+    assert doc_service.list_docs() == []
+    assert doc_service.get_all_tags() == []
+    assert doc_service.restore_from_trash(doc_id)
+    restored = doc_service.list_docs()[0]
+    assert restored["folder"] == "Research" and restored["tags"] == ["AI", "Python"]
+
+
+def test_sqlite_meta_batch_is_one_transaction(sqlite_backend):
+    doc_service = sqlite_backend
+    with doc_service.meta_batch():
+        ids = [doc_service.save_doc("", f"일괄{i}", "내용") for i in range(3)]
+        doc_service.set_tags_for_doc(ids[0], ["A"])
+    assert sorted(d["id"] for d in doc_service.list_docs()) == sorted(ids)
+
+    # 블록이 예외로 끝나면 메타 변경과 블록 안에서 쓴 문서 파일이 모두 취소
+    with pytest.raises(RuntimeError):
+        with doc_service.meta_batch():
+            doc_service.save_doc("", "취소될 문서", "내용")
+            doc_service.save_doc(ids[2], "", "바뀐 내용")
+            doc_service.set_tags_for_doc(ids[1], ["B"])
+            raise RuntimeError("중단")
+    assert len(doc_service.list_docs()) == 3
+    assert sorted(p.stem for p in doc_service.DOCS_DIR.glob("*.md")) == sorted(ids)
+    assert doc_service.get_doc(ids[2])["content"] == "내용"
+    assert doc_service.get_tags_for_doc(ids[1]) == []
+
+
+def test_sqlite_reset_closes_connections_of_every_thread(sqlite_backend):
+    import sqlite3
+    import threading
+    doc_service = sqlite_backend
+    doc_id = doc_service.save_doc("", "스레드 문서", "내용")
+    store = doc_service._meta_db()
+    opened, ready, reset, done = [], threading.Event(), threading.Event(), []
+
+    def worker():
+        opened.append(store._conn())
+        ready.set()
+        reset.wait(5)
+        done.append(store.get_document(doc_id)["title"])  # 닫힌 연결 대신 새로 연다
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    ready.wait(5)
+    doc_service.reset_meta_store()
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+    reset.set()
+    thread.join()
+    assert done == ["스레드 문서"]
+
+
+def test_sqlite_backend_migrates_and_exports_meta_json(sqlite_backend, monkeypatch):
+    import importlib
+    import json
+    import doc_service
+
+    # json 백엔드에서 만든 데이터를 sqlite 백엔드가 첫 사용 시 이관
+    monkeypatch.setenv("MY_GRAPH_META_BACKEND", "json")
+    importlib.reload(doc_service)
+    doc_service.create_folder("카테고리")
+    doc_id = doc_service.save_doc("", "이관 문서", "내용")
+    doc_service.set_tags_for_doc(doc_id, ["태그"])
+    doc_service.set_doc_folder(doc_id, "카테고리")
+    (doc_service.DOCS_DIR / "orphan.md").write_text("meta 없음", encoding="utf-8")
+    json_meta = doc_service.get_meta()
+
+    monkeypatch.setenv("MY_GRAPH_META_BACKEND", "sqlite")
+    importlib.reload(doc_service)
+    assert {d["id"] for d in doc_service.list_docs()} == {doc_id, "orphan"}
+    assert doc_service.get_tags_for_doc(doc_id) == ["태그"]
+    assert doc_service.list_folders() == ["카테고리"]
+
+    doc_service.set_tags_for_doc(doc_id, ["태그", "추가"])
+    exported = json.loads(doc_service.export_meta_json().read_text(encoding="utf-8"))
+    assert exported["documentTags"][doc_id] == ["태그", "추가"]
+    assert exported["documentFolders"][doc_id] == "카테고리"
+    assert exported["documents"][doc_id] == json_meta["documents"][doc_id]
+    assert exported["documents"]["orphan"]["title"] == "orphan"
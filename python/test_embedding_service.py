@@ -0,0 +1,198 @@
+"""
+test_embedding_service.py — 임베딩 백엔드 단위 테스트
+작은 무작위 BERT를 sentence-transformers 형식으로 저장해 torch ↔ ONNX(int8) 결과를 비교한다.
+"""
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import embedding_service
+from embedding_service import EmbeddingConfig
+
+TEXTS = [
+    "그래프 문서 편집기에서 태그를 관리합니다.",
+    "한국어 임베딩 모델 테스트",
+    "오늘 날씨가 맑다",
+    "태그 관리",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    pytest.importorskip("sentence_transformers")
+    transformers = pytest.importorskip("transformers")
+    torch = pytest.importorskip("torch")
+
+    model_dir = tmp_path_factory.mktemp("tiny_st")
+    chars = sorted({c for t in TEXTS for c in t if not c.isspace()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + ["##" + c for c in chars]
+    (model_dir / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(model_dir / "vocab.txt"))
+    tokenizer.save_pretrained(str(model_dir))
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64, max_position_embeddings=64,
+    )
+    transformers.BertModel(config).save_pretrained(str(model_dir))
+
+    (model_dir / "1_Pooling").mkdir()
+    (model_dir / "modules.json").write_text(json.dumps([
+        {"idx": 0, "name": "0", "path": "", "type": "sentence_transformers.models.Transformer"},
+        {"idx": 1, "name": "1", "path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+        {"idx": 2, "name": "2", "path": "2_Normalize", "type": "sentence_transformers.models.Normalize"},
+    ]), encoding="utf-8")
+    (model_dir / "1_Pooling" / "config.json").write_text(json.dumps({
+        "word_embedding_dimension": 32,
+        "pooling_mode_cls_token": False,
+        "pooling_mode_mean_tokens": True,
+        "pooling_mode_max_tokens": False,
+    }), encoding="utf-8")
+    (model_dir / "sentence_bert_config.json").write_text(
+        json.dumps({"max_seq_length": 48, "do_lower_case": False}), encoding="utf-8"
+    )
+    return str(model_dir)
+
+
+def test_cache_key_separates_vector_spaces():
+    assert EmbeddingConfig("m").cache_key == "m"
+    assert EmbeddingConfig("m", "onnx").cache_key == "m@onnx-int8"
+    assert EmbeddingConfig("m", "onnx", quantize=False, max_seq_length=128).cache_key == "m@onnx@seq128"
+    with pytest.raises(ValueError):
+        EmbeddingConfig("m", "tpu")
+
+
+def test_pool_modes():
+    hidden = np.array([[[1.0, 0.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    assert np.allclose(embedding_service._pool(hidden, mask, "mean", False), [[2.0, 2.0]])
+    assert np.allclose(embedding_service._pool(hidden, mask, "max", False), [[3.0, 4.0]])
+    assert np.allclose(embedding_service._pool(hidden, mask, "cls", True), [[1.0, 0.0]])
+
+
+def test_chunk_spans_overlap_and_pooling(tiny_model):
+    # tokenizer 없으면 문자 수 근사 (토큰당 2자)
+    assert embedding_service.chunk_spans("짧은 글", None, 16, 4) == [(0, 4)]
+    spans = embedding_service.chunk_spans("가" * 40, None, 10, 2)
+    assert spans[0] == (0, 20) and spans[1] == (16, 36) and spans[-1][1] == 40
+
+    transformers = pytest.importorskip("transformers")
+    tokenizer = transformers.AutoTokenizer.from_pretrained(tiny_model)
+    text = " ".join(TEXTS * 3)
+    spans = embedding_service.chunk_spans(text, tokenizer, 12, 3)
+    assert len(spans) > 1
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    for (s1, e1), (s2, _) in zip(spans, spans[1:]):
+        assert s2 < e1  # 구간이 겹친다
+    for start, end in spans:
+        assert len(tokenizer(text[start:end], add_special_tokens=False)["input_ids"]) <= 12
+
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    assert np.allclose(embedding_service.pool_chunks(vectors, [3, 1]), [0.75, 0.25])
+    assert np.allclose(embedding_service.pool_chunks(vectors[:1], [5]), [1.0, 0.0])
+
+
+class _FakeProvider(embedding_service.EmbeddingProvider):
+    def __init__(self, delay=0.0, fail=False):
+        super().__init__(EmbeddingConfig("fake"))
+        self.batches: list[int] = []
+        self.delay = delay
+        self.fail = fail
+
+    def encode(self, texts, batch_size=32):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return np.array([[float(len(t)), float(i)] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+def test_batcher_coalesces_concurrent_calls():
+    provider = _FakeProvider(delay=0.01)
+    batcher = embedding_service.EmbeddingBatcher(provider, max_batch=16, max_wait=0.02)
+    texts = ["x" * (i + 1) for i in range(40)]
+    results: dict[int, np.ndarray] = {}
+
+    def call(i):
+        results[i] = batcher.encode([texts[i]])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 호출자별로 자기 텍스트의 벡터를 받는다
+    assert all(results[i].shape == (1, 2) and results[i][0, 0] == i + 1 for i in range(len(texts)))
+    assert sum(provider.batches) == len(texts)
+    assert len(provider.batches) < len(texts) / 2
+    assert max(provider.batches) <= 16
+
+    stats = batcher.stats()
+    assert stats["requests"] == len(texts)
+    assert stats["items"] == len(texts)
+    assert stats["queueDepth"] == 0
+    assert stats["maxBatchSize"] == max(provider.batches)
+    assert stats["avgBatchSize"] > 2
+
+    # 큰 요청은 max_batch 조각으로 나눠 처리 후 원래 순서로 합침, 빈 요청은 즉시 반환
+    provider.batches.clear()
+    big = batcher.encode(texts)
+    assert big.shape == (40, 2) and big[:, 0].tolist() == [float(i + 1) for i in range(40)]
+    assert provider.batches == [16, 16, 8]
+    assert batcher.encode([]).shape[0] == 0
+    batcher.stop()
+
+
+def test_batcher_serves_small_requests_between_slices_of_a_large_one():
+    provider = _FakeProvider(delay=0.02)
+    batcher = embedding_service.EmbeddingBatcher(provider, max_batch=4, max_wait=0.001)
+    big = batcher.submit(["b"] * 40)
+    time.sleep(0.005)
+    small = batcher.submit(["s"])
+    assert small.result(timeout=5).shape == (1, 2)
+    assert not big.done()  # 큰 요청의 조각 사이에 끼어 처리됨
+    assert big.result(timeout=5).shape == (40, 2)
+    assert max(provider.batches) <= 4 and sum(provider.batches) == 41
+    assert batcher.stats()["queueDepth"] == 0
+    batcher.stop()
+
+
+def test_batcher_propagates_errors_to_every_caller():
+    batcher = embedding_service.EmbeddingBatcher(_FakeProvider(fail=True), max_wait=0.01)
+    futures = [batcher.submit(["a"]), batcher.submit(["b", "c"]), batcher.submit(["d"] * 100)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model crashed"):
+            future.result(timeout=5)
+    assert batcher.stats()["errors"] >= 1
+    assert batcher.stats()["queueDepth"] == 0  # 실패한 큰 요청의 남은 조각은 버림
+    batcher.stop()
+
+
+def test_onnx_int8_matches_torch(tiny_model, tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnxscript")
+
+    assert embedding_service.read_st_pipeline(tiny_model) == {
+        "pooling": "mean", "normalize": True, "maxSeqLength": 48,
+    }
+    torch_provider = embedding_service.create_provider(EmbeddingConfig(tiny_model, "torch"))
+    onnx_provider = embedding_service.create_provider(
+        EmbeddingConfig(tiny_model, "onnx", threads=1, onnx_dir=str(tmp_path))
+    )
+    expected = torch_provider.encode(TEXTS)
+    got = onnx_provider.encode(TEXTS, batch_size=2)  # 길이순 배치 → 원래 순서 복원 확인
+
+    assert got.shape == expected.shape
+    cosine = (got * expected).sum(axis=1)
+    assert cosine.min() > 0.99
+    assert onnx_provider.encode([]).shape[0] == 0
+
+    # 변환 결과는 캐시되어 재사용
+    model_dir = embedding_service.onnx_model_dir(tiny_model, str(tmp_path))
+    assert (model_dir / "model.int8.onnx").exists()
+    assert embedding_service.export_onnx_model(tiny_model, str(tmp_path)) == model_dir
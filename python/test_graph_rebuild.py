@@ -0,0 +1,53 @@
+"""
+test_graph_rebuild.py — 예약 그래프 재계산 파라미터·centroid 동기화 테스트
+재계산 본체와 임베딩은 가짜로 바꾸고, app이 넘기는 인자와 호출 횟수만 확인한다.
+"""
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def app_module(app_module, monkeypatch):
+    monkeypatch.setattr(
+        app_module, "_graph_params",
+        {"top_n": app_module.TAG_EDGE_TOP_N, "k_per_node": app_module.TAG_EDGE_K, "min_docs": 1},
+    )
+    return app_module
+
+
+def test_scheduled_rebuilds_keep_last_explicit_parameters(app_module, monkeypatch):
+    app = app_module
+    calls = []
+    monkeypatch.setattr(app, "_safe_update_tag_centroids", lambda doc_ids: {"t"})
+    monkeypatch.setattr(app, "_safe_rebuild_semantic_graph_edges", lambda **kw: calls.append(kw) or {"ok": True})
+
+    app._scheduled_rebuild(["a"], ["save_doc"])
+    assert calls[-1]["top_n"] == app.TAG_EDGE_TOP_N and calls[-1]["changed_doc_ids"] == ["a"]
+
+    app._scheduled_rebuild([], ["rebuild_api"], engine="ai", top_n=5, k_per_node=3, min_docs=2)
+    assert calls[-1] == {"context": "rebuild_api", "engine": "ai", "top_n": 5, "k_per_node": 3, "min_docs": 2}
+
+    # 이후 문서 변경으로 예약된 증분 재계산도 같은 값
+    app._scheduled_rebuild(["b"], ["save_doc", "delete_doc"])
+    assert calls[-1] == {
+        "context": "save_doc,delete_doc", "changed_doc_ids": ["b"], "touched_tags": {"t"},
+        "top_n": 5, "k_per_node": 3, "min_docs": 2,
+    }
+
+
+def test_centroid_rebuild_syncs_centroids_once(app_module, monkeypatch):
+    app = app_module
+    synced = []
+    monkeypatch.setattr(app, "_collect_doc_tags", lambda: ({"a": ["x", "y"], "b": ["x"]}, ["x", "y"]))
+    monkeypatch.setattr(app, "_get_embed_model", lambda: object())
+    monkeypatch.setattr(app, "_sync_tag_centroids", lambda doc_tags: synced.append(doc_tags) or set())
+    monkeypatch.setattr(app.db_service, "get_graph_edge_model", lambda edge_type: None)
+    monkeypatch.setattr(
+        app.db_service, "load_tag_embedding_matrix",
+        lambda model, min_docs=1: (np.zeros((0, 2), dtype=np.float32), {}, np.zeros(0)),
+    )
+    monkeypatch.setattr(app.db_service, "replace_graph_edges", lambda rows, edge_type, model: None)
+
+    res = app._rebuild_semantic_graph_edges(engine="korean_centroid")
+    assert res["status"] == "ok" and res["mode"] == "full"
+    assert len(synced) == 1
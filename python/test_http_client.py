@@ -0,0 +1,99 @@
+"""
+test_http_client.py — 공용 HTTP 클라이언트 테스트
+keep-alive를 지원하는 로컬 HTTP/1.1 서버로 연결 재사용·호스트별 동시성 제한을 확인한다.
+"""
+import importlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def http_client(monkeypatch):
+    monkeypatch.setenv("MY_GRAPH_HTTP_PER_HOST", "2")
+    import http_client
+    importlib.reload(http_client)
+    yield http_client
+    http_client.close()
+
+
+@pytest.fixture
+def server():
+    state = {"active": 0, "max_active": 0, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with state["lock"]:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(0.05 if self.path == "/slow" else 0)
+            with state["lock"]:
+                state["active"] -= 1
+            if self.path == "/redirect":
+                self.send_response(302)
+                self.send_header("Location", "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = self.headers.get("User-Agent", "").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", state
+    srv.shutdown()
+
+
+def test_reuses_connections_and_follows_redirects(http_client, server):
+    base, _ = server
+    for _ in range(5):
+        r = http_client.get(base + "/", headers=http_client.BROWSER_HEADERS, timeout=5)
+        assert r.status_code == 200 and r.text.startswith("Mozilla/5.0")
+    assert http_client.get(base + "/redirect").status_code == 200
+
+    stats = http_client.stats()
+    assert stats["requests"] == 6
+    assert stats["sent"] == 7  # 리디렉션 단계 포함
+    assert stats["newConnections"] == 1
+    assert stats["reusedConnections"] == 6
+    assert stats["hosts"] == {"127.0.0.1": 6}
+
+    with http_client.stream("GET", base + "/") as response:
+        assert b"".join(response.iter_bytes()) == b"python-httpx/" + httpx.__version__.encode()
+    assert http_client.stats()["newConnections"] == 1
+
+
+def test_limits_concurrency_per_host(http_client, server):
+    base, state = server
+    threads = [threading.Thread(target=http_client.get, args=(base + "/slow",)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert state["max_active"] == 2
+    assert http_client.stats()["newConnections"] == 2
+
+
+def test_errors_are_counted(http_client):
+    with pytest.raises(httpx.ConnectError):
+        http_client.get("http://127.0.0.1:9/", timeout=1)
+    assert http_client.stats()["errors"] == 1
+
+
+def test_openai_client_uses_llm_timeout(http_client):
+    pytest.importorskip("openai")
+    client = http_client.openai_client("test-key")
+    assert client is http_client.openai_client("test-key")
+    assert client.timeout.read == http_client.LLM_TIMEOUT and client.timeout.connect == http_client.CONNECT_TIMEOUT
+    assert http_client.get_client().timeout.read == http_client.TIMEOUT
@@ -0,0 +1,51 @@
+"""
+test_lazy_resource.py — LazyResource 지연 로딩 단위 테스트
+"""
+import threading
+import time
+
+from lazy_resource import LazyResource
+
+
+def test_loads_once_across_threads():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    resource = LazyResource("model", loader)
+    assert resource.state == "idle"
+    assert resource.peek() is None
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resource.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+    assert resource.peek() is results[0]
+    status = resource.status()
+    assert status["state"] == "ready"
+    assert status["error"] is None
+    assert status["loadSeconds"] >= 0
+
+
+def test_failure_is_reported_and_not_retried():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        raise ImportError("no torch")
+
+    resource = LazyResource("embedding", loader)
+    assert resource.get() is None
+    assert resource.get() is None
+    assert len(calls) == 1
+    status = resource.status()
+    assert status["state"] == "error"
+    assert "no torch" in status["error"]
@@ -0,0 +1,66 @@
+"""
+test_rebuild_scheduler.py — RebuildScheduler 단위 테스트
+"""
+import threading
+import time
+
+from rebuild_scheduler import RebuildScheduler
+
+
+class _Recorder:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, doc_ids, contexts, **options):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.calls.append((doc_ids, contexts, options))
+        return {"ok": True, "status": "ok"}
+
+
+def test_burst_is_coalesced_into_one_rebuild():
+    rec = _Recorder()
+    sched = RebuildScheduler(rec, quiet_period=0.05)
+    tickets = [sched.request("save_doc", [f"d{i % 3}"])["ticket"] for i in range(10)]
+    assert sched.wait(tickets[-1], timeout=2.0)
+    assert len(rec.calls) == 1
+    doc_ids, contexts, _ = rec.calls[0]
+    assert doc_ids == ["d0", "d1", "d2"]
+    assert contexts == ["save_doc"]
+    assert sched.status()["graphVersion"] == 1
+    assert not sched.status()["dirty"]
+    sched.stop()
+
+
+def test_request_returns_immediately_with_ticket():
+    rec = _Recorder(delay=0.2)
+    sched = RebuildScheduler(rec, quiet_period=0.01)
+    t0 = time.monotonic()
+    res = sched.request("set_tags", ["a"])
+    assert time.monotonic() - t0 < 0.1
+    assert res["status"] == "scheduled"
+    assert res["ticket"] == 1
+    assert sched.flush(timeout=2.0)
+    sched.stop()
+
+
+def test_rebuilds_never_overlap():
+    rec = _Recorder(delay=0.05)
+    sched = RebuildScheduler(rec, quiet_period=0.01)
+    sched.request("save_doc", ["a"])
+    time.sleep(0.02)
+    result = sched.run_now(context="rebuild_api", engine="auto")
+    sched.request("save_doc", ["b"])
+    assert sched.flush(timeout=2.0)
+    assert rec.max_active == 1
+    assert result["ok"] is True
+    assert any(opts.get("engine") == "auto" for _, _, opts in rec.calls)
+    sched.stop()
@@ -0,0 +1,81 @@
+"""
+test_semantic_service.py — semantic_service 단위 테스트
+벡터화 엔진 결과를 기존 이중 루프 방식과 비교.
+"""
+import numpy as np
+
+import semantic_service
+
+
+def _centroids(n=12, dim=6, seed=1):
+    rng = np.random.default_rng(seed)
+    return {f"t{i:02d}": rng.standard_normal(dim).astype(np.float32) for i in range(n)}
+
+
+def _naive(centroids):
+    tags = list(centroids)
+    sims = {}
+    for i, a in enumerate(tags):
+        for b in tags[i + 1:]:
+            va, vb = centroids[a], centroids[b]
+            sims[(a, b)] = float(np.dot(va, vb) / (np.linalg.norm(va) * np.linalg.norm(vb)))
+    return sims
+
+
+def test_pair_sims_match_naive():
+    c = _centroids()
+    expected = _naive(c)
+    pairs = {("t03", "t01"), ("t00", "t11"), ("t05", "missing")}
+    sims = semantic_service.centroid_pair_sims(c, pairs)
+    assert set(sims) == {("t01", "t03"), ("t00", "t11")}
+    for key, val in sims.items():
+        assert abs(val - expected[key]) < 1e-5
+
+
+def test_topk_sims_keep_best_neighbors():
+    c = _centroids()
+    expected = _naive(c)
+    sims = semantic_service.centroid_topk_sims(c, top_k=3, block=5)
+    for tag in c:
+        neighbors = sorted(
+            ((v, k) for k, v in expected.items() if tag in k), reverse=True
+        )[:3]
+        for _, key in neighbors:
+            assert key in sims
+            assert abs(sims[key] - expected[key]) < 1e-5
+
+
+def test_zero_vector_has_zero_similarity():
+    c = {"a": np.zeros(3, dtype=np.float32), "b": np.ones(3, dtype=np.float32)}
+    assert semantic_service.centroid_pair_sims(c, {("a", "b")}) == {("a", "b"): 0.0}
+
+
+def test_cotagged_pairs_match_pairwise_scan():
+    doc_tags = {
+        "d1": ["ai", "python"],
+        "d2": ["python"],
+        "d3": ["travel"],
+        "d4": ["ai", "travel", "python"],
+    }
+    expected = []
+    ids = sorted(doc_tags)
+    for i, a in enumerate(ids):
+        for b in ids[i + 1:]:
+            shared = set(doc_tags[a]) & set(doc_tags[b])
+            if shared:
+                expected.append((a, b, shared))
+    assert list(semantic_service.iter_cotagged_pairs(doc_tags)) == expected
+    assert semantic_service.build_tag_postings(doc_tags)["ai"] == ["d1", "d4"]
+
+
+def test_reciprocal_rank_fusion():
+    fused = semantic_service.reciprocal_rank_fusion(
+        {"lexical": ["a", "b", "c"], "vector": ["c", "a", "d"]}, k=60
+    )
+    ids = [doc_id for doc_id, _, _ in fused]
+    assert ids == ["a", "c", "b", "d"]
+    score_a = dict((d, s) for d, s, _ in fused)["a"]
+    assert abs(score_a - (1 / 61 + 1 / 62)) < 1e-12
+    assert fused[0][2] == {"lexical": 1, "vector": 2}
+    assert fused[-1][2] == {"vector": 3}
+    assert semantic_service.reciprocal_rank_fusion({"lexical": [], "vector": []}) == []
@@ -0,0 +1,155 @@
+"""
+test_url_import.py — /api/url/import 일괄 가져오기 테스트
+URL 수집(url_ingest.load)과 AI 분석(_analyze_url)을 가짜로 바꿔 NDJSON 이벤트 순서·중복 제거·
+호스트별 동시성·오류 보고·재계산 요청 1회를 확인한다. 임시 데이터 디렉토리를 사용한다.
+"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def app_module(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "AI_AVAILABLE", True)
+    return app_module
+
+
+@pytest.fixture
+def stubs(app_module, monkeypatch):
+    state = {"active": {}, "max_active": {}, "loads": [], "rebuilds": [], "lock": threading.Lock()}
+
+    def fake_load(u, **kwargs):
+        host = u.split("/")[2]
+        with state["lock"]:
+            state["loads"].append(u)
+            state["active"][host] = state["active"].get(host, 0) + 1
+            state["max_active"][host] = max(state["max_active"].get(host, 0), state["active"][host])
+        time.sleep(0.03)
+        with state["lock"]:
+            state["active"][host] -= 1
+        return {}, "fetched"
+
+    def fake_analyze(u, folder=None):
+        if "broken" in u:
+            raise HTTPException(status_code=502, detail="가져오기 실패")
+        if "crash" in u:
+            raise RuntimeError("분석 오류")
+        return {
+            "url": u, "title": "제목 " + u.rsplit("/", 1)[-1], "summary": "요약",
+            "tags": ["태그", "태그", "웹"], "folder": folder, "cached": False,
+        }
+
+    def fake_request(reason, doc_ids):
+        state["rebuilds"].append((reason, list(doc_ids)))
+        return {"status": "scheduled"}
+
+    monkeypatch.setattr(app_module.url_ingest, "load", fake_load)
+    monkeypatch.setattr(app_module, "_analyze_url", fake_analyze)
+    monkeypatch.setattr(app_module.rebuild_scheduler, "request", fake_request)
+    return state
+
+
+def _events(app_module, body: dict) -> list[dict]:
+    res = TestClient(app_module.app).post("/api/url/import", json=body)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    assert res.text.endswith("\n")
+    return [json.loads(line) for line in res.text.splitlines()]
+
+
+def test_import_streams_events_and_requests_one_rebuild(app_module, stubs):
+    urls = [f"https://a.example/{i}" for i in range(6)] + [
+        "https://a.example/0?utm_source=mail",  # 정규화하면 0번과 같은 URL
+        "ftp://a.example/file",
+        "https://b.example/broken",
+        "https://b.example/crash",
+        "https://b.example/ok",
+    ]
+    events = _events(app_module, {"urls": urls, "folder": "스크랩", "concurrency": 8})
+
+    assert events[0] == {"type": "start", "total": len(urls)}
+    assert events[-1]["type"] == "done"
+    by_type: dict[str, list[dict]] = {}
+    for event in events[1:-1]:
+        by_type.setdefault(event["type"], []).append(event)
+
+    assert [e["index"] for e in by_type["skipped"]] == [6]
+    errors = {e["index"]: e for e in by_type["error"]}
+    assert errors[7]["status"] == 400
+    assert errors[8]["status"] == 502 and errors[8]["error"] == "가져오기 실패"
+    assert errors[9]["status"] == 500 and errors[9]["error"] == "분석 오류"
+    assert sorted(e["index"] for e in by_type["analyzed"]) == [0, 1, 2, 3, 4, 5, 10]
+
+    # 저장은 분석이 모두 끝난 뒤 원래 순서대로
+    saved = by_type["saved"]
+    assert [e["index"] for e in saved] == [0, 1, 2, 3, 4, 5, 10]
+    first_saved = events.index(saved[0])
+    assert all(events.index(e) < first_saved for e in by_type["analyzed"])
+
+    assert events[-1] == {"type": "done", "created": 7, "failed": 3, "rebuild": {"status": "scheduled"}}
+    assert stubs["rebuilds"] == [("url_import", [e["id"] for e in saved])]
+
+    # 같은 호스트는 URL_IMPORT_PER_HOST개까지만 동시에 수집, 중복·잘못된 URL은 수집하지 않음
+    assert stubs["max_active"]["a.example"] <= app_module.URL_IMPORT_PER_HOST
+    assert len(stubs["loads"]) == 9
+
+    doc = app_module.get_doc(saved[0]["id"])
+    assert doc["title"] == "제목 0" and "https://a.example/0" in doc["content"]
+    assert app_module.get_tags_for_doc(saved[0]["id"]) == ["태그", "웹"]
+
+
+def test_import_into_new_folder_creates_it(app_module, stubs):
+    client = TestClient(app_module.app)
+    assert client.get("/api/folders").json() == []
+    events = _events(app_module, {"urls": ["https://a.example/1", "https://a.example/2"], "folder": "새 폴더"})
+    saved = [e for e in events if e["type"] == "saved"]
+    assert len(saved) == 2
+    assert client.get("/api/folders").json() == ["새 폴더"]
+    assert {d["id"] for d in app_module.list_docs(folder="새 폴더")} == {e["id"] for e in saved}
+
+
+def test_folder_classification_only_proposes(app_module, monkeypatch):
+    class _Completions:
+        def create(self, **kwargs):
+            message = SimpleNamespace(content='{"folder": "여행"}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    entry = {
+        "meta": {"title": "원제목"}, "text": "본문 " * 20,
+        "analysis": {"title": "제목", "summary": "요약", "tags": ["여행"]}, "analysisModel": app_module.AI_TAG_MODEL,
+    }
+    monkeypatch.setattr(app_module.url_ingest, "load", lambda u, **kwargs: (entry, "cached"))
+    monkeypatch.setattr(
+        app_module.http_client, "openai_client", lambda key: SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    )
+
+    # 분석(가져오기 풀 스레드)은 폴더를 만들지 않음
+    result = app_module._analyze_url("https://a.example/1")
+    assert (result["folder"], result["folderCreated"]) == ("여행", True)
+    assert app_module.list_folders() == []
+
+    # 단건 분석 API는 제안된 새 폴더를 만든다
+    res = TestClient(app_module.app).post("/api/url/analyze", json={"url": "https://a.example/1"})
+    assert res.status_code == 200 and res.json()["folder"] == "여행"
+    assert app_module.list_folders() == ["여행"]
+
+
+def test_import_without_saved_docs_skips_rebuild(app_module, stubs):
+    events = _events(app_module, {"urls": ["https://b.example/broken", "not a url"]})
+    assert [e["type"] for e in events] == ["start", "error", "error", "done"]
+    assert events[-1] == {"type": "done", "created": 0, "failed": 2, "rebuild": None}
+    assert stubs["rebuilds"] == []
+
+
+def test_import_rejects_empty_or_oversized_lists(app_module, stubs, monkeypatch):
+    client = TestClient(app_module.app)
+    assert client.post("/api/url/import", json={"urls": [" ", ""]}).status_code == 400
+    monkeypatch.setattr(app_module, "URL_IMPORT_MAX", 2)
+    assert client.post("/api/url/import", json={"urls": ["https://a.example/1"] * 3}).status_code == 400
+    monkeypatch.setattr(app_module, "AI_AVAILABLE", False)
+    assert client.post("/api/url/import", json={"urls": ["https://a.example/1"]}).status_code == 503
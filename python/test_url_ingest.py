@@ -0,0 +1,194 @@
+"""
+test_url_ingest.py — URL 스트리밍 수집 테스트
+로컬 HTTP 서버가 청크 단위로 HTML을 내려보내고, 한 번의 요청으로 메타 + 본문이 추출되는지 확인한다.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import url_ingest
+
+PAGE = """<!doctype html><html><head>
+<meta charset="euc-kr">
+<title>기본 제목</title>
+<meta property="og:title" content="그래프 &amp; 태그">
+<meta name="twitter:description" content="트위터 설명">
+<meta property="og:image" content="/img/cover.png">
+<style>body { color: red; }</style>
+<script>var hidden = "<p>보이지 않음</p>";</script>
+</head><body>
+<h1>본문   제목</h1><p>첫 번째 <b>문단</b>입니다.</p>
+<noscript>스크립트 없음</noscript>
+<p>두 번째 문단</p>
+</body></html>"""
+
+
+@pytest.fixture
+def server():
+    state = {"requests": 0, "sent": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            state["requests"] += 1
+            if self.path.startswith("/cached"):
+                self._cached()
+                return
+            if self.path == "/missing":
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.path == "/huge":
+                body = (b"<html><body>" + "가나다라 ".encode("utf-8") * 400_000)
+                ctype = "text/html; charset=utf-8"
+            else:
+                body = PAGE.encode("euc-kr")
+                ctype = "text/html"  # charset은 <meta>에서 찾아야 함
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                # 7바이트씩 — 멀티바이트 문자·태그·단어가 청크 경계에서 잘린다
+                step = 7 if self.path != "/huge" else 64 * 1024
+                for i in range(0, len(body), step):
+                    part = body[i : i + step]
+                    self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+                    state["sent"] += len(part)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _cached(self):
+            # ETag 재검증을 지원하는 페이지 — state["version"]이 바뀌면 내용도 바뀐다
+            if state.get("down"):
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = f'"v{state.get("version", 1)}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = (
+                f'<html><head><meta property="og:title" content="버전 {state.get("version", 1)}"></head>'
+                f"<body><p>캐시 테스트 본문입니다. 버전 {state.get('version', 1)}</p></body></html>"
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", state
+    srv.shutdown()
+
+
+def test_single_fetch_extracts_meta_and_visible_text(server):
+    base, state = server
+    page = url_ingest.fetch_page(base + "/article")
+    assert state["requests"] == 1
+    assert page.meta == {
+        "title": "그래프 & 태그",
+        "description": "트위터 설명",
+        "image": base + "/img/cover.png",
+        "url": base + "/article",
+    }
+    assert page.text == "기본 제목 본문 제목 첫 번째 문단 입니다. 두 번째 문단"
+    assert not page.truncated
+
+    meta_only = url_ingest.fetch_page(base + "/article", meta_only=True)
+    assert meta_only.meta == page.meta
+
+
+def test_stops_at_byte_and_text_limits(server):
+    base, state = server
+    page = url_ingest.fetch_page(base + "/huge", max_bytes=100_000)
+    assert page.truncated and page.bytes_read == 100_000
+    assert page.text.startswith("가나다라 가나다라") and page.meta["title"] == base + "/huge"
+
+    page = url_ingest.fetch_page(base + "/huge", max_text_chars=50)
+    assert page.truncated and len(page.text) == 50
+    assert page.bytes_read < 200_000
+
+    with pytest.raises(httpx.HTTPStatusError):
+        url_ingest.fetch_page(base + "/missing")
+
+
+@pytest.fixture
+def url_cache(tmp_path, monkeypatch):
+    import db_service
+    monkeypatch.setattr(db_service, "DB_PATH", str(tmp_path / "metadata.db"))
+    for field in url_ingest._counters:
+        monkeypatch.setitem(url_ingest._counters, field, 0)
+    return db_service
+
+
+def test_normalize_url():
+    assert url_ingest.normalize_url("HTTPS://Example.COM:443/a?utm_source=x&b=1&fbclid=z#frag") == "https://example.com/a?b=1"
+    assert url_ingest.normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+def test_cache_ttl_revalidation_and_analysis_reuse(server, url_cache, monkeypatch):
+    base, state = server
+    url = base + "/cached?utm_medium=mail"
+    entry, source = url_ingest.load(url)
+    assert source == "fetched" and entry["meta"]["title"] == "버전 1" and entry["text"] is None
+    assert url_ingest.load(base + "/cached#top")[1] == "cache"
+    assert state["requests"] == 1
+
+    # 메타만 캐시된 상태에서 본문이 필요하면 다시 받음 → 분석 결과 저장
+    entry, source = url_ingest.load(url, need_text=True)
+    assert source == "fetched" and "캐시 테스트 본문" in entry["text"]
+    url_ingest.save_analysis(url, {"title": "요약"}, "gpt")
+
+    # 만료 → ETag 조건부 요청 304 → 분석 결과 유지
+    clock = [time.time() + url_ingest.CACHE_TTL + 1]
+    monkeypatch.setattr(url_ingest, "_clock", lambda: clock[0])
+    monkeypatch.setattr(url_ingest, "CACHE_TTL", 0)
+    entry, source = url_ingest.load(url, need_text=True)
+    assert source == "revalidated" and entry["analysis"] == {"title": "요약"} and state["requests"] == 3
+
+    # 내용이 바뀌면 분석 결과 폐기 (메타 요청이라도 본문까지 갱신)
+    state["version"] = 2
+    entry, source = url_ingest.load(url)
+    assert source == "fetched" and entry["meta"]["title"] == "버전 2"
+    assert "버전 2" in entry["text"] and entry["analysis"] is None
+
+    # 재검증 실패(오프라인/5xx) → 이전 결과 그대로
+    state["down"] = True
+    entry, source = url_ingest.load(url)
+    assert source == "stale" and entry["meta"]["title"] == "버전 2"
+
+    stats = url_ingest.cache_stats()
+    assert stats["entries"] == 1 and stats["hits"] == 1 and stats["revalidated"] == 1 and stats["stale"] == 1
+
+
+def test_failures_are_cached_and_cache_is_bounded(server, url_cache, monkeypatch):
+    base, state = server
+    with pytest.raises(url_ingest.UrlFetchError) as first:
+        url_ingest.load(base + "/missing")
+    assert first.value.status == 404 and not first.value.cached
+    with pytest.raises(url_ingest.UrlFetchError) as second:
+        url_ingest.load(base + "/missing")
+    assert second.value.cached and state["requests"] == 1
+
+    monkeypatch.setattr(url_cache, "URL_CACHE_MAX", 2)
+    url_ingest.load(base + "/cached?a=1")
+    url_ingest.load(base + "/cached?a=2")
+    stats = url_ingest.cache_stats()
+    assert stats["entries"] == 2 and stats["negativeEntries"] == 0  # 가장 오래 안 쓰인 실패 항목이 밀려남
+    assert stats["negativeHits"] == 1
@@ -0,0 +1,123 @@
+"""
+test_vector_index.py — VectorIndex 단위 테스트 (인메모리 Chroma + 가짜 encoder)
+"""
+import uuid
+
+import chromadb
+import pytest
+
+from vector_index import HASH_KEY, VectorIndex, content_hash
+
+
+class _Encoder:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+
+@pytest.fixture
+def coll():
+    client = chromadb.EphemeralClient()
+    return client.get_or_create_collection(f"test_{uuid.uuid4().hex[:8]}")
+
+
+def test_write_behind_coalesces_and_skips_unchanged(coll):
+    enc = _Encoder()
+    index = VectorIndex(lambda: coll, enc, flush_interval=0.05)
+    index.upsert("a", "첫 버전", {"title": "A"})
+    index.upsert("a", "두 번째 버전", {"title": "A"})
+    index.upsert("b", "문서 B", {"title": "B"})
+    assert index.flush(timeout=5)
+    assert enc.calls == [["두 번째 버전", "문서 B"]]  # 최신 내용만, 한 번의 batch encode
+
+    got = coll.get(ids=["a"], include=["documents", "metadatas"])
+    assert got["documents"] == ["두 번째 버전"]
+    assert got["metadatas"][0][HASH_KEY] == content_hash("두 번째 버전")
+
+    # 같은 내용 재저장은 encode 생략, 제목만 바뀌면 메타데이터만 갱신
+    index.upsert("a", "두 번째 버전", {"title": "A2"})
+    index.upsert("b", "문서 B", {"title": "B"})
+    assert index.flush(timeout=5)
+    assert len(enc.calls) == 1
+    assert coll.get(ids=["a"], include=["metadatas"])["metadatas"][0]["title"] == "A2"
+
+    # 빈 본문 저장/삭제는 벡터 제거
+    index.upsert("a", "   ", {"title": "A2"})
+    index.delete(["b"])
+    assert index.flush(timeout=5)
+    assert coll.count() == 0
+    index.stop()
+
+
+def test_reindex_skips_unchanged_and_removes_stale(coll):
+    enc = _Encoder()
+    index = VectorIndex(lambda: coll, enc, reindex_batch=2)
+    index.reindex([("a", "A 본문", {"title": "A"}), ("b", "B 본문", {"title": "B"}), ("c", "C 본문", {"title": "C"})])
+    assert coll.count() == 3
+    enc.calls.clear()
+
+    # b 수정, c 삭제(휴지통), d 추가, e 빈 문서
+    job = index.start_reindex(lambda: iter([
+        ("a", "A 본문", {"title": "A"}),
+        ("b", "B 수정", {"title": "B"}),
+        ("d", "D 본문", {"title": "D"}),
+        ("e", "", {"title": "E"}),
+    ]))
+    assert job["status"] == "running"
+    assert index.wait_reindex(timeout=5)
+    result = index.status()["reindex"]
+    assert result["status"] == "done"
+    assert (result["processed"], result["upserted"], result["skipped"], result["deleted"]) == (3, 2, 1, 1)
+    assert sorted(t for call in enc.calls for t in call) == ["B 수정", "D 본문"]
+    assert sorted(coll.get(include=[])["ids"]) == ["a", "b", "d"]
+
+
+def test_reindex_keeps_docs_upserted_mid_job(coll):
+    index = VectorIndex(lambda: coll, _Encoder(), flush_interval=0.01, reindex_batch=1)
+    index.upsert("old", "지울 문서", {"title": "OLD"})
+    assert index.flush(timeout=5)
+
+    def docs():
+        yield ("a", "A 본문", {"title": "A"})
+        # 스냅샷 이후 새로 저장된 문서 — 워커가 재색인 도중 반영
+        index.upsert("new", "새 문서", {"title": "NEW"})
+        assert index.flush(timeout=5)
+        yield ("b", "B 본문", {"title": "B"})
+
+    result = index.reindex(docs())
+    assert result["deleted"] == 1
+    assert sorted(coll.get(include=[])["ids"]) == ["a", "b", "new"]
+    index.stop()
+
+
+def test_chunked_documents_reencode_only_changed_chunks(coll):
+    enc = _Encoder()
+    # 테스트용 청크: 문단(|) 단위
+    index = VectorIndex(lambda: coll, enc, flush_interval=0.01, chunk_fn=lambda t: t.split("|"))
+    index.upsert("a", "첫 문단|둘째 문단|셋째 문단", {"title": "A"})
+    assert index.flush(timeout=5)
+    assert sorted(coll.get(include=[])["ids"]) == ["a", "a#1", "a#2"]
+    meta = coll.get(ids=["a#2"], include=["metadatas"])["metadatas"][0]
+    assert (meta["docId"], meta["chunk"]) == ("a", 2)
+
+    # 끝 문단만 수정 + 문단 하나 줄어듦 → 바뀐 청크만 encode, 남는 청크 삭제
+    enc.calls.clear()
+    index.upsert("a", "첫 문단|둘째 문단 수정", {"title": "A"})
+    assert index.flush(timeout=5)
+    assert enc.calls == [["둘째 문단 수정"]]
+    assert sorted(coll.get(include=[])["ids"]) == ["a", "a#1"]
+    assert index.status()["chunksEncoded"] == 4
+
+    # 문서 삭제는 모든 청크 제거
+    index.delete(["a"])
+    assert index.flush(timeout=5)
+    assert coll.count() == 0
+
+    # 재색인: 청크 id 기준으로 live 판단, 구 청크 제거
+    index.reindex([("b", "x|y|z", {"title": "B"})])
+    index.reindex([("b", "x|y", {"title": "B"})])
+    assert sorted(coll.get(include=[])["ids"]) == ["b", "b#1"]
+    index.stop()
@@ -0,0 +1,360 @@
+"""
+url_ingest.py — URL 한 번 받아서 메타 정보 + 본문 텍스트 추출
+응답 본문을 스트리밍으로 읽으며(바이트 상한) HTMLParser에 바로 넘겨,
+한 번의 파싱으로 Open Graph / Twitter Card 메타와 화면에 보이는 텍스트를 함께 만든다.
+전체 HTML을 메모리에 올리거나 문서 전체에 정규식을 여러 번 돌리지 않는다.
+
+load()는 결과를 정규화 URL 단위로 SQLite에 캐시한다 (TTL, ETag/Last-Modified 재검증, 실패 캐시).
+만료 후 재검증이 실패하면(오프라인 등) 마지막으로 받은 결과를 그대로 돌려준다.
+
+환경 변수:
+  MY_GRAPH_URL_MAX_BYTES       한 페이지에서 읽을 최대 바이트 (5MB)
+  MY_GRAPH_URL_MAX_TEXT        추출할 본문 텍스트 최대 글자 수 (200000)
+  MY_GRAPH_URL_CACHE_TTL       성공 결과 유효 시간(초, 86400)
+  MY_GRAPH_URL_CACHE_NEG_TTL   실패 결과 유효 시간(초, 300)
+"""
+import codecs
+import hashlib
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import httpx
+
+import db_service
+import http_client
+
+MAX_BYTES = int(os.environ.get("MY_GRAPH_URL_MAX_BYTES", str(5 * 1024 * 1024)))
+MAX_TEXT_CHARS = int(os.environ.get("MY_GRAPH_URL_MAX_TEXT", "200000"))
+CACHE_TTL = float(os.environ.get("MY_GRAPH_URL_CACHE_TTL", "86400"))
+NEGATIVE_TTL = float(os.environ.get("MY_GRAPH_URL_CACHE_NEG_TTL", "300"))
+
+# 텍스트로 취급하지 않는 요소 (내부 데이터는 버림)
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+_META_PROPS = {"title", "description", "image"}
+_SNIFF_BYTES = 2048  # <meta charset> 탐색 범위
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+
+class _PageParser(HTMLParser):
+    def __init__(self, max_text_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_text_chars = max_text_chars
+        self.meta: dict[str, str] = {}
+        self.title_parts: list[str] = []
+        self.text_parts: list[str] = []
+        self.text_chars = 0
+        self.body_started = False
+        self._skip_depth = 0
+        self._in_title = False
+        # 태그 사이 텍스트 조각 — feed 경계에서 단어가 잘려도 태그를 만날 때 한 번에 정리
+        self._run: list[str] = []
+        self._run_chars = 0
+
+    @property
+    def text_full(self) -> bool:
+        return self.text_chars + self._run_chars >= self.max_text_chars
+
+    def flush_text(self):
+        if not self._run:
+            return
+        piece = " ".join("".join(self._run).split())
+        self._run.clear()
+        self._run_chars = 0
+        if not piece:
+            return
+        if self._in_title:
+            self.title_parts.append(piece)
+        if self.text_chars < self.max_text_chars:
+            self.text_parts.append(piece)
+            self.text_chars += len(piece) + 1
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "body":
+            self.body_started = True
+        elif tag == "meta":
+            self._handle_meta(dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush_text()
+        if tag == "meta":
+            self._handle_meta(dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.flush_text()
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.body_started = True
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._run.append(data)
+        self._run_chars += len(data)
+
+    def _handle_meta(self, attrs: dict):
+        # og:title / twitter:title 등 — 먼저 나온 값 우선
+        key = (attrs.get("property") or attrs.get("name") or "").strip().lower()
+        content = (attrs.get("content") or "").strip()
+        if not content or ":" not in key:
+            return
+        prefix, prop = key.split(":", 1)
+        if prefix in ("og", "twitter") and prop in _META_PROPS:
+            self.meta.setdefault(prop, content)
+
+
+class Page:
+    """fetch_page 결과 — 메타 정보와 본문 텍스트. not_modified면(304) meta/text는 비어 있다."""
+
+    def __init__(
+        self, url: str, final_url: str, meta: dict, text: str, bytes_read: int, truncated: bool,
+        etag: Optional[str] = None, last_modified: Optional[str] = None, not_modified: bool = False,
+    ):
+        self.url = url
+        self.final_url = final_url
+        self.meta = meta
+        self.text = text
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+
+
+def _encoding(response, first_chunk: bytes) -> str:
+    # Content-Type charset → <meta charset> → utf-8
+    candidates = [response.charset_encoding]
+    m = _META_CHARSET.search(first_chunk[:_SNIFF_BYTES])
+    if m:
+        candidates.append(m.group(1).decode("ascii", "ignore"))
+    for name in candidates:
+        if not name:
+            continue
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def fetch_page(
+    url: str,
+    timeout: float = 20,
+    max_bytes: Optional[int] = None,
+    max_text_chars: Optional[int] = None,
+    meta_only: bool = False,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Page:
+    """
+    URL을 한 번만 받아 메타 정보 + 본문 텍스트를 추출.
+    max_bytes를 넘거나, 텍스트가 max_text_chars만큼 모이거나, meta_only일 때 <body>가 시작되면 읽기를 멈춘다.
+    etag/last_modified를 주면 조건부 요청 — 304면 not_modified=True인 빈 Page를 반환.
+    HTTP 오류는 httpx.HTTPStatusError로 올라간다.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    parser = _PageParser(MAX_TEXT_CHARS if max_text_chars is None else max_text_chars)
+    bytes_read = 0
+    truncated = False
+    headers = dict(http_client.BROWSER_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with http_client.stream("GET", url, headers=headers, timeout=timeout) as response:
+        validators = {"etag": response.headers.get("etag"), "last_modified": response.headers.get("last-modified")}
+        if response.status_code == 304:
+            return Page(url, str(response.url), {}, "", 0, False, not_modified=True, **validators)
+        response.raise_for_status()
+        final_url = str(response.url)
+        plain = response.headers.get("content-type", "").lower().startswith("text/plain")
+        decoder = None
+        head = b""  # 인코딩 판별 전까지 모아 두는 앞부분
+
+        def _feed(data: bytes, final: bool = False):
+            text = decoder.decode(data, final=final)
+            if plain:
+                parser.handle_data(text)
+            else:
+                parser.feed(text)
+
+        stopped = False
+        for chunk in response.iter_bytes():
+            if bytes_read + len(chunk) > max_bytes:
+                chunk = chunk[: max_bytes - bytes_read]
+                truncated = True
+            bytes_read += len(chunk)
+            if decoder is None:
+                head += chunk
+                if len(head) < _SNIFF_BYTES and not truncated:
+                    continue
+                decoder = codecs.getincrementaldecoder(_encoding(response, head))(errors="replace")
+                chunk, head = head, b""
+            _feed(chunk)
+            if truncated or parser.text_full or (meta_only and parser.body_started):
+                truncated = truncated or parser.text_full
+                stopped = True
+                break
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(_encoding(response, head))(errors="replace")
+            _feed(head)
+        if not stopped:
+            _feed(b"", final=True)
+    if not plain and not truncated:
+        parser.close()
+    parser.flush_text()
+
+    title = parser.meta.get("title") or " ".join(parser.title_parts) or url
+    image = parser.meta.get("image", "")
+    if image:
+        image = urljoin(final_url, image)
+    meta = {"title": title, "description": parser.meta.get("description", ""), "image": image, "url": url}
+    text = " ".join(parser.text_parts)[: parser.max_text_chars]
+    return Page(url, final_url, meta, text, bytes_read, truncated, **validators)
+
+
+# ─── 캐시 ─────────────────────────────────────────
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "igshid"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_counters = {"hits": 0, "revalidated": 0, "misses": 0, "stale": 0, "negativeHits": 0, "failures": 0}
+_counter_lock = threading.Lock()
+_clock = time.time  # 테스트에서 교체
+
+
+class UrlFetchError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None, cached: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.cached = cached
+
+
+def _count(field: str):
+    with _counter_lock:
+        _counters[field] += 1
+
+
+def normalize_url(url: str) -> str:
+    """캐시 키 — scheme/host 소문자, 기본 포트·fragment·추적 파라미터(utm_* 등) 제거."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host if parts.port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{parts.port}"
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ])
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def _text_hash(text: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest() if text is not None else None
+
+
+def load(url: str, need_text: bool = False, timeout: float = 20, max_text_chars: Optional[int] = None) -> tuple[dict, str]:
+    """
+    캐시를 거쳐 URL 메타(+본문) 조회. 반환: (entry, source)
+    entry: {"meta", "text", "analysis", "analysisModel", ...} — text는 본문을 받은 적 없으면 None
+    source: "cache" | "revalidated"(304) | "fetched" | "stale"(재검증 실패, 이전 결과)
+    실패(캐시된 실패 포함)는 UrlFetchError.
+    """
+    key = normalize_url(url)
+    now = _clock()
+    entry = db_service.get_url_cache(key, now)
+    has_text = entry is not None and entry.get("text") is not None
+    if entry is not None and now < entry["expiresAt"]:
+        if entry.get("error"):
+            _count("negativeHits")
+            raise UrlFetchError(entry["error"], entry.get("status"), cached=True)
+        if has_text or not need_text:
+            _count("hits")
+            return entry, "cache"
+    usable = entry is not None and entry.get("meta") is not None and (has_text or not need_text)
+
+    # 본문을 가진 항목은 메타만 요청받아도 본문까지 갱신해 분석 결과와 어긋나지 않게 한다
+    full = need_text or has_text
+    try:
+        page = fetch_page(
+            url, timeout=timeout, max_text_chars=max_text_chars, meta_only=not full,
+            etag=entry.get("etag") if usable else None,
+            last_modified=entry.get("lastModified") if usable else None,
+        )
+    except httpx.HTTPError as e:
+        status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+        if usable:
+            _count("stale")
+            return entry, "stale"
+        _count("failures")
+        db_service.save_url_cache(key, {
+            "error": f"{type(e).__name__}: {e}", "status": status,
+            "fetchedAt": now, "expiresAt": now + NEGATIVE_TTL,
+        }, now)
+        raise UrlFetchError(str(e), status) from e
+
+    if page.not_modified and usable:
+        _count("revalidated")
+        entry.update(
+            etag=page.etag or entry.get("etag"),
+            lastModified=page.last_modified or entry.get("lastModified"),
+            fetchedAt=now, expiresAt=now + CACHE_TTL,
+        )
+        db_service.save_url_cache(key, entry, now)
+        return entry, "revalidated"
+
+    _count("misses")
+    text = page.text if full else None
+    text_hash = _text_hash(text)
+    # 본문이 그대로면 AI 분석 결과 유지
+    keep_analysis = entry is not None and text_hash is not None and entry.get("textHash") == text_hash
+    entry = {
+        "meta": page.meta,
+        "text": text,
+        "textHash": text_hash,
+        "analysis": entry.get("analysis") if keep_analysis else None,
+        "analysisModel": entry.get("analysisModel") if keep_analysis else None,
+        "etag": page.etag,
+        "lastModified": page.last_modified,
+        "error": None,
+        "status": 200,
+        "fetchedAt": now,
+        "expiresAt": now + CACHE_TTL,
+    }
+    db_service.save_url_cache(key, entry, now)
+    return entry, "fetched"
+
+
+def save_analysis(url: str, analysis: dict, model: str):
+    """load()로 받은 본문에 대한 AI 분석 결과를 같은 캐시 항목에 저장."""
+    key = normalize_url(url)
+    now = _clock()
+    entry = db_service.get_url_cache(key, now)
+    if entry is None or entry.get("text") is None:
+        return
+    entry["analysis"] = analysis
+    entry["analysisModel"] = model
+    db_service.save_url_cache(key, entry, now)
+
+
+def cache_stats() -> dict:
+    with _counter_lock:
+        counters = dict(_counters)
+    lookups = sum(counters.values())
+    served = counters["hits"] + counters["revalidated"] + counters["stale"] + counters["negativeHits"]
+    return {
+        **db_service.url_cache_counts(),
+        **counters,
+        "hitRate": round(served / lookups, 4) if lookups else None,
+        "ttlSeconds": CACHE_TTL,
+        "negativeTtlSeconds": NEGATIVE_TTL,
+    }
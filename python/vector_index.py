@@ -0,0 +1,352 @@
+"""
+vector_index.py — Chroma 문서 벡터 색인 관리
+저장 요청은 대기열에 올리고 즉시 반환(write-behind), 백그라운드 스레드가 모아서
+한 번의 batch encode + collection.upsert로 반영한다. 내용 해시가 같으면 encode를 건너뛴다.
+전체 재색인 작업은 문서를 큰 배치로 흘려 보내며 삭제/휴지통 문서의 벡터를 제거한다.
+chunk_fn이 있으면 긴 문서를 청크로 나눠 청크마다 벡터를 두고(첫 청크 id = 문서 id,
+이후 "<id>#<n>"), 청크 단위 해시로 바뀐 청크만 다시 encode한다.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+
+HASH_KEY = "contentHash"  # Chroma 메타데이터에 저장하는 내용 해시 키
+DOC_KEY = "docId"  # 청크가 속한 문서 id (메타데이터)
+CHUNK_KEY = "chunk"  # 문서 내 청크 순번 (메타데이터)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def chunk_id(doc_id: str, index: int) -> str:
+    # 단일 청크 문서는 문서 id 그대로 — 청크 도입 이전 색인과 호환
+    return doc_id if index == 0 else f"{doc_id}#{index}"
+
+
+def doc_id_of(entry_id: str, metadata: Optional[dict]) -> str:
+    """검색 결과 id → 문서 id (청크 도입 이전 항목은 메타데이터에 docId가 없음)."""
+    return (metadata or {}).get(DOC_KEY) or entry_id
+
+
+class VectorIndex:
+    """
+    collection_fn() -> Chroma collection, encode_fn(list[str]) -> 2D 벡터 (numpy/list)
+    chunk_fn(text) -> list[str] (선택) — 없으면 문서 전체가 한 청크
+    - upsert/delete: doc id 단위로 최신 요청만 남기고 flush_interval 후 일괄 반영
+    - reindex: 전체 문서 스트림을 reindex_batch 단위로 해시 비교 → encode → upsert
+    """
+
+    def __init__(
+        self,
+        collection_fn: Callable[[], object],
+        encode_fn: Callable[[list[str]], object],
+        flush_interval: float = 1.0,
+        batch_size: int = 64,
+        reindex_batch: int = 256,
+        chunk_fn: Optional[Callable[[str], list[str]]] = None,
+    ):
+        self._collection_fn = collection_fn
+        self._encode_fn = encode_fn
+        self._chunk_fn = chunk_fn
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.reindex_batch = reindex_batch
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # collection 쓰기 직렬화 (워커 + 재색인)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # doc_id → (text, metadata) | None(삭제)
+        self._pending: dict[str, Optional[tuple[str, dict]]] = {}
+        self._deadline: Optional[float] = None
+        self._requested = 0
+        self._completed = 0
+        self._stats = {"upserted": 0, "skipped": 0, "deleted": 0, "chunksEncoded": 0, "flushes": 0, "errors": 0}
+        self._last_error: Optional[str] = None
+        self._job: Optional[dict] = None
+        self._job_thread: Optional[threading.Thread] = None
+        # 재색인 중 워커가 반영한 청크 id — 시작 시점 스냅샷에 없는 문서가 정리 단계에서 지워지지 않게
+        self._reindex_live: Optional[set[str]] = None
+
+    # ─── write-behind ────────────────────────────
+    def upsert(self, doc_id: str, text: str, metadata: Optional[dict] = None):
+        """문서 벡터 갱신 예약. 빈 본문은 색인에서 제거."""
+        entry = (text, dict(metadata or {})) if (text or "").strip() else None
+        self._enqueue({doc_id: entry})
+
+    def delete(self, doc_ids: Iterable[str]):
+        self._enqueue({doc_id: None for doc_id in doc_ids if doc_id})
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 변경을 즉시 반영시키고 완료될 때까지 대기."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._requested
+            if self._completed >= target:
+                return True
+            self._deadline = time.monotonic()
+            self._cond.notify_all()
+            while self._completed < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                **self._stats,
+                "lastError": self._last_error,
+                "reindex": dict(self._job) if self._job else None,
+            }
+
+    def _enqueue(self, entries: dict[str, Optional[tuple[str, dict]]]):
+        if not entries:
+            return
+        with self._cond:
+            self._pending.update(entries)
+            self._requested += 1
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.flush_interval
+            if len(self._pending) >= self.batch_size:
+                self._deadline = time.monotonic()
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._worker, name="vector-index", daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._deadline is not None:
+                        remaining = self._deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                pending = self._pending
+                self._pending = {}
+                self._deadline = None
+                ticket = self._requested
+            try:
+                with self._write_lock:
+                    self._apply(pending)
+            except Exception as e:
+                with self._cond:
+                    self._stats["errors"] += 1
+                    self._last_error = str(e)
+            with self._cond:
+                self._stats["flushes"] += 1
+                self._completed = max(self._completed, ticket)
+                self._cond.notify_all()
+
+    # ─── 반영 ────────────────────────────────────
+    def _apply(self, pending: dict[str, Optional[tuple[str, dict]]]):
+        coll = self._collection_fn()
+        deletes = [doc_id for doc_id, entry in pending.items() if entry is None]
+        upserts = [(doc_id, entry[0], entry[1]) for doc_id, entry in pending.items() if entry is not None]
+        for start in range(0, len(upserts), self.batch_size):
+            _, _, chunk_ids = self._upsert_batch(coll, upserts[start:start + self.batch_size])
+            if self._reindex_live is not None:
+                self._reindex_live.update(chunk_ids)
+        if deletes:
+            known = self._existing_chunks(coll, deletes)
+            chunk_ids = [cid for chunks in known.values() for cid in chunks]
+            if chunk_ids:
+                coll.delete(ids=chunk_ids)
+            with self._cond:
+                self._stats["deleted"] += len(deletes)
+
+    def _chunks(self, text: str) -> list[str]:
+        """비어 있지 않은 청크 목록 (빈 목록이면 색인에서 제거)."""
+        if self._chunk_fn is None:
+            return [text]
+        return [c for c in self._chunk_fn(text) if c.strip()]
+
+    def _existing_chunks(self, coll, doc_ids: list[str]) -> dict[str, dict[str, dict]]:
+        """{doc_id: {청크 id: 메타데이터}} — 청크 도입 이전(문서 id 단일 항목) 벡터 포함."""
+        known: dict[str, dict[str, dict]] = {doc_id: {} for doc_id in doc_ids}
+        pages = [coll.get(ids=list(doc_ids), include=["metadatas"])]
+        if self._chunk_fn is not None:
+            pages.append(coll.get(where={DOC_KEY: {"$in": list(doc_ids)}}, include=["metadatas"]))
+        for page in pages:
+            for entry_id, meta in zip(page.get("ids") or [], page.get("metadatas") or []):
+                doc_id = doc_id_of(entry_id, meta)
+                if doc_id in known:
+                    known[doc_id][entry_id] = meta or {}
+        return known
+
+    def _upsert_batch(self, coll, batch: list[tuple[str, str, dict]]) -> tuple[int, int, set[str]]:
+        """
+        해시가 바뀐 청크만 encode + upsert, 줄어든 청크는 삭제.
+        (바뀐 문서 수, 건너뛴 문서 수, 현재 청크 id 집합) 반환.
+        """
+        if not batch:
+            return 0, 0, set()
+        known = self._existing_chunks(coll, [doc_id for doc_id, _, _ in batch])
+        changed = []
+        retitled = []  # 내용은 같고 메타데이터(제목 등)만 바뀐 청크 — encode 불필요
+        stale: list[str] = []
+        changed_docs: set[str] = set()
+        live: set[str] = set()
+        for doc_id, text, metadata in batch:
+            old_chunks = known.get(doc_id, {})
+            ids = []
+            for index, chunk in enumerate(self._chunks(text)):
+                cid = chunk_id(doc_id, index)
+                ids.append(cid)
+                digest = content_hash(chunk)
+                full_meta = {**metadata, DOC_KEY: doc_id, CHUNK_KEY: index, HASH_KEY: digest}
+                old_meta = old_chunks.get(cid)
+                if old_meta is not None and old_meta.get(HASH_KEY) == digest:
+                    if old_meta != full_meta:
+                        retitled.append((cid, full_meta))
+                    continue
+                changed.append((cid, chunk, full_meta))
+                changed_docs.add(doc_id)
+            live.update(ids)
+            removed = [cid for cid in old_chunks if cid not in live]
+            if removed:
+                stale.extend(removed)
+                changed_docs.add(doc_id)
+        if retitled:
+            coll.update(
+                ids=[cid for cid, _ in retitled],
+                metadatas=[metadata for _, metadata in retitled],
+            )
+        for start in range(0, len(changed), self.batch_size):
+            part = changed[start:start + self.batch_size]
+            vectors = self._encode_fn([text for _, text, _ in part])
+            coll.upsert(
+                ids=[cid for cid, _, _ in part],
+                documents=[text for _, text, _ in part],
+                metadatas=[metadata for _, _, metadata in part],
+                embeddings=[list(map(float, v)) for v in vectors],
+            )
+        if stale:
+            coll.delete(ids=stale)
+        skipped = len(batch) - len(changed_docs)
+        with self._cond:
+            self._stats["upserted"] += len(changed_docs)
+            self._stats["skipped"] += skipped
+            self._stats["chunksEncoded"] += len(changed)
+        return len(changed_docs), skipped, live
+
+    # ─── 전체 재색인 ──────────────────────────────
+    def start_reindex(self, load_docs: Callable[[], Iterable[tuple[str, str, dict]]]) -> dict:
+        """백그라운드 재색인 시작 (이미 실행 중이면 현재 상태 반환)."""
+        with self._cond:
+            if self._job_thread is not None and self._job_thread.is_alive():
+                return dict(self._job)
+            self._job = {
+                "status": "running",
+                "startedAt": datetime.now(timezone.utc).isoformat(),
+                "finishedAt": None,
+                "processed": 0,
+                "upserted": 0,
+                "skipped": 0,
+                "deleted": 0,
+                "error": None,
+            }
+            self._job_thread = threading.Thread(
+                target=self._run_reindex, args=(load_docs,), name="vector-reindex", daemon=True
+            )
+            self._job_thread.start()
+            return dict(self._job)
+
+    def wait_reindex(self, timeout: Optional[float] = None) -> bool:
+        thread = self._job_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run_reindex(self, load_docs: Callable[[], Iterable[tuple[str, str, dict]]]):
+        try:
+            self.reindex(load_docs(), progress=self._job)
+            status = "done"
+            error = None
+        except Exception as e:
+            status = "error"
+            error = str(e)
+        with self._cond:
+            self._job.update(status=status, error=error, finishedAt=datetime.now(timezone.utc).isoformat())
+
+    def reindex(self, docs: Iterable[tuple[str, str, dict]], progress: Optional[dict] = None) -> dict:
+        """
+        docs: (doc_id, text, metadata) 스트림 — 현재 존재하는 전체 문서.
+        변경된 청크만 다시 encode하고, collection에만 남은 ID(삭제·휴지통 문서, 구 청크)는 제거.
+        진행 중 upsert()로 반영된 문서는 스트림에 없어도 남긴다.
+        """
+        result = progress if progress is not None else {}
+        result.update(processed=0, upserted=0, skipped=0, deleted=0)
+        coll = self._collection_fn()
+        with self._write_lock:
+            self._reindex_live = set()
+        try:
+            return self._reindex(coll, docs, result)
+        finally:
+            with self._write_lock:
+                self._reindex_live = None
+
+    def _reindex(self, coll, docs: Iterable[tuple[str, str, dict]], result: dict) -> dict:
+        live: set[str] = set()
+        batch: list[tuple[str, str, dict]] = []
+
+        def _flush_batch():
+            with self._write_lock:
+                upserted, skipped, chunk_ids = self._upsert_batch(coll, batch)
+            live.update(chunk_ids)
+            with self._cond:
+                result["upserted"] += upserted
+                result["skipped"] += skipped
+                result["processed"] += len(batch)
+            batch.clear()
+
+        for doc_id, text, metadata in docs:
+            if not (text or "").strip():
+                continue  # 빈 문서는 live에 넣지 않음 → 기존 벡터 제거
+            batch.append((doc_id, text, dict(metadata or {})))
+            if len(batch) >= self.reindex_batch:
+                _flush_batch()
+        _flush_batch()
+
+        # 목록 조회부터 삭제까지 워커 반영을 막아 그 사이 upsert된 청크를 지우지 않음
+        with self._write_lock:
+            live |= self._reindex_live
+            stale = [entry_id for entry_id in self._all_ids(coll) if entry_id not in live]
+            for start in range(0, len(stale), self.reindex_batch):
+                coll.delete(ids=stale[start:start + self.reindex_batch])
+        with self._cond:
+            result["deleted"] = len(stale)
+            self._stats["deleted"] += len(stale)
+        return result
+
+    def _all_ids(self, coll) -> list[str]:
+        ids: list[str] = []
+        offset = 0
+        while True:
+            page = coll.get(include=[], limit=self.reindex_batch, offset=offset)
+            page_ids = page.get("ids") or []
+            ids.extend(page_ids)
+            if len(page_ids) < self.reindex_batch:
+                return ids
+            offset += len(page_ids)
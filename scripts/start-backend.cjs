@@ -8,7 +8,7 @@ const http = require("http");
 const path = require("path");
 
 const PORT = 8000;
-const HEALTH_URL = `http://127.0.0.1:${PORT}/api/docs`;
+const HEALTH_URL = `http://127.0.0.1:${PORT}/api/ready`;
 const MAX_WAIT_SEC = 120;
 const POLL_INTERVAL_MS = 2000;
 const PYTHON = path.resolve(__dirname, "..", "python", ".venv", "Scripts", "python.exe");
@@ -70,7 +70,7 @@ async function waitForBackend() {
       return true;
     }
     if (attempt <= 3) {
-      log("백엔드 시작 대기 중 (모델 로딩 ~60초)...");
+      log("백엔드 시작 대기 중 (모델은 백그라운드에서 로딩)...");
     }
     await new Promise((r) => setTimeout(r, POLL_INTERVAL_MS));
   }
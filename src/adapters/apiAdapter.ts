@@ -17,7 +17,7 @@ async function isAlive(base: string, timeoutMs = 3000): Promise<boolean> {
     try {
         const ctrl = new AbortController();
         const timer = setTimeout(() => ctrl.abort(), timeoutMs);
-        const res = await fetch(`${base}/api/docs`, { signal: ctrl.signal });
+        const res = await fetch(`${base}/api/docs?limit=1`, { signal: ctrl.signal });
         clearTimeout(timer);
         return res.ok;
     } catch {
@@ -104,6 +104,21 @@ export const docs = {
         );
     },
 
+    /** 커서 기반 페이지 조회 — nextCursor가 null이면 마지막 페이지 */
+    page: (options: { limit?: number; cursor?: string | null; folder?: string; tag?: string; updatedSince?: string } = {}) => {
+        const qs = new URLSearchParams();
+        qs.set("limit", String(options.limit ?? 100));
+        if (options.cursor) qs.set("cursor", options.cursor);
+        if (options.folder) qs.set("folder", options.folder);
+        if (options.tag) qs.set("tag", options.tag);
+        if (options.updatedSince) qs.set("updated_since", options.updatedSince);
+        return req<{
+            items: { id: string; title: string; updatedAt: string; folder?: string | null; tags?: string[] }[];
+            total: number;
+            nextCursor: string | null;
+        }>("GET", `/api/docs?${qs.toString()}`);
+    },
+
     get: (id: string) =>
         req<{ id: string; title: string; content: string; updatedAt: string } | null>(
             "GET",
@@ -113,6 +128,16 @@ export const docs = {
             throw e;
         }),
 
+    /** 문서가 서버에 남아 있는지 — 404만 false, 다른 오류는 그대로 던짐 */
+    exists: (id: string) =>
+        req<unknown>("GET", `/api/docs/${encodeURIComponent(id)}`).then(
+            () => true,
+            (e: Error) => {
+                if (e.message.includes("API error 404")) return false;
+                throw e;
+            },
+        ),
+
     save: async (id: string, payload: { title?: string; content?: string; autoTag?: boolean; autoTagNlp?: boolean; autoTagAi?: boolean }) => {
         const qs = id ? `?id=${encodeURIComponent(id)}` : "";
         const result = await req<{ id: string }>("POST", `/api/docs${qs}`, {
@@ -145,6 +170,27 @@ export const tags = {
     getAll: () => req<string[]>("GET", "/api/tags"),
 };
 
+// ─── 검색 ───────────────────────────────────────
+export type SearchHit = { id: string; title: string; snippet: string; score: number };
+
+export const search = {
+    /** 서버 전문 검색 — title/snippet의 일치 구간은 <mark>…</mark>로 표시됨 */
+    query: (q: string, limit: number = 20) => {
+        const qs = new URLSearchParams({ q, limit: String(limit) });
+        return req<{ query: string; items: SearchHit[]; mode: string }>("GET", `/api/search?${qs.toString()}`);
+    },
+
+    /** 전문 검색 + 벡터 검색을 RRF로 융합한 결과 */
+    hybrid: (q: string, limit: number = 20) => {
+        const qs = new URLSearchParams({ q, limit: String(limit) });
+        return req<{
+            query: string;
+            items: (SearchHit & { ranks: { lexical?: number; vector?: number } })[];
+            sources: { lexical: number; vector: number; lexicalMode?: string };
+        }>("GET", `/api/search/hybrid?${qs.toString()}`);
+    },
+};
+
 // ─── 휴지통 ───────────────────────────────────────
 export const trash = {
     list: () =>
@@ -162,6 +208,9 @@ export const trash = {
 export const folders = {
     list: () => req<string[]>("GET", "/api/folders"),
 
+    /** 폴더별 문서 수 (파일 목록이 페이지 단위라 개수는 서버에서 계산) */
+    counts: () => req<{ total: number; folders: Record<string, number> }>("GET", "/api/folders/counts"),
+
     create: (name: string) =>
         req<string[]>("POST", "/api/folders", { name }),
 
@@ -276,6 +325,8 @@ export const graph = {
         return req<{
             edgeType: string;
             count: number;
+            graphVersion?: number;
+            rebuildPending?: boolean;
             edges: Array<{
                 sourceDocId: string;
                 targetDocId: string;
@@ -342,6 +393,6 @@ export const urlAnalyze = {
 };
 
 // ─── window.api 호환 래퍼 ──
-const api = { docs, tags, folders, trash, images, files, backup, system, urlMeta, urlAnalyze, network, ai, graph };
+const api = { docs, tags, search, folders, trash, images, files, backup, system, urlMeta, urlAnalyze, network, ai, graph };
 export default api;
 
@@ -11,8 +11,8 @@ interface FilePanelProps {
 
 export function FilePanel({ onOpenDoc, onCreateDoc }: FilePanelProps) {
     const {
-        docs, current, docTags, selectedFolder,
-        folders, loadDocs, loadFolders,
+        docs, docsCursor, docsTotal, docsLoadingMore, current, docTags, selectedFolder,
+        folders, loadDocs, loadMoreDocs, loadFolders,
         renameDoc, deleteDoc, setDocFolder,
         trashItems, loadTrash, restoreFromTrash, deleteFromTrashPermanently,
     } = useStore();
@@ -46,6 +46,13 @@ export function FilePanel({ onOpenDoc, onCreateDoc }: FilePanelProps) {
         void loadDocs(selectedFolder);
     }, [appliedSearch, selectedFolder, loadDocs, loadTrash]);
 
+    // 목록은 페이지 단위로 받는다. 검색·날짜 필터·오래된순 정렬은 전체가 필요하므로 남은 페이지를 이어서 로드
+    const needAllDocs = !!appliedSearch || !!selectedDate || sortOrder === "oldest";
+    useEffect(() => {
+        if (selectedFolder === "__trash__" || !needAllDocs || !docsCursor) return;
+        void loadMoreDocs({ all: true });
+    }, [needAllDocs, docsCursor, selectedFolder, loadMoreDocs]);
+
     const executeSearch = () => {
         setAppliedSearch(searchInput.trim());
     };
@@ -420,11 +427,24 @@ export function FilePanel({ onOpenDoc, onCreateDoc }: FilePanelProps) {
                         </span>
                     </div>
                 ))}
-                {filteredDocs.length === 0 && (
+                {filteredDocs.length === 0 && !docsCursor && (
                     <div style={{ padding: "12px 20px", color: "var(--text-secondary)", fontSize: "var(--font-size-s)" }}>
                         {appliedSearch ? "검색 결과가 없습니다." : "문서가 없습니다."}
                     </div>
                 )}
+                {docsCursor && !needAllDocs && (
+                    <div style={{ padding: "8px 20px" }}>
+                        <button
+                            type="button"
+                            className="btn btn--sm"
+                            onClick={() => void loadMoreDocs()}
+                            disabled={docsLoadingMore}
+                            title="다음 문서 더 불러오기"
+                        >
+                            더 보기 ({docs.length}/{docsTotal})
+                        </button>
+                    </div>
+                )}
                 </>
                 )}
             </div>
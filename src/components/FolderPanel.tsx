@@ -13,7 +13,7 @@ interface FolderPanelProps {
 
 export function FolderPanel({ onCreateDoc, onOpenSettings, onOpenTagSettings }: FolderPanelProps) {
     const {
-        folders, selectedFolder, docs, trashItems,
+        folders, selectedFolder, folderCounts, trashItems,
         loadFolders, loadTrash, setSelectedFolder, createFolder, deleteFolder, renameFolder,
     } = useStore();
 
@@ -72,7 +72,7 @@ export function FolderPanel({ onCreateDoc, onOpenSettings, onOpenTagSettings }:
     };
 
     const countDocsInFolder = (folder: string | null) =>
-        docs.filter((d) => (folder === null ? true : d.folder === folder)).length;
+        folder === null ? folderCounts.total : (folderCounts.folders[folder] ?? 0);
 
     const handleBackup = async () => {
         try {
@@ -1,20 +1,68 @@
-import { useState, useMemo } from "react";
+import { useState, useMemo, useEffect, Fragment } from "react";
 import { useStore } from "../store/useStore";
+import api from "../adapters/apiAdapter";
+import type { SearchHit } from "../adapters/apiAdapter";
+
+const SERVER_SEARCH_DELAY_MS = 200;
+
+/** 서버 검색 결과의 <mark>…</mark> 구간을 텍스트 노드로 강조 표시 (HTML로 해석하지 않음) */
+function Highlighted({ text }: { text: string }) {
+    const parts = text.split(/<mark>|<\/mark>/);
+    return (
+        <>
+            {parts.map((part, i) =>
+                i % 2 === 1 ? <mark key={i}>{part}</mark> : <Fragment key={i}>{part}</Fragment>
+            )}
+        </>
+    );
+}
 
 export function SearchPanel() {
     const { docs, docTags, loadDoc, current } = useStore();
     const [query, setQuery] = useState("");
+    const [serverHits, setServerHits] = useState<SearchHit[]>([]);
+
+    // 본문 전문 검색은 서버 색인(/api/search)으로 — 입력이 멈춘 뒤 한 번만 요청
+    useEffect(() => {
+        const q = query.trim();
+        if (!q) {
+            setServerHits([]);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const res = await api.search.query(q);
+                if (!cancelled) setServerHits(res?.items ?? []);
+            } catch {
+                if (!cancelled) setServerHits([]);
+            }
+        }, SERVER_SEARCH_DELAY_MS);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [query]);
 
     const results = useMemo(() => {
         const q = query.toLowerCase().trim();
         if (!q) return [];
-        return docs.filter(d => {
+        const local = docs.filter(d => {
             const displayTitle = (current?.id === d.id ? current.title : null) || d.title || d.id;
             const titleMatch = displayTitle.toLowerCase().includes(q);
             const tagsMatch = (docTags[d.id] || []).some(t => t.toLowerCase().includes(q));
             return titleMatch || tagsMatch;
         });
-    }, [docs, docTags, current, query]);
+        const snippets = new Map(serverHits.map(h => [h.id, h.snippet]));
+        const seen = new Set(local.map(d => d.id));
+        const merged = local.map(d => ({ id: d.id, title: d.title, snippet: snippets.get(d.id) }));
+        for (const hit of serverHits) {
+            if (!seen.has(hit.id)) {
+                merged.push({ id: hit.id, title: hit.title.replace(/<\/?mark>/g, ""), snippet: hit.snippet });
+            }
+        }
+        return merged;
+    }, [docs, docTags, current, query, serverHits]);
 
     return (
         <div className="side-panel">
@@ -22,7 +70,7 @@ export function SearchPanel() {
             <div className="side-panel__search">
                 <input
                     type="search"
-                    placeholder="제목이나 태그로 검색..."
+                    placeholder="제목, 태그, 본문으로 검색..."
                     value={query}
                     onChange={e => setQuery(e.target.value)}
                     autoFocus
@@ -39,11 +87,25 @@ export function SearchPanel() {
                         key={d.id}
                         className={`tree-item ${current?.id === d.id ? "active" : ""}`}
                         onClick={() => loadDoc(d.id)}
+                        style={d.snippet ? { flexWrap: "wrap" } : undefined}
                     >
                         <span className="tree-item__icon">📄</span>
                         <span className="tree-item__label">
                         {(current?.id === d.id ? current.title : null) || d.title || d.id}
                     </span>
+                        {d.snippet && (
+                            <span
+                                style={{
+                                    flexBasis: "100%",
+                                    paddingLeft: 22,
+                                    color: "var(--text-secondary)",
+                                    fontSize: "var(--font-size-s)",
+                                    whiteSpace: "normal",
+                                }}
+                            >
+                                <Highlighted text={d.snippet} />
+                            </span>
+                        )}
                     </div>
                 ))}
             </div>
@@ -51,12 +51,32 @@ function loadSettings(): AppSettings {
   return { ...DEFAULT_SETTINGS };
 }
 
+/** 목록 응답에 포함된 태그로 docTags 갱신 (태그 검색이 동작하도록) */
+function withListTags(docTags: Record<string, string[]>, list: { id: string; tags?: string[] }[]): Record<string, string[]> {
+  const next = { ...docTags };
+  for (const d of list) {
+    if (Array.isArray(d.tags)) {
+      next[d.id] = d.tags;
+    }
+  }
+  return next;
+}
+
 function persistSettings(s: AppSettings) {
   localStorage.setItem("my-graph-settings", JSON.stringify(s));
 }
 
+/** 파일 목록 한 페이지 크기 (서버 커서 페이지네이션) */
+const DOC_PAGE_SIZE = 100;
+
 type Store = {
   docs: DocItem[];
+  /** 다음 페이지 커서 (null이면 마지막 페이지까지 로드됨) */
+  docsCursor: string | null;
+  /** 현재 필터(폴더)의 전체 문서 수 */
+  docsTotal: number;
+  docsFolder: string | null;
+  docsLoadingMore: boolean;
   current: DocDetail | null;
   tags: string[];
   docTags: Record<string, string[]>;
@@ -69,6 +89,9 @@ type Store = {
 
   // Folders
   folders: string[];
+  /** 폴더별 문서 수 (전체 목록을 받지 않고 서버에서 계산) */
+  folderCounts: { total: number; folders: Record<string, number> };
+  loadFolderCounts: () => Promise<void>;
   selectedFolder: string | null;
   expandedFolders: Set<string>;
   toggleFolderExpand: (f: string) => void;
@@ -95,7 +118,10 @@ type Store = {
   setError: (v: string | null) => void;
 
   // Doc actions
+  /** 첫 페이지 로드 (다음 페이지는 loadMoreDocs) */
   loadDocs: (folder?: string | null) => Promise<void>;
+  /** 다음 페이지를 이어 붙임 (all이면 남은 페이지 전부) */
+  loadMoreDocs: (options?: { all?: boolean }) => Promise<void>;
   loadDoc: (id: string) => Promise<void>;
   saveDoc: (id: string, title: string, content: string) => Promise<string>;
   renameDoc: (id: string, nextTitle: string) => Promise<void>;
@@ -132,12 +158,17 @@ type Store = {
 
 export const useStore = create<Store>((set, get) => ({
   docs: [],
+  docsCursor: null,
+  docsTotal: 0,
+  docsFolder: null,
+  docsLoadingMore: false,
   current: null,
   tags: [],
   docTags: {},
   loading: false,
   error: null,
   folders: [],
+  folderCounts: { total: 0, folders: {} },
   selectedFolder: null,
   expandedFolders: new Set<string>(),
   trashItems: [],
@@ -193,17 +224,18 @@ export const useStore = create<Store>((set, get) => ({
     set({ loading: true, error: null });
     try {
       const f = folder !== undefined ? folder : get().selectedFolder;
-      const docs = await api.docs.list(f ?? undefined);
-      const list = docs ?? [];
-      set({ docs: list });
-      // list_docs 응답에 포함된 태그로 docTags 갱신 (태그 검색이 동작하도록)
-      const nextDocTags = { ...get().docTags };
-      for (const d of list) {
-        if (Array.isArray(d.tags)) {
-          nextDocTags[d.id] = d.tags;
-        }
-      }
-      set({ docTags: nextDocTags });
+      const docsFolder = f === "__trash__" ? null : f;
+      const page = await api.docs.page({ limit: DOC_PAGE_SIZE, folder: docsFolder ?? undefined });
+      const list = page?.items ?? [];
+      set({
+        docs: list,
+        docsCursor: page?.nextCursor ?? null,
+        docsTotal: page?.total ?? list.length,
+        docsFolder,
+        docTags: withListTags(get().docTags, list),
+      });
+      // 문서 추가·삭제·이동 뒤에는 항상 loadDocs가 불리므로 폴더별 개수도 함께 갱신
+      void get().loadFolderCounts();
     } catch (e) {
       set({ error: String(e) });
     } finally {
@@ -211,6 +243,32 @@ export const useStore = create<Store>((set, get) => ({
     }
   },
 
+  loadMoreDocs: async (options?: { all?: boolean }) => {
+    if (get().docsLoadingMore) return;
+    set({ docsLoadingMore: true });
+    try {
+      // 다른 폴더로 바뀌었거나 목록이 다시 로드되면(커서 변경) 이어 붙이지 않는다
+      while (get().docsCursor) {
+        const { docsCursor: cursor, docsFolder } = get();
+        const page = await api.docs.page({ limit: DOC_PAGE_SIZE, cursor, folder: docsFolder ?? undefined });
+        if (get().docsCursor !== cursor || get().docsFolder !== docsFolder) return;
+        const items = page?.items ?? [];
+        const seen = new Set(get().docs.map((d) => d.id));
+        set({
+          docs: [...get().docs, ...items.filter((d) => !seen.has(d.id))],
+          docsCursor: page?.nextCursor ?? null,
+          docsTotal: page?.total ?? get().docsTotal,
+          docTags: withListTags(get().docTags, items),
+        });
+        if (!options?.all) return;
+      }
+    } catch (e) {
+      set({ error: String(e) });
+    } finally {
+      set({ docsLoadingMore: false });
+    }
+  },
+
   loadDoc: async (id: string) => {
     set({ loading: true, error: null });
     try {
@@ -338,6 +396,13 @@ export const useStore = create<Store>((set, get) => ({
     }
   },
 
+  loadFolderCounts: async () => {
+    try {
+      const counts = await api.folders.counts();
+      if (counts) set({ folderCounts: counts });
+    } catch { /* 개수 표시는 다음 갱신 때 */ }
+  },
+
   createFolder: async (name: string) => {
     try {
       await api.folders.create(name);
@@ -349,14 +414,15 @@ export const useStore = create<Store>((set, get) => ({
 
   deleteFolder: async (name: string) => {
     try {
-      const docsInFolder = get().docs.filter((d) => d.folder === name).map((d) => d.id);
       await api.folders.delete(name);
       if (get().selectedFolder === name) {
         set({ selectedFolder: null });
       }
       await get().loadFolders();
       await get().loadDocs();
-      if (get().current && docsInFolder.includes(get().current!.id)) {
+      // 목록은 첫 페이지만 있으므로 열린 문서가 함께 삭제됐는지는 서버에 확인
+      const current = get().current;
+      if (current && !(await api.docs.exists(current.id))) {
         set({ current: null });
       }
     } catch (e) {